@@ -0,0 +1,24 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class ChangesPollThread(QThread):
+    """Asks a shop server what other tills changed, in the background
+
+    Only fetches; the window applies the result on the GUI thread, and
+    only if its store has not moved on since the poll started.
+    """
+    changes_found = pyqtSignal(object, object)  # stamp polled from, changes
+    poll_failed = pyqtSignal(str)
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.stamp = store.version
+
+    def run(self):
+        try:
+            changes = self.store.fetch_changes(self.stamp)
+        except Exception as e:
+            self.poll_failed.emit(str(e))
+        else:
+            self.changes_found.emit(self.stamp, changes)
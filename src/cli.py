@@ -0,0 +1,165 @@
+"""Command-line batch mode: bulk stock and price updates, exports and reports
+
+Works on a shop folder under the data folder, without opening any window:
+
+    python cli.py shops
+    python cli.py stock  SHOP deliveries.csv [--set] [--dry-run]
+    python cli.py prices SHOP prices.csv [--dry-run]
+    python cli.py export SHOP inventory.xlsx   (or .csv, or .json)
+    python cli.py report SHOP [--days 30]
+
+Stock files have 'name' and 'quantity' columns, price files 'name' and
+'price'. Each file is applied as one batch: if any line is wrong nothing
+is changed and every problem is listed.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import date, timedelta
+from path_utilis import get_base_path, shop_path_of
+from inventory_store import DEFAULT_STORAGE_BACKEND
+from shop_catalog import ShopCatalog, SHOP_INFO_FILE, SORT_NAME
+from core import (
+    InventoryError, BatchError, ConflictError, open_inventory, STOCK_ADJUST, STOCK_SET,
+    apply_stock_csv, apply_price_csv
+)
+
+DATA_DIR = os.path.join(get_base_path(), 'data')
+MAX_ERRORS_SHOWN = 50
+
+
+def open_shop(shop):
+    """Open the inventory of a shop with the storage backend it is configured for"""
+    shop_path = shop_path_of(shop)
+    with open(os.path.join(shop_path, SHOP_INFO_FILE), 'r') as f:
+        shop_info = json.load(f)
+    return open_inventory(shop_path, shop_info.get('storage_backend', DEFAULT_STORAGE_BACKEND))
+
+
+def print_errors(errors):
+    for error in errors[:MAX_ERRORS_SHOWN]:
+        print(f"  {error}", file=sys.stderr)
+    if len(errors) > MAX_ERRORS_SHOWN:
+        print(f"  ... and {len(errors) - MAX_ERRORS_SHOWN} more", file=sys.stderr)
+
+
+def list_shops(args):
+    catalog = ShopCatalog(DATA_DIR)
+    catalog.refresh()
+    for shop in catalog.shops(SORT_NAME):
+        print(f"{shop['folder']:<30} {shop['shop_name']}")
+
+
+def apply_batch(args, apply):
+    """Apply a CSV file to a shop's inventory as one batch"""
+    started = time.perf_counter()
+    inventory = open_shop(args.shop)
+    try:
+        rows = apply(inventory)
+    finally:
+        inventory.close()
+    action = "Would update" if args.dry_run else "Updated"
+    print(f"{action} {len(rows)} item(s) in {time.perf_counter() - started:.2f}s")
+
+
+def update_stock(args):
+    mode = STOCK_SET if args.set else STOCK_ADJUST
+    apply_batch(args, lambda inventory: apply_stock_csv(inventory, args.file, mode, args.dry_run))
+
+
+def update_prices(args):
+    apply_batch(args, lambda inventory: apply_price_csv(inventory, args.file, args.dry_run))
+
+
+def export(args):
+    from core.export import export_inventory
+    inventory = open_shop(args.shop)
+    try:
+        if args.output.lower().endswith('.json'):
+            inventory.store.export_json(args.output)
+        else:
+            export_inventory(inventory.items.export_columns(), args.output)
+        print(f"Exported {len(inventory)} item(s) to {args.output}")
+    finally:
+        inventory.close()
+
+
+def report(args):
+    inventory = open_shop(args.shop)
+    try:
+        items = inventory.items
+        print("📦 INVENTORY")
+        print("=" * 60)
+        print(f"{'Items:':<25} {len(items):>10}")
+        print(f"{'Units in stock:':<25} {sum(items.quantities):>10}")
+        print(f"{'Out of stock:':<25} {items.out_of_stock_count():>10}")
+        print(f"{'Total value:':<25} Rs {items.total_value():>10.2f}")
+        for category in inventory.categories():
+            print(f"  {category:<23} Rs {items.category_value(category):>10.2f}")
+    finally:
+        inventory.close()
+
+    from sales_analytics import PANDAS_AVAILABLE, sales_report_text
+    from sales_ledger import open_sales_ledger
+    if not PANDAS_AVAILABLE:
+        print("\nSales reports require pandas. Install it with: pip install pandas")
+        return
+    ledger = open_sales_ledger(shop_path_of(args.shop))
+    try:
+        end = date.today() + timedelta(days=1)
+        print()
+        print(sales_report_text(ledger, end - timedelta(days=args.days), end, f"Last {args.days} Days"), end="")
+    finally:
+        ledger.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Batch operations on a shop's inventory")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    shops = commands.add_parser('shops', help="list the shops in the data folder")
+    shops.set_defaults(run=list_shops)
+
+    stock = commands.add_parser('stock', help="add (or with --set, replace) stock from a name,quantity CSV")
+    stock.add_argument('shop', help="shop folder name or path")
+    stock.add_argument('file')
+    stock.add_argument('--set', action='store_true', help="replace quantities instead of adding to them")
+    stock.add_argument('--dry-run', action='store_true', help="check the file without changing anything")
+    stock.set_defaults(run=update_stock)
+
+    prices = commands.add_parser('prices', help="set prices from a name,price CSV")
+    prices.add_argument('shop', help="shop folder name or path")
+    prices.add_argument('file')
+    prices.add_argument('--dry-run', action='store_true', help="check the file without changing anything")
+    prices.set_defaults(run=update_prices)
+
+    export_parser = commands.add_parser('export', help="export the inventory to an .xlsx, .csv or .json file")
+    export_parser.add_argument('shop', help="shop folder name or path")
+    export_parser.add_argument('output')
+    export_parser.set_defaults(run=export)
+
+    report_parser = commands.add_parser('report', help="print inventory totals and a sales report")
+    report_parser.add_argument('shop', help="shop folder name or path")
+    report_parser.add_argument('--days', type=int, default=30, help="length of the sales period (default 30)")
+    report_parser.set_defaults(run=report)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.run(args)
+    except BatchError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        print_errors(e.errors)
+        return 1
+    except (InventoryError, ConflictError, OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
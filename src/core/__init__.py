@@ -0,0 +1,14 @@
+"""Inventory, cart, checkout and receipt logic without any Qt dependency
+
+The windows call into this package; scripts, batch jobs and other front
+ends can use it directly without a QApplication. core.export (which loads
+openpyxl) is not imported here, import it where exports are written.
+"""
+from .inventory import (
+    InventoryRepository, InventoryError, ValidationError, DuplicateItemError,
+    BatchError, ConflictError, validate_item, open_inventory
+)
+from .cart import Cart, CartError, InvalidQuantityError, InsufficientStockError
+from .checkout import CheckoutService
+from .receipts import format_receipt_text
+from .batch import STOCK_ADJUST, STOCK_SET, apply_stock_csv, apply_price_csv
@@ -0,0 +1,110 @@
+import csv
+import math
+from .inventory import BatchError
+
+STOCK_ADJUST = "adjust"  # the file's quantities are added to the stock
+STOCK_SET = "set"        # the file's quantities replace the stock
+
+
+def parse_price(text):
+    """float(text), refusing nan and inf"""
+    price = float(text)
+    if not math.isfinite(price):
+        raise ValueError(f"not a finite price: {text}")
+    return price
+
+
+def read_batch_csv(path, value_column, parse):
+    """Read the 'name' and value_column of every row of a CSV file
+
+    Column names are matched ignoring case and surrounding spaces; other
+    columns are ignored. Returns (rows, errors): rows are (line, name,
+    value) tuples, errors describe the lines that could not be read.
+    """
+    rows = []
+    errors = []
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = [column.strip().lower() for column in next(reader, [])]
+        missing = [column for column in ('name', value_column) if column not in header]
+        if missing:
+            raise BatchError([f"{path}: missing column(s) {', '.join(missing)}."])
+        name_at = header.index('name')
+        value_at = header.index(value_column)
+
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            try:
+                name = row[name_at].strip()
+                value = parse(row[value_at].strip())
+            except (IndexError, ValueError):
+                errors.append(f"Line {reader.line_num}: expected a name and a {value_column}.")
+                continue
+            if not name:
+                errors.append(f"Line {reader.line_num}: the name is empty.")
+                continue
+            rows.append((reader.line_num, name, value))
+    return rows, errors
+
+
+def stock_changes(repository, rows, mode=STOCK_ADJUST):
+    """Quantity changes for (line, name, quantity) rows, returns (changes, errors)
+
+    In STOCK_ADJUST mode the rows of an item add up, so a file may list
+    the same item more than once.
+    """
+    quantities = {}
+    errors = []
+    for line, name, quantity in rows:
+        item = repository.get(name)
+        if item is None:
+            errors.append(f"Line {line}: no item named '{name}'.")
+            continue
+        if mode == STOCK_ADJUST:
+            quantities[item['name']] = quantities.get(item['name'], item['quantity']) + quantity
+        else:
+            quantities[item['name']] = quantity
+    return [(name, {'quantity': quantity}) for name, quantity in quantities.items()], errors
+
+
+def price_changes(repository, rows):
+    """Price changes for (line, name, price) rows, returns (changes, errors)"""
+    prices = {}
+    errors = []
+    for line, name, price in rows:
+        item = repository.get(name)
+        if item is None:
+            errors.append(f"Line {line}: no item named '{name}'.")
+            continue
+        prices[item['name']] = price
+    return [(name, {'price': price}) for name, price in prices.items()], errors
+
+
+def apply_changes(repository, changes, errors, dry_run=False):
+    """Apply changes as one batch unless errors were found while reading them
+
+    When there are errors the changes are still checked, so the BatchError
+    lists every problem in the file at once.
+    """
+    if errors:
+        try:
+            repository.update_items(changes, dry_run=True)
+        except BatchError as e:
+            errors = errors + e.errors
+        raise BatchError(errors)
+    return repository.update_items(changes, dry_run)
+
+
+def apply_stock_csv(repository, path, mode=STOCK_ADJUST, dry_run=False):
+    """Apply the 'name,quantity' rows of a CSV file as one batch, returns the changed rows"""
+    rows, errors = read_batch_csv(path, 'quantity', int)
+    changes, unknown = stock_changes(repository, rows, mode)
+    return apply_changes(repository, changes, errors + unknown, dry_run)
+
+
+def apply_price_csv(repository, path, dry_run=False):
+    """Apply the 'name,price' rows of a CSV file as one batch, returns the changed rows"""
+    rows, errors = read_batch_csv(path, 'price', parse_price)
+    changes, unknown = price_changes(repository, rows)
+    return apply_changes(repository, changes, errors + unknown, dry_run)
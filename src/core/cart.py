@@ -0,0 +1,76 @@
+from inventory_index import NameIndex
+
+
+class CartError(Exception):
+    """An item could not be added to the cart"""
+
+
+class InvalidQuantityError(CartError):
+    pass
+
+
+class InsufficientStockError(CartError):
+    pass
+
+
+class Cart:
+    """Items picked for the current sale
+
+    items holds one dict per item ('name', 'quantity', 'unit_price',
+    'total_price'), the format used by receipts and the sales ledger.
+    """
+
+    def __init__(self):
+        self.items = []
+        self.index = NameIndex()
+
+    def add(self, item, quantity):
+        """Put quantity of an inventory item in the cart
+
+        Returns (cart_item, is_new). Raises InvalidQuantityError for a
+        quantity below 1 and InsufficientStockError when the cart would
+        hold more than is in stock.
+        """
+        if quantity <= 0:
+            raise InvalidQuantityError("Please select a quantity greater than 0.")
+
+        cart_item = self.index.get(item['name'])
+        in_cart = cart_item['quantity'] if cart_item is not None else 0
+        available = item.get('quantity', 0) - in_cart
+        if quantity > available:
+            raise InsufficientStockError(f"Only {max(available, 0)} items available in stock.")
+
+        if cart_item is not None:
+            cart_item['quantity'] += quantity
+            cart_item['total_price'] = cart_item['quantity'] * cart_item['unit_price']
+            return cart_item, False
+
+        cart_item = {
+            'name': item['name'],
+            'quantity': quantity,
+            'unit_price': item['price'],
+            'total_price': quantity * item['price'],
+        }
+        self.items.append(cart_item)
+        self.index.add(cart_item)
+        return cart_item, True
+
+    def quantity_of(self, name):
+        cart_item = self.index.get(name)
+        return cart_item['quantity'] if cart_item is not None else 0
+
+    def total_amount(self):
+        return sum(cart_item['total_price'] for cart_item in self.items)
+
+    def total_quantity(self):
+        return sum(cart_item['quantity'] for cart_item in self.items)
+
+    def clear(self):
+        self.items.clear()
+        self.index.rebuild(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
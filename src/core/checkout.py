@@ -0,0 +1,41 @@
+from datetime import datetime
+
+
+class CheckoutService:
+    """Completes sales: records them in the sales ledger and takes the sold quantities out of stock"""
+
+    def __init__(self, repository, sales_ledger=None):
+        self.repository = repository
+        self.sales_ledger = sales_ledger
+
+    def checkout(self, cart, receipt_no, sold_at=None):
+        """Finish the sale of cart under receipt_no and empty the cart
+
+        The receipt has already been issued, so a failure to record the
+        sale does not stop the stock from being updated, and the cart is
+        emptied either way. Returns a dict with the 'sale_id' (None when
+        it was not recorded), the 'sold_rows' whose quantity changed and
+        the 'errors' met on the way.
+        """
+        sold_at = sold_at or datetime.now()
+        errors = []
+        sale_id = None
+        sold_rows = []
+
+        if self.sales_ledger is None:
+            errors.append(f"The sales ledger is not available; sale {receipt_no} was not recorded.")
+        else:
+            try:
+                item_categories = self.repository.categories_of(cart_item['name'] for cart_item in cart.items)
+                sale_id = self.sales_ledger.record_sale(receipt_no, cart.items, sold_at, item_categories)
+            except Exception as e:
+                errors.append(f"Failed to record sale {receipt_no}: {str(e)}")
+
+        deltas = [(cart_item['name'], -cart_item['quantity']) for cart_item in cart.items]
+        try:
+            sold_rows = self.repository.adjust_quantities(deltas)
+        except Exception as e:
+            errors.append(f"Failed to save inventory data: {str(e)}")
+
+        cart.clear()
+        return {'receipt_no': receipt_no, 'sale_id': sale_id, 'sold_rows': sold_rows, 'errors': errors}
@@ -0,0 +1,85 @@
+import os
+import csv
+
+try:
+    from openpyxl import Workbook
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+EXPORT_HEADERS = ['Item Name', 'SKU', 'Categories', 'Quantity', 'Unit Price (Rs)', 'Total Value (Rs)']
+EXPORT_CHUNK_SIZE = 2000  # rows written between progress updates
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def export_rows(columns, progress=None, is_cancelled=None):
+    """Export rows of InventoryColumns.export_columns() in lists of at most EXPORT_CHUNK_SIZE"""
+    names, skus, categories, quantities, prices = columns
+    total = len(names)
+    for start in range(0, total, EXPORT_CHUNK_SIZE):
+        if is_cancelled is not None and is_cancelled():
+            raise ExportCancelled()
+        stop = min(start + EXPORT_CHUNK_SIZE, total)
+        yield [
+            (names[row], skus[row], categories[row], quantities[row], prices[row], quantities[row] * prices[row])
+            for row in range(start, stop)
+        ]
+        if progress is not None:
+            progress(stop, total)
+
+
+def write_csv(path, chunks):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_HEADERS)
+        for rows in chunks:
+            writer.writerows(rows)
+
+
+def write_xlsx(path, chunks):
+    if not OPENPYXL_AVAILABLE:
+        raise RuntimeError("Excel export requires openpyxl. Install it with: pip install openpyxl")
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Inventory')
+    sheet.append(EXPORT_HEADERS)
+    for rows in chunks:
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+
+
+def remove_partial(path):
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+    except OSError as e:
+        print(f"Could not remove partial export {path}: {e}")
+
+
+def export_inventory(columns, file_path, progress=None, is_cancelled=None):
+    """Write exported columns to an .xlsx or .csv file (by extension)
+
+    Rows are streamed to the file in chunks (openpyxl's write-only mode for
+    Excel), so memory use does not grow with the size of the catalog. The
+    file is written next to the target and only moved into place once
+    complete, so a cancelled or failed export leaves nothing behind.
+    progress(rows_written, total) is called after every chunk, and the
+    export stops with ExportCancelled once is_cancelled() returns True.
+    """
+    temp_path = file_path + ".part"
+    chunks = export_rows(columns, progress, is_cancelled)
+    try:
+        if file_path.lower().endswith('.csv'):
+            write_csv(temp_path, chunks)
+        else:
+            write_xlsx(temp_path, chunks)
+        if is_cancelled is not None and is_cancelled():
+            raise ExportCancelled()
+        os.replace(temp_path, file_path)
+    except BaseException:
+        remove_partial(temp_path)
+        raise
@@ -0,0 +1,298 @@
+import math
+from itertools import islice
+from inventory_store import open_inventory_store, DEFAULT_STORAGE_BACKEND, ConflictError
+from inventory_columns import InventoryColumns
+from inventory_index import NameIndex, SkuIndex, CategoryIndex, SearchIndex, item_id
+
+
+class InventoryError(Exception):
+    """A change to the inventory was refused or could not be stored"""
+
+
+class ValidationError(InventoryError):
+    pass
+
+
+class DuplicateItemError(InventoryError):
+    pass
+
+
+class BatchError(InventoryError):
+    """A batch of changes was refused; errors lists every problem found"""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} problem(s) found, no changes were made.")
+        self.errors = errors
+
+
+def validate_item(item):
+    """Raise ValidationError unless item has a name, a category, a scannable SKU and sane numbers"""
+    if not str(item.get('name', '')).strip():
+        raise ValidationError("Item name is required.")
+    if any(char.isspace() for char in item.get('sku', '')):
+        raise ValidationError("SKU cannot contain spaces.")
+    if not item.get('categories'):
+        raise ValidationError("At least one category must be selected.")
+    # nan passes every comparison, so finiteness is checked first
+    if not math.isfinite(item.get('quantity', 0)):
+        raise ValidationError("Quantity must be a number.")
+    if item.get('quantity', 0) < 0:
+        raise ValidationError("Quantity cannot be negative.")
+    if not math.isfinite(item.get('price', 0.0)):
+        raise ValidationError("Unit price must be a finite number.")
+    if item.get('price', 0.0) < 0:
+        raise ValidationError("Unit price cannot be negative.")
+
+
+class InventoryRepository:
+    """The items of one shop: their storage, in-memory columns and lookup indexes
+
+    Every change is validated, written to the store and then applied to
+    items and the indexes, so memory never gets ahead of storage. Changes
+    are made against what is stored, not against items: sales made in
+    another window are kept, and edits that clash with one made elsewhere
+    raise ConflictError (reload and try again). A
+    listener (for example a table model) can follow the row changes; it
+    is called with:
+
+        inserting_item(row), item_inserted(row)
+        removing_item(row), item_removed(row, item)
+        item_replaced(row, old_name), items_changed(rows)
+    """
+
+    def __init__(self, store, listener=None):
+        self.store = store
+        self.listener = listener
+        self.items = InventoryColumns()
+        self.name_index = NameIndex()
+        self.sku_index = SkuIndex()
+        self.category_index = CategoryIndex()
+        self.search_index = SearchIndex()
+        self.id_records = None  # item id -> record, built on the first search
+
+    def load(self):
+        """(Re)load every item from the store"""
+        self.items = InventoryColumns(self.require_store().load_items())
+        self.rebuild_indexes()
+        return self.items
+
+    def require_store(self):
+        if self.store is None:
+            raise InventoryError("Inventory storage is not available.")
+        return self.store
+
+    def rebuild_indexes(self):
+        self.id_records = None
+        self.name_index.rebuild(self.items)
+        self.sku_index.rebuild(self.items)
+        self.category_index.rebuild(self.items)
+        self.search_index.rebuild(self.items)
+
+    def index_item(self, item):
+        self.id_records = None
+        self.name_index.add(item)
+        self.sku_index.add(item)
+        self.category_index.add(item)
+        self.search_index.add(item)
+
+    def unindex_item(self, item):
+        self.id_records = None
+        self.name_index.remove(item)
+        self.sku_index.remove(item)
+        self.category_index.remove(item)
+        self.search_index.remove(item)
+
+    def notify(self, event, *args):
+        if self.listener is not None:
+            getattr(self.listener, event)(*args)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, name):
+        return name in self.name_index
+
+    def get(self, name):
+        """Record of the item named name (ignoring case), or None"""
+        return self.name_index.get(name)
+
+    def find_sku(self, sku):
+        """Record of the item with this SKU (barcode), or None; one hash lookup"""
+        return self.sku_index.get(sku)
+
+    def check_sku(self, item_data, item=None):
+        """Raise DuplicateItemError if another item than item already has item_data's SKU"""
+        sku = item_data.get('sku', '')
+        existing_item = self.sku_index.get(sku) if sku else None
+        if existing_item is not None and existing_item is not item:
+            raise DuplicateItemError(f"SKU '{sku}' is already used by '{existing_item['name']}'.")
+
+    def categories(self):
+        """All categories in use, sorted"""
+        return self.category_index.categories()
+
+    def search(self, query="", category=None, limit=None):
+        """Items matching query, best match first, optionally only those in category
+
+        An empty query matches every item, in inventory order.
+        """
+        ranks = self.search_index.search(query)
+        in_category = self.category_index.items_in(category) if category else None
+        if ranks is None:
+            found = (item for item in self.items if in_category is None or item_id(item) in in_category)
+        else:
+            if self.id_records is None:
+                self.id_records = {item_id(item): item for item in self.items}
+            found = (
+                self.id_records[key] for key in ranks
+                if key in self.id_records and (in_category is None or key in in_category)
+            )
+        return list(islice(found, limit))
+
+    def categories_of(self, names):
+        """Categories of each of the named items that exist"""
+        categories = {}
+        for name in names:
+            item = self.name_index.get(name)
+            if item is not None:
+                categories[name] = item['categories']
+        return categories
+
+    def add_item(self, item_data):
+        """Validate and store a new item, returns its row"""
+        validate_item(item_data)
+        if item_data['name'] in self.name_index:
+            raise DuplicateItemError(f"An item with the name '{item_data['name']}' already exists.")
+        self.check_sku(item_data)
+
+        self.require_store().add_item(item_data)
+        row = len(self.items)
+        self.notify('inserting_item', row)
+        self.items.append(item_data)
+        self.notify('item_inserted', row)
+        self.index_item(self.items[row])
+        return row
+
+    def update_item(self, row, item_data, base=None):
+        """Replace the values of the item in row; its record stays the same object
+
+        base holds the values the change was made from (by default the
+        item as loaded). A quantity changed in the store since, by sales
+        elsewhere, is kept and the change's own quantity difference added.
+        """
+        validate_item(item_data)
+        item = self.items[row]
+        existing_item = self.name_index.get(item_data['name'])
+        if existing_item is not None and existing_item is not item:
+            raise DuplicateItemError(f"An item with the name '{item_data['name']}' already exists.")
+        self.check_sku(item_data, item)
+
+        old_name = item['name']
+        stored = self.require_store().update_item(old_name, item_data, dict(item) if base is None else base)
+        self.unindex_item(item)
+        self.items[row] = stored
+        self.index_item(item)
+        self.notify('item_replaced', row, old_name)
+
+    def delete_item(self, row):
+        """Remove the item in row, returns its detached record"""
+        self.require_store().delete_item(self.items[row]['name'])
+        self.notify('removing_item', row)
+        item = self.items.pop(row)
+        self.notify('item_removed', row, item)
+        self.unindex_item(item)
+        return item
+
+    def adjust_quantities(self, deltas):
+        """Add (name, delta) quantity changes, never going below 0; returns the changed rows
+
+        The deltas are added to the stored quantities and items takes over
+        the results, which include sales made in other windows.
+        """
+        quantities = self.require_store().adjust_quantities(deltas)
+        rows = []
+        for name, quantity in quantities.items():
+            item = self.name_index.get(name)
+            if item is None:
+                continue
+            item['quantity'] = quantity
+            rows.append(item.row)
+        self.notify('items_changed', rows)
+        return rows
+
+    def update_items(self, changes, dry_run=False):
+        """Apply (name, {field: value}) changes to existing items as one batch
+
+        Every change is checked before anything is written, then the whole
+        inventory is stored in a single write (one transaction for SQLite,
+        one snapshot swap for JSON), so either all of the changes are kept
+        or none. Changes must not rename items or change their SKU.
+        Raises BatchError listing every problem, or ConflictError when the
+        inventory was changed elsewhere since it was loaded; returns the
+        changed rows (nothing is written when dry_run is set).
+        """
+        updated = {}  # row -> new values
+        errors = []
+        for name, fields in changes:
+            item = self.name_index.get(name)
+            if item is None:
+                errors.append(f"{name}: no item with this name.")
+                continue
+            values = updated.get(item.row) or dict(item)
+            values.update(fields)
+            values['name'] = item['name']
+            values['sku'] = item['sku']
+            try:
+                validate_item(values)
+            except ValidationError as e:
+                errors.append(f"{name}: {e}")
+                continue
+            updated[item.row] = values
+        if errors:
+            raise BatchError(errors)
+
+        rows = sorted(updated)
+        if dry_run or not rows:
+            return rows
+
+        self.require_store().save_all(
+            [updated.get(row, item) for row, item in enumerate(self.items)], check_version=True
+        )
+        for row in rows:
+            item = self.items[row]
+            self.unindex_item(item)
+            self.items[row] = updated[row]
+            self.index_item(item)
+        self.notify('items_changed', rows)
+        return rows
+
+    def apply_stored_quantities(self, quantities):
+        """Take over {name: quantity} values that are already stored (by a shop server or another window)
+
+        Only memory changes; returns the rows whose quantity changed.
+        """
+        rows = []
+        for name, quantity in quantities.items():
+            item = self.name_index.get(name)
+            if item is not None and item['quantity'] != quantity:
+                item['quantity'] = quantity
+                rows.append(item.row)
+        if rows:
+            self.notify('items_changed', rows)
+        return rows
+
+    def save_all(self):
+        """Rewrite the whole inventory to the store, unless it was changed elsewhere since loading"""
+        self.require_store().save_all(self.items, check_version=True)
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+
+def open_inventory(shop_path, backend=DEFAULT_STORAGE_BACKEND, listener=None):
+    """Open the inventory of a shop folder and load its items"""
+    repository = InventoryRepository(open_inventory_store(shop_path, backend), listener)
+    repository.load()
+    return repository
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+RECEIPT_TEXT_WIDTH = 35  # characters per line on a thermal roll
+ITEM_COLUMN_WIDTH = 25
+
+
+def format_receipt_text(shop_data, cart_items, receipt_no, when=None):
+    """Plain-text receipt, as printed on thermal printers and saved as .txt"""
+    width = RECEIPT_TEXT_WIDTH
+    when = when or datetime.now()
+    receipt = []
+
+    # Header
+    receipt.append("*" * width)
+    receipt.append("RECEIPT".center(width))
+    receipt.append("*" * width)
+
+    # Shop Info
+    shop_name = shop_data.get('shop_name', 'Unknown Shop')
+    receipt.append(shop_name.center(width))
+
+    owner_name = shop_data.get('owner_name', '')
+    if owner_name:
+        receipt.append(f"Owner: {owner_name}".center(width))
+
+    address = shop_data.get('address', '')
+    if address:
+        receipt.append(address.center(width))
+
+    mobile_numbers = shop_data.get('mobile_numbers', [])
+    if mobile_numbers:
+        receipt.append(" | ".join(mobile_numbers).center(width))
+
+    receipt.append("-" * width)
+
+    # Date, time and receipt number
+    receipt.append(f"Date: {when.strftime('%d-%m-%Y')}")
+    receipt.append(f"Time: {when.strftime('%I:%M %p')}")
+    receipt.append(f"Receipt#: {receipt_no}")
+    receipt.append("-" * width)
+
+    # Items
+    receipt.append("ITEMS:")
+    receipt.append("-" * width)
+
+    for item in cart_items:
+        item_line = f"{item['quantity']} x {item['name']}"
+        if len(item_line) > ITEM_COLUMN_WIDTH:
+            item_line = item_line[:ITEM_COLUMN_WIDTH - 3] + "..."
+        price_text = f"Rs {item['total_price']:.2f}"
+        receipt.append(f"{item_line:<{ITEM_COLUMN_WIDTH}} {price_text:>9}")
+
+    receipt.append("-" * width)
+
+    # Totals
+    total_amount = sum(item['total_price'] for item in cart_items)
+    total_price = f"Rs {total_amount:.2f}"
+    receipt.append(f"{'TOTAL AMOUNT':<{ITEM_COLUMN_WIDTH}} {total_price:>9}")
+
+    receipt.append("-" * width)
+    receipt.append("THANK YOU!".center(width))
+    receipt.append("*" * width)
+
+    return "\n".join(receipt)
@@ -0,0 +1,77 @@
+import os
+import json
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    # Windows
+    import msvcrt
+    FCNTL_AVAILABLE = False
+
+LOCK_EXTENSION = ".lock"
+
+
+class FileLock:
+    """Exclusive lock on a file, shared by every window and process
+
+    Locks the companion file path + ".lock", never the data file itself,
+    so the data file can be replaced atomically while the lock is held.
+    Use as a context manager:
+
+        with FileLock(counter_path):
+            ...
+    """
+
+    def __init__(self, path):
+        self.lock_path = path + LOCK_EXTENSION
+        self.file = None
+
+    def acquire(self):
+        self.file = open(self.lock_path, 'a+')
+        try:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+            else:
+                # LK_LOCK gives up after ten one-second retries
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+        except OSError:
+            self.file.close()
+            self.file = None
+            raise
+
+    def release(self):
+        if self.file is None:
+            return
+        try:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+            else:
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+
+def write_json_atomic(path, data):
+    """Write data as JSON next to path and swap it in
+
+    Readers never see a partial file, and a crash mid-write leaves the
+    previous contents in place.
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
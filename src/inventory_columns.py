@@ -0,0 +1,275 @@
+from array import array
+from collections.abc import Mapping
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+ITEM_FIELDS = ('name', 'sku', 'categories', 'quantity', 'price')
+
+
+class ItemRecord(Mapping):
+    """Read/write view of one row of an InventoryColumns table
+
+    Behaves like the item dicts used elsewhere (item['quantity'],
+    item.get('categories', [])), but holds no values itself: they live in
+    the table's columns. A record removed from its table keeps a copy of
+    its last values so it can still be read.
+    """
+
+    __slots__ = ('table', 'row', 'detached')
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+        self.detached = None
+
+    def __getitem__(self, key):
+        if self.table is None:
+            return self.detached[key]
+        return self.table.value(self.row, key)
+
+    def __setitem__(self, key, value):
+        if self.table is None:
+            raise KeyError(f"Item '{self.detached['name']}' is no longer in the inventory")
+        self.table.set_value(self.row, key, value)
+
+    def __iter__(self):
+        return iter(ITEM_FIELDS)
+
+    def __len__(self):
+        return len(ITEM_FIELDS)
+
+    def __repr__(self):
+        return f"ItemRecord({dict(self)!r})"
+
+    def detach(self):
+        """Copy the values out of the table before the row is removed"""
+        self.detached = dict(self)
+        self.table = None
+
+
+class InventoryColumns:
+    """The inventory as typed columns instead of one dict per item
+
+    Quantities and prices are kept in typed arrays and each row's
+    categories as the id of an interned set of category ids, so an item
+    costs a few dozen bytes and totals and sorts run over whole columns.
+    Rows are read and written through ItemRecord objects, which keep their
+    identity for as long as the item is in the table.
+
+    The inventory value (overall and per category) and the out-of-stock
+    count are kept as running totals: every change subtracts the row's old
+    contribution and adds its new one, so reading them costs nothing.
+    """
+
+    def __init__(self, items=()):
+        self.names = []
+        self.skus = []
+        self.quantities = array('q')
+        self.prices = array('d')
+        self.category_set_ids = array('l')
+        self.records = []
+
+        # Interned category names and category combinations
+        self.category_names = []
+        self.category_ids = {}
+        self.category_sets = []
+        self.category_set_lookup = {}
+
+        # Running totals, category values are keyed by category id
+        self.value_total = 0.0
+        self.out_of_stock = 0
+        self.category_values = {}
+
+        for item in items:
+            self.add_row(item)
+        self.recount_totals()
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, row):
+        return self.records[row]
+
+    def __setitem__(self, row, item):
+        """Overwrite the values of a row; its record stays the same object"""
+        self.count_row(row, -1)
+        self.names[row] = item['name']
+        self.skus[row] = item.get('sku', '')
+        self.quantities[row] = item.get('quantity', 0)
+        self.prices[row] = item.get('price', 0.0)
+        self.category_set_ids[row] = self.category_set_id(item.get('categories', []))
+        self.count_row(row, 1)
+
+    def append(self, item):
+        """Add a row holding the values of item, returns its record"""
+        record = self.add_row(item)
+        self.count_row(record.row, 1)
+        return record
+
+    def add_row(self, item):
+        self.names.append(item['name'])
+        self.skus.append(item.get('sku', ''))
+        self.quantities.append(item.get('quantity', 0))
+        self.prices.append(item.get('price', 0.0))
+        self.category_set_ids.append(self.category_set_id(item.get('categories', [])))
+        record = ItemRecord(self, len(self.records))
+        self.records.append(record)
+        return record
+
+    def pop(self, row=-1):
+        """Remove a row, returns its (now detached) record"""
+        if row < 0:
+            row += len(self.records)
+        self.count_row(row, -1)
+        record = self.records.pop(row)
+        record.detach()
+        del self.names[row]
+        del self.skus[row]
+        del self.quantities[row]
+        del self.prices[row]
+        del self.category_set_ids[row]
+        for following in self.records[row:]:
+            following.row -= 1
+        return record
+
+    def category_set_id(self, categories):
+        """Id of the interned combination of categories"""
+        ids = []
+        for category in categories:
+            category_id = self.category_ids.get(category)
+            if category_id is None:
+                category_id = self.category_ids[category] = len(self.category_names)
+                self.category_names.append(category)
+            ids.append(category_id)
+
+        key = tuple(ids)
+        set_id = self.category_set_lookup.get(key)
+        if set_id is None:
+            set_id = self.category_set_lookup[key] = len(self.category_sets)
+            self.category_sets.append(key)
+        return set_id
+
+    def categories_of(self, row):
+        return [self.category_names[i] for i in self.category_sets[self.category_set_ids[row]]]
+
+    def value(self, row, key):
+        if key == 'name':
+            return self.names[row]
+        if key == 'sku':
+            return self.skus[row]
+        if key == 'quantity':
+            return self.quantities[row]
+        if key == 'price':
+            return self.prices[row]
+        if key == 'categories':
+            return self.categories_of(row)
+        raise KeyError(key)
+
+    def set_value(self, row, key, value):
+        if key == 'name':
+            self.names[row] = value
+            return
+        if key == 'sku':
+            self.skus[row] = value
+            return
+        if key not in ('quantity', 'price', 'categories'):
+            raise KeyError(key)
+
+        self.count_row(row, -1)
+        if key == 'quantity':
+            self.quantities[row] = value
+        elif key == 'price':
+            self.prices[row] = value
+        else:
+            self.category_set_ids[row] = self.category_set_id(value)
+        self.count_row(row, 1)
+
+    def count_row(self, row, sign):
+        """Add (sign=1) or take away (sign=-1) a row's share of the totals"""
+        quantity = self.quantities[row]
+        value = sign * quantity * self.prices[row]
+        self.value_total += value
+        if quantity <= 0:
+            self.out_of_stock += sign
+        category_values = self.category_values
+        for category_id in self.category_sets[self.category_set_ids[row]]:
+            category_values[category_id] = category_values.get(category_id, 0.0) + value
+
+    def recount_totals(self):
+        """Compute the running totals from scratch over the whole columns"""
+        category_values = {}
+        if NUMPY_AVAILABLE and self.records:
+            quantities = np.frombuffer(self.quantities, dtype=np.int64)
+            values = quantities * np.frombuffer(self.prices, dtype=np.float64)
+            self.value_total = float(values.sum())
+            self.out_of_stock = int(np.count_nonzero(quantities <= 0))
+            set_ids = np.frombuffer(self.category_set_ids, dtype='l')
+            set_values = np.bincount(set_ids, weights=values, minlength=len(self.category_sets)).tolist()
+        else:
+            values = list(map(float.__mul__, self.prices, map(float, self.quantities)))
+            self.value_total = sum(values)
+            self.out_of_stock = sum(1 for quantity in self.quantities if quantity <= 0)
+            set_values = [0.0] * len(self.category_sets)
+            for set_id, value in zip(self.category_set_ids, values):
+                set_values[set_id] += value
+
+        for set_id, value in enumerate(set_values):
+            for category_id in self.category_sets[set_id]:
+                category_values[category_id] = category_values.get(category_id, 0.0) + value
+        self.category_values = category_values
+
+    def export_columns(self):
+        """Copies of the name, SKU, categories, quantity and price columns
+
+        Categories are given as text, shared between rows with the same
+        combination. The copies can be read from another thread.
+        """
+        category_texts = [", ".join(self.category_names[i] for i in ids) for ids in self.category_sets]
+        categories = [category_texts[set_id] for set_id in self.category_set_ids]
+        return list(self.names), list(self.skus), categories, array('q', self.quantities), array('d', self.prices)
+
+    def search_columns(self):
+        """Copies of the name and categories columns, for indexing on another thread
+
+        Categories are given as lists, shared between rows with the same
+        combination.
+        """
+        category_lists = [[self.category_names[i] for i in ids] for ids in self.category_sets]
+        return list(self.names), [category_lists[set_id] for set_id in self.category_set_ids]
+
+    def total_value(self):
+        """Sum of quantity * price over all items"""
+        # An emptied table may be left with float rounding residue
+        return self.value_total if self.records else 0.0
+
+    def out_of_stock_count(self):
+        """Number of items with nothing left in stock"""
+        return self.out_of_stock
+
+    def category_value(self, category):
+        """Sum of quantity * price over the items in a category"""
+        category_id = self.category_ids.get(category)
+        return self.category_values.get(category_id, 0.0) if category_id is not None else 0.0
+
+    def sorted_rows(self, rows, key, descending=False):
+        """rows ordered by a field; equal values keep their order"""
+        if key in ('quantity', 'price'):
+            column = self.quantities if key == 'quantity' else self.prices
+            if NUMPY_AVAILABLE and rows:
+                rows = np.asarray(rows, dtype=np.intp)
+                values = np.frombuffer(column, dtype=np.int64 if key == 'quantity' else np.float64)[rows]
+                order = np.argsort(-values if descending else values, kind='stable')
+                return rows[order].tolist()
+            return sorted(rows, key=column.__getitem__, reverse=descending)
+
+        if key == 'name':
+            names = self.names
+            return sorted(rows, key=lambda row: names[row].lower(), reverse=descending)
+        raise KeyError(key)
@@ -0,0 +1,33 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from core.export import export_inventory, ExportCancelled
+
+
+class InventoryExportThread(QThread):
+    """Writes the inventory to an .xlsx or .csv file in the background
+
+    The file itself is written by core.export.export_inventory; this
+    thread reports its progress and outcome through signals.
+    """
+    progress = pyqtSignal(int, int)  # rows written, total rows
+    export_finished = pyqtSignal(str)
+    export_failed = pyqtSignal(str)
+
+    def __init__(self, items, file_path, parent=None):
+        super().__init__(parent)
+        # Copied so the table can keep changing while the export runs
+        self.columns = items.export_columns()
+        self.file_path = file_path
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            export_inventory(self.columns, self.file_path, self.progress.emit, lambda: self.cancelled)
+        except ExportCancelled:
+            pass
+        except Exception as e:
+            self.export_failed.emit(str(e))
+        else:
+            self.export_finished.emit(self.file_path)
@@ -0,0 +1,388 @@
+import re
+import threading
+
+WORD_RE = re.compile(r"\w+")
+
+# Match qualities used to rank search results
+EXACT_MATCH = 4
+PREFIX_MATCH = 3
+SUBSTRING_MATCH = 2
+FUZZY_MATCH = 1
+
+NAME_WEIGHT = 2
+CATEGORY_WEIGHT = 1
+NAME_PREFIX_BONUS = 5
+
+
+def item_id(item):
+    """Identity of an in-memory item record, stable while it is loaded"""
+    return id(item)
+
+
+def name_key(name):
+    """Key used to compare item names ignoring case"""
+    return name.casefold()
+
+
+class NameIndex:
+    """Maps case-folded item names to their item records"""
+
+    def __init__(self, items=()):
+        self.records = {}
+        self.rebuild(items)
+
+    def rebuild(self, items):
+        self.records = {name_key(item['name']): item for item in items}
+
+    def add(self, item):
+        self.records[name_key(item['name'])] = item
+
+    def remove(self, item):
+        key = name_key(item['name'])
+        if self.records.get(key) is item:
+            del self.records[key]
+
+    def get(self, name):
+        """Return the record named name (ignoring case), or None"""
+        return self.records.get(name_key(name))
+
+    def __contains__(self, name):
+        return name_key(name) in self.records
+
+    def __len__(self):
+        return len(self.records)
+
+
+def sku_key(sku):
+    """Key used to look up SKUs, ignoring case and stray spaces around a scan"""
+    return sku.strip().casefold()
+
+
+class SkuIndex:
+    """Maps SKUs (barcodes) to their item records; items without one are left out"""
+
+    def __init__(self, items=()):
+        self.records = {}
+        self.rebuild(items)
+
+    def rebuild(self, items):
+        self.records = {sku_key(item['sku']): item for item in items if item.get('sku')}
+
+    def add(self, item):
+        if item.get('sku'):
+            self.records[sku_key(item['sku'])] = item
+
+    def remove(self, item):
+        if not item.get('sku'):
+            return
+        key = sku_key(item['sku'])
+        if self.records.get(key) is item:
+            del self.records[key]
+
+    def get(self, sku):
+        """Return the record with this SKU (ignoring case), or None"""
+        return self.records.get(sku_key(sku))
+
+    def __contains__(self, sku):
+        return sku_key(sku) in self.records
+
+    def __len__(self):
+        return len(self.records)
+
+
+class CategoryIndex:
+    """Inverted index from category name to the ids of the items in it
+
+    version changes whenever a category appears or disappears, so callers
+    can tell when lists built from categories() need rebuilding.
+    """
+
+    def __init__(self, items=()):
+        self.item_ids = {}
+        self.version = 0
+        self.sorted_categories = []
+        self.rebuild(items)
+
+    def rebuild(self, items):
+        self.item_ids = {}
+        for item in items:
+            for category in item.get('categories', []):
+                self.item_ids.setdefault(category, set()).add(item_id(item))
+        self.categories_changed()
+
+    def add(self, item):
+        for category in item.get('categories', []):
+            ids = self.item_ids.get(category)
+            if ids is None:
+                ids = self.item_ids[category] = set()
+                self.categories_changed()
+            ids.add(item_id(item))
+
+    def remove(self, item):
+        for category in item.get('categories', []):
+            ids = self.item_ids.get(category)
+            if ids is None:
+                continue
+            ids.discard(item_id(item))
+            if not ids:
+                del self.item_ids[category]
+                self.categories_changed()
+
+    def categories_changed(self):
+        self.version += 1
+        self.sorted_categories = None
+
+    def categories(self):
+        """All categories in use, sorted"""
+        if self.sorted_categories is None:
+            self.sorted_categories = sorted(self.item_ids)
+        return self.sorted_categories
+
+    def items_in(self, category):
+        """Ids of the items in a category"""
+        return self.item_ids.get(category, frozenset())
+
+
+def search_words(text):
+    """Normalized words of text; punctuated words are also kept joined ("5w-30" -> "5w30")"""
+    words = []
+    for chunk in text.casefold().split():
+        parts = WORD_RE.findall(chunk)
+        words.extend(parts)
+        if len(parts) > 1:
+            words.append("".join(parts))
+    return words
+
+
+def word_grams(word, padded=False):
+    """Trigrams of a word, padded with spaces to mark its start and end"""
+    if padded:
+        word = f" {word} "
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """Edit distance counting adjacent swaps as one edit, capped at limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    before_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before_previous[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        before_previous, previous = previous, current
+    return previous[-1]
+
+
+class SearchIndex:
+    """Ranked substring, prefix and typo-tolerant search over names and categories
+
+    Items are split into words. Distinct words are indexed by trigram (and
+    by their first one or two characters for very short queries), so a
+    query only ever scans the vocabulary entries that share its grams.
+    Words stay in the vocabulary until the next rebuild even when no item
+    uses them any more; they simply match nothing.
+    Every query word must match; matches in the item name outrank matches
+    in its categories, and exact > prefix > substring > typo matches.
+
+    A rebuild indexes a copy of the names and categories on a background
+    thread, so loading a large inventory does not wait for it. Items added
+    or removed meanwhile are queued and applied once it is done; a search
+    waits for what is left of the build.
+    """
+
+    FUZZY_CANDIDATES = 200
+
+    def __init__(self):
+        self.builder = None
+        self.queued = []  # (add or remove, item) made while the build runs
+        self.clear()
+
+    def rebuild(self, items):
+        """Index the items of an InventoryColumns table again, in the background"""
+        # The thread must not write into the new tables an earlier one is left with
+        if self.builder is not None:
+            self.builder.join()
+            self.builder = None
+        self.clear()
+        self.queued = []
+        if len(items):
+            names, categories = items.search_columns()
+            entries = zip([item_id(item) for item in items], names, categories)
+            self.builder = threading.Thread(target=self.build, args=(entries,), daemon=True)
+            self.builder.start()
+
+    def clear(self):
+        self.item_words = {}
+        self.name_word_items = {}
+        self.category_word_items = {}
+        self.vocabulary = set()
+        self.gram_words = {}
+        self.prefix_words = {}
+        self.category_words = {}
+
+    def build(self, entries):
+        for key, name, categories in entries:
+            self.index(key, name, categories)
+
+    def building(self):
+        """Whether the background build still runs; takes in the changes queued meanwhile once done"""
+        if self.builder is None:
+            return False
+        if self.builder.is_alive():
+            return True
+        self.wait_for_build()
+        return False
+
+    def wait_for_build(self):
+        if self.builder is None:
+            return
+        self.builder.join()
+        self.builder = None
+        queued, self.queued = self.queued, []
+        for change, item in queued:
+            change(item)
+
+    def add(self, item):
+        if self.building():
+            self.queued.append((self.add, item))
+            return
+        self.index(item_id(item), item.get('name', ''), item.get('categories', []))
+
+    def index(self, key, name, categories):
+        name_words = set(search_words(name))
+        category_words = set()
+        for category in categories:
+            words = self.category_words.get(category)
+            if words is None:
+                words = self.category_words[category] = search_words(category)
+            category_words.update(words)
+        self.item_words[key] = (name_words, category_words, name.casefold())
+
+        for words, word_items in ((name_words, self.name_word_items),
+                                  (category_words, self.category_word_items)):
+            for word in words:
+                ids = word_items.get(word)
+                if ids is None:
+                    ids = word_items[word] = set()
+                    if word not in self.vocabulary:
+                        self.add_word(word)
+                ids.add(key)
+
+    def remove(self, item):
+        if self.building():
+            self.queued.append((self.remove, item))
+            return
+
+        key = item_id(item)
+        entry = self.item_words.pop(key, None)
+        if entry is None:
+            return
+
+        name_words, category_words, _ = entry
+        for words, word_items in ((name_words, self.name_word_items),
+                                  (category_words, self.category_word_items)):
+            for word in words:
+                ids = word_items[word]
+                ids.discard(key)
+                if not ids:
+                    del word_items[word]
+
+    def add_word(self, word):
+        """Add a new word to the vocabulary"""
+        self.vocabulary.add(word)
+        for gram in word_grams(word, padded=True):
+            self.gram_words.setdefault(gram, set()).add(word)
+        for length in (1, 2):
+            if len(word) >= length:
+                self.prefix_words.setdefault(word[:length], set()).add(word)
+
+    def match_words(self, token):
+        """Vocabulary words matching a query word, with their match quality"""
+        if len(token) < 3:
+            candidates = self.prefix_words.get(token, ())
+        else:
+            postings = sorted((self.gram_words.get(gram, set()) for gram in word_grams(token)), key=len)
+            candidates = set.intersection(*postings) if postings and postings[0] else set()
+
+        matches = {}
+        for word in candidates:
+            if word == token:
+                matches[word] = EXACT_MATCH
+            elif word.startswith(token):
+                matches[word] = PREFIX_MATCH
+            elif token in word:
+                matches[word] = SUBSTRING_MATCH
+
+        if not matches and len(token) >= 3:
+            matches = self.fuzzy_match_words(token)
+        return matches
+
+    def fuzzy_match_words(self, token):
+        """Words within one or two typos of token, or of its start"""
+        # Short words can share no trigram with their typo ("oli" / "oil"),
+        # so words with the same first letter are candidates too
+        shared = dict.fromkeys(self.prefix_words.get(token[0], ()), 1)
+        for gram in word_grams(token, padded=True):
+            for word in self.gram_words.get(gram, ()):
+                shared[word] = shared.get(word, 0) + 1
+
+        limit = 1 if len(token) <= 5 else 2
+        candidates = sorted(shared, key=shared.get, reverse=True)[:self.FUZZY_CANDIDATES]
+        matches = {}
+        for word in candidates:
+            # A half-typed word is compared with the start of the word
+            if (edit_distance(token, word, limit) <= limit
+                    or edit_distance(token, word[:len(token)], limit) <= limit):
+                matches[word] = FUZZY_MATCH
+        return matches
+
+    def search(self, query):
+        """Rank the items matching query
+
+        Returns a dict of item id -> rank (0 is the best match), or None
+        for an empty query.
+        """
+        tokens = list(dict.fromkeys(search_words(query)))
+        if not tokens:
+            return None
+        self.wait_for_build()
+
+        results = None
+        for token in tokens:
+            scores = {}
+            for word, quality in self.match_words(token).items():
+                for word_items, weight in ((self.name_word_items, NAME_WEIGHT),
+                                           (self.category_word_items, CATEGORY_WEIGHT)):
+                    score = quality * weight
+                    for key in word_items.get(word, ()):
+                        if scores.get(key, 0) < score:
+                            scores[key] = score
+
+            if results is None:
+                results = scores
+            else:
+                results = {key: score + scores[key] for key, score in results.items() if key in scores}
+            if not results:
+                return {}
+
+        # Fold the name-prefix bonus and a shorter-name-first tie break
+        # into one number so the sort needs no Python-level key function
+        phrase = query.casefold().strip()
+        item_words = self.item_words
+        for key, score in results.items():
+            name = item_words[key][2]
+            if name.startswith(phrase):
+                score += NAME_PREFIX_BONUS
+            results[key] = score * 1024 - min(len(name), 1023)
+
+        ranked = sorted(results, key=results.__getitem__, reverse=True)
+        return {key: rank for rank, key in enumerate(ranked)}
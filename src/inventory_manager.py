@@ -1,27 +1,42 @@
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QPushButton,
-    QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QVBoxLayout, QHBoxLayout, QTableView,
     QLineEdit, QMessageBox, QHeaderView, QAbstractItemView,
     QSpinBox, QDoubleSpinBox, QDialog, QFormLayout, QDialogButtonBox,
     QComboBox, QGroupBox, QListWidget,
-    QListWidgetItem, QCheckBox
+    QListWidgetItem, QCheckBox, QFileDialog, QProgressDialog, QShortcut
 )
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont, QKeySequence
 import os
 import json
 import sys
+import importlib.util
 from datetime import datetime
-import pandas as pd
 from carted_items import CartDialog
 from path_utilis import get_base_path
+from inventory_store import open_inventory_store, DEFAULT_STORAGE_BACKEND
+from core import (
+    InventoryRepository, ValidationError, DuplicateItemError, ConflictError,
+    Cart, InvalidQuantityError, InsufficientStockError, CheckoutService
+)
+from sales_ledger import open_sales_ledger
+from shop_client import SHOP_SERVER_KEY, SHOP_TOKEN_KEY, get_shop_client, RemoteInventoryStore, RemoteCheckoutService
+from changes_poll import ChangesPollThread
+from inventory_table_model import (
+    InventoryTableModel, InventoryFilterProxyModel, QuantitySpinBoxDelegate,
+    AddToCartButtonDelegate, NAME_COLUMN, SKU_COLUMN, CATEGORIES_COLUMN, QUANTITY_COLUMN,
+    PRICE_COLUMN, SELECT_QTY_COLUMN, ADD_TO_CART_COLUMN, ALL_CATEGORIES
+)
 
-# Import the print receipt functionality
+# Import the print receipt functionality. print_receipt itself (and with it
+# the printer and PDF libraries) is only imported when a receipt is printed.
 try:
-    from print_receipt import show_print_receipt_dialog
-    PRINT_RECEIPT_AVAILABLE = True
+    from print_spooler import get_print_spooler, JOB_QUEUED, JOB_PRINTING, JOB_RETRYING, JOB_DONE, JOB_FAILED
+    PRINT_RECEIPT_AVAILABLE = importlib.util.find_spec("print_receipt") is not None
 except ImportError:
     PRINT_RECEIPT_AVAILABLE = False
+if not PRINT_RECEIPT_AVAILABLE:
     print("Warning: print_receipt.py not found. Print functionality will be limited.")
 
 # Get the directory paths
@@ -38,6 +53,10 @@ except ImportError:
 
 # DATA_DIR = os.path.join(get_base_path(), 'data')
 DATA_DIR = os.path.join(get_base_path(), 'data')
+SEARCH_DELAY_MS = 200
+CHANGES_POLL_MS = 2000  # how often changes made in other windows, processes or tills are picked up
+MAX_CHANGES_POLL_MS = 60000  # longest wait between polls while the store cannot be reached
+SCAN_MESSAGE_MS = 4000  # how long the outcome of a barcode scan stays in the status bar
 
 class CategorySelectionWidget(QWidget):
     """Custom widget for selecting multiple categories"""
@@ -176,6 +195,11 @@ class AddItemDialog(QDialog):
         self.name_input = QLineEdit()
         form_layout.addRow("Item Name:", self.name_input)
 
+        # SKU / barcode, optional
+        self.sku_input = QLineEdit()
+        self.sku_input.setPlaceholderText("Scan or type the barcode (optional)")
+        form_layout.addRow("SKU / Barcode:", self.sku_input)
+
         # Category Selection Widget
         current_categories = self.item_data.get('categories', []) if self.edit_mode else []
         self.category_widget = CategorySelectionWidget(
@@ -214,6 +238,7 @@ class AddItemDialog(QDialog):
     def load_item_data(self):
         """Load existing item data for editing"""
         self.name_input.setText(self.item_data.get('name', ''))
+        self.sku_input.setText(self.item_data.get('sku', ''))
         self.quantity_input.setValue(self.item_data.get('quantity', 0))
         self.price_input.setValue(self.item_data.get('price', 0.0))
 
@@ -229,11 +254,19 @@ class AddItemDialog(QDialog):
         """Get the item data from the form"""
         return {
             'name': self.name_input.text().strip(),
+            'sku': self.sku_input.text().strip(),
             'categories': self.category_widget.get_selected_categories(),
             'quantity': self.quantity_input.value(),
             'price': self.price_input.value()
         }
 
+    def keyPressEvent(self, event):
+        # Barcode scanners end a scan with Enter, which must not close the dialog
+        if self.sku_input.hasFocus() and event.key() in (Qt.Key_Return, Qt.Key_Enter):
+            self.quantity_input.setFocus()
+            return
+        super().keyPressEvent(event)
+
     def accept(self):
         """Override accept method to validate before accepting"""
         if not self.validate_data():
@@ -263,14 +296,30 @@ class InventoryManager(QMainWindow):
         self.previous_window = previous_window
         self.shop_path = os.path.join(DATA_DIR, shop_folder)
         self.inventory_file = os.path.join(self.shop_path, "inventory.json")
-        self.inventory_data = []
-        self.cart_items = []
+        self.inventory = InventoryRepository(None)
+        self.cart = Cart()
+        self.sales_ledger = None
+        self.checkout_service = None
+        self.export_thread = None
+        self.poll_thread = None
+        self.categories_version = None
+        self.print_jobs = set()  # ids of the receipts this window queued for printing
 
         self.load_shop_info()
+        self.open_store()
         self.load_inventory_data()
         self.setup_ui()
         self.populate_table()
 
+        if self.inventory.store is not None:
+            self.changes_timer = QTimer(self)
+            self.changes_timer.setInterval(CHANGES_POLL_MS)
+            self.changes_timer.timeout.connect(self.poll_changes)
+            self.changes_timer.start()
+
+        if PRINT_RECEIPT_AVAILABLE:
+            get_print_spooler().job_status.connect(self.on_print_job_status)
+
     def load_shop_info(self):
         """Load shop information"""
         info_path = os.path.join(self.shop_path, "shop_info.json")
@@ -280,43 +329,70 @@ class InventoryManager(QMainWindow):
         except:
             self.shop_info = {"shop_name": self.shop_folder}
 
+    def open_store(self):
+        """Open the storage backend configured for this shop"""
+        shop_server = self.shop_info.get(SHOP_SERVER_KEY)
+        if shop_server:
+            # The shop server keeps the inventory, the sales and the receipt numbers
+            client = get_shop_client(shop_server, self.shop_info.get(SHOP_TOKEN_KEY))
+            self.inventory = InventoryRepository(RemoteInventoryStore(client))
+            self.sales_ledger = None
+            self.checkout_service = RemoteCheckoutService(client, self.inventory)
+            return
+
+        backend = self.shop_info.get('storage_backend', DEFAULT_STORAGE_BACKEND)
+        try:
+            self.inventory = InventoryRepository(open_inventory_store(self.shop_path, backend))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to open inventory storage: {str(e)}")
+            self.inventory = InventoryRepository(None)
+
+        try:
+            self.sales_ledger = open_sales_ledger(self.shop_path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to open the sales ledger: {str(e)}")
+            self.sales_ledger = None
+
+        self.checkout_service = CheckoutService(self.inventory, self.sales_ledger)
+
+    @property
+    def inventory_data(self):
+        """The shop's items, kept by the inventory repository"""
+        return self.inventory.items
+
     def load_inventory_data(self):
-        """Load inventory data from JSON file"""
+        """Load inventory data from the storage backend"""
+        if self.inventory.store is None:
+            return
+
         try:
-            if os.path.exists(self.inventory_file):
-                with open(self.inventory_file, 'r') as f:
-                    self.inventory_data = json.load(f)
-
-                # Convert old format to new format (backward compatibility)
-                for item in self.inventory_data:
-                    if 'category' in item and 'categories' not in item:
-                        item['categories'] = [item['category']] if item['category'] else []
-                        del item['category']
-                    elif 'categories' not in item:
-                        item['categories'] = []
-            else:
-                self.inventory_data = []
+            self.inventory.load()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load inventory data: {str(e)}")
-            self.inventory_data = []
 
     def save_inventory_data(self):
-        """Save inventory data to JSON file"""
+        """Save the whole inventory to the storage backend"""
+        return self.write_to_store(self.inventory.save_all)
+
+    def write_to_store(self, operation, *args):
+        """Apply a change through the inventory repository, showing why it failed"""
         try:
-            with open(self.inventory_file, 'w') as f:
-                json.dump(self.inventory_data, f, indent=4)
+            operation(*args)
             return True
+        except DuplicateItemError as e:
+            QMessageBox.warning(self, "Duplicate Item", str(e))
+        except ConflictError as e:
+            QMessageBox.warning(self, "Changed Elsewhere", str(e))
+            self.reload_inventory()
+        except ValidationError as e:
+            QMessageBox.warning(self, "Validation Error", str(e))
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save inventory data: {str(e)}")
-            return False
+        return False
 
     def get_all_categories(self):
         """Get all unique categories from inventory"""
-        categories = set()
-        for item in self.inventory_data:
-            item_categories = item.get('categories', [])
-            categories.update(item_categories)
-        return list(categories)
+        return list(self.inventory.categories())
 
     def setup_ui(self):
         self.setWindowTitle(f"Inventory Management - {self.shop_info.get('shop_name', 'Unknown Shop')}")
@@ -350,6 +426,9 @@ class InventoryManager(QMainWindow):
         status_layout = self.create_status_section()
         main_layout.addLayout(status_layout)
 
+        # Ready for the first scan
+        self.scan_input.setFocus()
+
     def create_header(self):
         """Create header section with shop info"""
         layout = QHBoxLayout()
@@ -394,19 +473,36 @@ class InventoryManager(QMainWindow):
         # Search box
         search_label = QLabel("Search:")
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Search by item name, category, or supplier...")
-        self.search_input.textChanged.connect(self.filter_table)
+        self.search_input.setPlaceholderText("Search by item name or category...")
+
+        # Re-filter once typing pauses instead of on every keystroke
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.filter_table)
+        self.search_input.textChanged.connect(self.search_timer.start)
 
         # Category filter
         category_label = QLabel("Category:")
         self.category_filter = QComboBox()
-        self.category_filter.addItem("All Categories")
+        self.category_filter.addItem(ALL_CATEGORIES)
         self.category_filter.currentTextChanged.connect(self.filter_table)
+        self.category_filter.currentTextChanged.connect(self.update_status_info)
+
+        # Barcode scanner input: a scanner types the SKU and presses Enter
+        scan_label = QLabel("Scan:")
+        self.scan_input = QLineEdit()
+        self.scan_input.setPlaceholderText("Scan a barcode to add it to the cart (F2)")
+        self.scan_input.returnPressed.connect(self.scan_to_cart)
+        scan_shortcut = QShortcut(QKeySequence(Qt.Key_F2), self)
+        scan_shortcut.activated.connect(self.scan_input.setFocus)
 
         layout.addWidget(search_label)
         layout.addWidget(self.search_input, 2)
         layout.addWidget(category_label)
         layout.addWidget(self.category_filter, 1)
+        layout.addWidget(scan_label)
+        layout.addWidget(self.scan_input, 1)
 
         return layout
 
@@ -518,6 +614,23 @@ class InventoryManager(QMainWindow):
         """)
         export_btn.clicked.connect(self.export_to_excel)
 
+        # Sales Report button
+        report_btn = QPushButton("📈 Sales Report")
+        report_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #6f42c1;
+                color: white;
+                border: none;
+                padding: 10px 20px;
+                border-radius: 4px;
+                font-size: 14px;
+            }
+            QPushButton:hover {
+                background-color: #59359a;
+            }
+        """)
+        report_btn.clicked.connect(self.show_sales_report)
+
         # Refresh button
         refresh_btn = QPushButton("🔄 Refresh")
         refresh_btn.setStyleSheet("""
@@ -542,44 +655,68 @@ class InventoryManager(QMainWindow):
         layout.addStretch()
         layout.addWidget(cart_btn)
         layout.addWidget(export_btn)
+        layout.addWidget(report_btn)
         layout.addWidget(refresh_btn)
 
         return layout
 
     def create_table(self):
         """Create the inventory table"""
-        self.table = QTableWidget()
-
-        self.table.setColumnCount(6)
-        self.table.verticalHeader().setDefaultSectionSize(40)
-        self.table.setHorizontalHeaderLabels([
-            "Item Name", "Categories", "Quantity", "Price (Rs)" , "Select Qty", "Add to Cart"
-        ])
+        self.table_model = InventoryTableModel(self.inventory_data, self)
+        self.inventory.listener = self.table_model
+        self.proxy_model = InventoryFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.table_model)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy_model)
+
+        # Quantity picker and cart button are painted, not per-row widgets
+        self.qty_delegate = QuantitySpinBoxDelegate(self.table)
+        self.cart_button_delegate = AddToCartButtonDelegate(self.table)
+        self.cart_button_delegate.clicked.connect(self.on_add_to_cart_clicked)
+        self.table.setItemDelegateForColumn(SELECT_QTY_COLUMN, self.qty_delegate)
+        self.table.setItemDelegateForColumn(ADD_TO_CART_COLUMN, self.cart_button_delegate)
+        self.table.setEditTriggers(QAbstractItemView.CurrentChanged | QAbstractItemView.SelectedClicked)
+        self.table.setMouseTracking(True)
+
+        vertical_header = self.table.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(40)
 
         # Table settings
         self.table.setAlternatingRowColors(True)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        # Keep the stored order until a column header is clicked
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
         self.table.setSortingEnabled(True)
 
         # Column widths
         header = self.table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.Stretch)  # Item Name
-        header.setSectionResizeMode(1, QHeaderView.Stretch)  # Categories
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)  # Quantity
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)  # Unit Price
-        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)  # Select Quantity
-        header.setSectionResizeMode(5, QHeaderView.ResizeToContents)  # Add to Cart
+        header.setSectionResizeMode(NAME_COLUMN, QHeaderView.Stretch)
+        header.setSectionResizeMode(SKU_COLUMN, QHeaderView.Interactive)
+        header.setSectionResizeMode(CATEGORIES_COLUMN, QHeaderView.Stretch)
+        # Not ResizeToContents: that re-measures up to 1000 rows on every
+        # change, which would make each scan or sale repaint slowly
+        header.setSectionResizeMode(QUANTITY_COLUMN, QHeaderView.Interactive)
+        header.setSectionResizeMode(PRICE_COLUMN, QHeaderView.Interactive)
+        header.setSectionResizeMode(SELECT_QTY_COLUMN, QHeaderView.Fixed)
+        header.setSectionResizeMode(ADD_TO_CART_COLUMN, QHeaderView.Fixed)
+        header.resizeSection(SKU_COLUMN, 130)
+        header.resizeSection(QUANTITY_COLUMN, 100)
+        header.resizeSection(PRICE_COLUMN, 130)
+        header.resizeSection(SELECT_QTY_COLUMN, 130)
+        header.resizeSection(ADD_TO_CART_COLUMN, 130)
 
         # Style the table
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #d0d0d0;
                 background-color: white;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #007bff;
                 color: white;
             }
@@ -591,15 +728,23 @@ class InventoryManager(QMainWindow):
             }
         """)
 
+    def selected_row(self):
+        """Row in inventory_data of the current table selection, or -1"""
+        index = self.table.currentIndex()
+        if not index.isValid():
+            return -1
+        return self.proxy_model.mapToSource(index).row()
+
     def create_status_section(self):
         """Create status section showing summary info"""
         layout = QHBoxLayout()
 
         self.total_items_label = QLabel("Total Items: 0")
         self.total_value_label = QLabel("Total Value: Rs 0.00")
+        self.out_of_stock_label = QLabel("Out of Stock: 0")
 
         # Style the status labels
-        for label in [self.total_items_label, self.total_value_label]:
+        for label in [self.total_items_label, self.total_value_label, self.out_of_stock_label]:
             label.setStyleSheet("""
                 QLabel {
                     background-color: #f8f9fa;
@@ -611,73 +756,38 @@ class InventoryManager(QMainWindow):
             """)
         layout.addWidget(self.total_items_label)
         layout.addWidget(self.total_value_label)
+        layout.addWidget(self.out_of_stock_label)
         layout.addStretch()
 
         return layout
 
     def populate_table(self):
         """Populate the table with inventory data"""
-        self.table.setRowCount(len(self.inventory_data))
-
-        all_categories = set()
-
-        for row, item in enumerate(self.inventory_data):
-            # Item Name
-            self.table.setItem(row, 0, QTableWidgetItem(item.get('name', '')))
-
-            # Categories
-            categories = item.get('categories', [])
-            all_categories.update(categories)
-            categories_text = ", ".join(sorted(categories)) if categories else "No Category"
-            self.table.setItem(row, 1, QTableWidgetItem(categories_text))
-
-            # Quantity
-            quantity = item.get('quantity', 0)
-            quantity_item = QTableWidgetItem(str(quantity))
-            quantity_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 2, quantity_item)
-
-            # Price (in Rs)
-            price = item.get('price', 0.0)
-            price_item = QTableWidgetItem(f"Rs {price:.2f}")
-            price_item.setTextAlignment(Qt.AlignRight)
-            self.table.setItem(row, 3, price_item)
-
-             # Select Quantity Spinbox
-            qty_spinbox = QSpinBox()
-            qty_spinbox.setRange(0, quantity)
-            qty_spinbox.setValue(0)
-            self.table.setCellWidget(row, 4, qty_spinbox)
-
-            # Add to Cart Button
-            cart_button = QPushButton("Add to Cart")
-            cart_button.setStyleSheet("""
-                QPushButton {
-                    background-color: #28a745;
-                    color: white;
-                    border: none;
-                    padding: 5px 10px;
-                    border-radius: 3px;
-                    font-size: 10px;
-                }
-                QPushButton:hover {
-                    background-color: #218838;
-                }
-            """)
-            cart_button.clicked.connect(lambda checked, r=row: self.add_to_cart(r))
-            self.table.setCellWidget(row, 5, cart_button)
-
-        # Update category filter
-        self.update_category_filter(all_categories)
+        self.table_model.set_items(self.inventory_data)
+        self.table_model.set_reserved_quantities(self.cart.items)
+
+        self.categories_version = None
+        self.refresh_summary()
+
+    def refresh_summary(self):
+        """Refresh the category filter and status labels after a change"""
+        # Rebuilding the combo resets its popup, so only do it when needed
+        category_index = self.inventory.category_index
+        if category_index.version != self.categories_version:
+            self.categories_version = category_index.version
+            self.update_category_filter(category_index.categories())
         self.update_status_info()
 
     def update_category_filter(self, categories):
         """Update the category filter dropdown"""
         current_selection = self.category_filter.currentText()
+
+        # Rebuild without filtering the table on every intermediate text
+        self.category_filter.blockSignals(True)
         self.category_filter.clear()
-        self.category_filter.addItem("All Categories")
+        self.category_filter.addItem(ALL_CATEGORIES)
 
-        for category in sorted(categories):
+        for category in categories:
             if category:  # Only add non-empty categories
                 self.category_filter.addItem(category)
 
@@ -685,41 +795,30 @@ class InventoryManager(QMainWindow):
         index = self.category_filter.findText(current_selection)
         if index >= 0:
             self.category_filter.setCurrentIndex(index)
+        self.category_filter.blockSignals(False)
+        self.filter_table()
 
     def update_status_info(self):
         """Update the status information labels"""
+        # Read from the running totals kept by inventory_data
         total_items = len(self.inventory_data)
-        total_value = sum(item.get('quantity', 0) * item.get('price', 0.0) for item in self.inventory_data)
+        total_value = self.inventory_data.total_value()
+        value_text = f"Total Inventory Value: Rs {total_value:.2f}"
+
+        category = self.category_filter.currentText()
+        if category != ALL_CATEGORIES:
+            value_text += f" ({category}: Rs {self.inventory_data.category_value(category):.2f})"
 
         self.total_items_label.setText(f"Total Items: {total_items}")
-        self.total_value_label.setText(f"Total Inventory Value: Rs {total_value:.2f}")
+        self.total_value_label.setText(value_text)
+        self.out_of_stock_label.setText(f"Out of Stock: {self.inventory_data.out_of_stock_count()}")
 
     def filter_table(self):
         """Filter the table based on search criteria"""
-        search_text = self.search_input.text().lower()
-        category_filter = self.category_filter.currentText()
-
-        for row in range(self.table.rowCount()):
-            show_row = True
-
-            # Get item data for this row
-            item_data = self.inventory_data[row] if row < len(self.inventory_data) else {}
-
-            # Search filter
-            if search_text:
-                item_name = self.table.item(row, 0).text().lower() if self.table.item(row, 0) else ""
-                categories = self.table.item(row, 1).text().lower() if self.table.item(row, 1) else ""
-
-                if not (search_text in item_name or search_text in categories):
-                    show_row = False
-
-            # Category filter
-            if category_filter != "All Categories":
-                item_categories = item_data.get('categories', [])
-                if category_filter not in item_categories:
-                    show_row = False
-
-            self.table.setRowHidden(row, not show_row)
+        category = self.category_filter.currentText()
+        category_items = None if category == ALL_CATEGORIES else self.inventory.category_index.items_in(category)
+        search_ranks = self.inventory.search_index.search(self.search_input.text())
+        self.proxy_model.set_filter(search_ranks, category_items)
 
     def add_item(self):
         """Add a new item to inventory"""
@@ -729,21 +828,14 @@ class InventoryManager(QMainWindow):
         if dialog.exec_() == QDialog.Accepted:
             item_data = dialog.get_item_data()
 
-            # Check for duplicates
-            for existing_item in self.inventory_data:
-                if existing_item['name'].lower() == item_data['name'].lower():
-                    QMessageBox.warning(self, "Duplicate Item",
-                                        f"An item with the name '{item_data['name']}' already exists.")
-                    return
-
-            self.inventory_data.append(item_data)
-            if self.save_inventory_data():
-                self.populate_table()
+            # Validation, the duplicate check and storage happen in the repository
+            if self.write_to_store(self.inventory.add_item, item_data):
+                self.refresh_summary()
                 QMessageBox.information(self, "Success", "Item added successfully!")
 
     def edit_item(self):
         """Edit the selected item"""
-        current_row = self.table.currentRow()
+        current_row = self.selected_row()
         if current_row < 0:
             QMessageBox.warning(self, "No Selection", "Please select an item to edit.")
             return
@@ -760,21 +852,13 @@ class InventoryManager(QMainWindow):
             if dialog.validate_data():
                 updated_data = dialog.get_item_data()
 
-                # Check for duplicate names (excluding current item)
-                for i, existing_item in enumerate(self.inventory_data):
-                    if i != current_row and existing_item['name'].lower() == updated_data['name'].lower():
-                        QMessageBox.warning(self, "Duplicate Item",
-                                          f"An item with the name '{updated_data['name']}' already exists.")
-                        return
-
-                self.inventory_data[current_row] = updated_data
-                if self.save_inventory_data():
-                    self.populate_table()
+                if self.write_to_store(self.inventory.update_item, current_row, updated_data):
+                    self.refresh_summary()
                     QMessageBox.information(self, "Success", "Item updated successfully!")
 
     def delete_item(self):
         """Delete the selected item"""
-        current_row = self.table.currentRow()
+        current_row = self.selected_row()
         if current_row < 0:
             QMessageBox.warning(self, "No Selection", "Please select an item to delete.")
             return
@@ -793,9 +877,8 @@ class InventoryManager(QMainWindow):
         )
 
         if reply == QMessageBox.Yes:
-            del self.inventory_data[current_row]
-            if self.save_inventory_data():
-                self.populate_table()
+            if self.write_to_store(self.inventory.delete_item, current_row):
+                self.refresh_summary()
                 QMessageBox.information(self, "Success", "Item deleted successfully!")
 
     def print_receipt(self):
@@ -807,28 +890,17 @@ class InventoryManager(QMainWindow):
         if PRINT_RECEIPT_AVAILABLE:
             try:
                 # Use the integrated print receipt functionality
-                is_receipt_successful = show_print_receipt_dialog(self, self.cart_items)
-
-               # If receipt was successfully printed, update inventory quantities
-                if is_receipt_successful == True:
-                    # Update inventory data by reducing quantities
-                    for cart_item in self.cart_items:
-                        for inventory_item in self.inventory_data:
-                            if inventory_item['name'] == cart_item['name']:
-                                # Reduce the quantity in inventory
-                                inventory_item['quantity'] -= cart_item['quantity']
-                                # Ensure quantity doesn't go below 0
-                                if inventory_item['quantity'] < 0:
-                                    inventory_item['quantity'] = 0
-                                break
-
-                    # Clear the cart after successful transaction
-                    self.cart_items.clear()
-
-
-                # Save inventory data after printing receipt (in case of changes)
-                self.save_inventory_data()
-                self.populate_table()
+                from print_receipt import show_print_receipt_dialog
+                receipt_no = show_print_receipt_dialog(self, self.cart.items, self.print_jobs)
+
+                # If receipt was successfully printed, record the sale, update
+                # inventory quantities and empty the cart
+                if receipt_no:
+                    result = self.checkout_service.checkout(self.cart, receipt_no)
+                    for error in result['errors']:
+                        QMessageBox.critical(self, "Error", error)
+                    self.table_model.set_reserved_quantities(self.cart.items)
+                    self.update_status_info()
             except Exception as e:
                 QMessageBox.critical(self, "Print Error",
                                    f"An error occurred while trying to print receipt:\n{str(e)}\n\n"
@@ -845,46 +917,151 @@ class InventoryManager(QMainWindow):
                                   "• Payment tracking with change calculation\n\n"
                                   "Please ensure print_receipt.py is in the same directory.")
 
+    def on_print_job_status(self, job_id, receipt_no, status, message):
+        """Show the progress of a receipt this window queued on the thermal print spooler"""
+        if job_id not in self.print_jobs:
+            return
+        if status in (JOB_DONE, JOB_FAILED):
+            self.print_jobs.discard(job_id)
+
+        if status == JOB_QUEUED:
+            self.statusBar().showMessage(f"Receipt {receipt_no} queued for printing")
+        elif status == JOB_PRINTING:
+            self.statusBar().showMessage(f"Printing receipt {receipt_no}...")
+        elif status == JOB_RETRYING:
+            self.statusBar().showMessage(f"Printer problem with receipt {receipt_no}. {message}")
+        elif status == JOB_DONE:
+            self.statusBar().showMessage(f"Receipt {receipt_no} printed", 5000)
+        elif status == JOB_FAILED:
+            self.statusBar().showMessage(f"Receipt {receipt_no} could not be printed")
+            QMessageBox.warning(self, "Printing Error",
+                                f"Receipt {receipt_no} could not be printed:\n{message}\n\n"
+                                "The sale itself has been recorded.")
+
     def refresh_data(self):
         """Refresh the inventory data"""
-        self.load_inventory_data()
-        self.populate_table()
+        self.reload_inventory()
         QMessageBox.information(self, "Success", "Data refreshed successfully!")
 
+    def reload_inventory(self):
+        """Reload the items from storage, repainting only the rows that changed"""
+        self.load_inventory_data()
+        self.table_model.sync_items(self.inventory_data)
+        self.table_model.set_reserved_quantities(self.cart.items)
+        self.refresh_summary()
+
+    def poll_changes(self):
+        """Pick up the changes other windows, processes or tills stored since the items were loaded"""
+        # Rows must not move under an open dialog (the edit dialog keeps its row)
+        if self.inventory.store is None or QApplication.activeModalWidget() is not None:
+            return
+        store = self.inventory.store
+        if isinstance(store, RemoteInventoryStore):
+            # A shop server may be slow or gone; never wait for it on the GUI thread
+            if self.poll_thread is not None and self.poll_thread.isRunning():
+                return
+            self.poll_thread = ChangesPollThread(store, self)
+            self.poll_thread.changes_found.connect(self.on_remote_changes)
+            self.poll_thread.poll_failed.connect(self.on_poll_failed)
+            self.poll_thread.start()
+            return
+
+        try:
+            changes = store.changes()
+        except Exception as e:
+            self.on_poll_failed(str(e))
+            return
+        self.apply_changes(changes)
+
+    def on_remote_changes(self, stamp, changes):
+        """Apply changes fetched by the poll thread, unless they are already out of date"""
+        store = self.inventory.store
+        # This window's own edits move the store on while the poll runs; an
+        # open dialog must keep its rows. Either way the next poll catches up.
+        if store.version != stamp or QApplication.activeModalWidget() is not None:
+            return
+        store.version = store.stamp_of(changes)
+        self.apply_changes(changes)
+
+    def apply_changes(self, changes):
+        self.changes_timer.setInterval(CHANGES_POLL_MS)
+        if changes['reload']:
+            self.reload_inventory()
+        elif self.inventory.apply_stored_quantities(changes['quantities']):
+            self.update_status_info()
+
+    def on_poll_failed(self, message):
+        """Poll less often while the store cannot be reached, up to MAX_CHANGES_POLL_MS"""
+        interval = min(self.changes_timer.interval() * 2, MAX_CHANGES_POLL_MS)
+        self.changes_timer.setInterval(interval)
+        self.statusBar().showMessage(
+            f"Could not check for changes: {message} (retrying in {interval // 1000} s)")
+
     def export_to_excel(self):
-        """Export inventory data to Excel file"""
+        """Export inventory data to an Excel, CSV or JSON file"""
         if not self.inventory_data:
             QMessageBox.warning(self, "No Data", "No inventory data to export.")
             return
 
-        try:
-            # Prepare data for export
-            export_data = []
-            for item in self.inventory_data:
-                export_data.append({
-                    'Item Name': item.get('name', ''),
-                    'Categories': ', '.join(item.get('categories', [])),
-                    'Quantity': item.get('quantity', 0),
-                    'Unit Price (Rs)': item.get('price', 0.0),
-                    'Total Value (Rs)': item.get('quantity', 0) * item.get('price', 0.0)
-                })
-
-            # Create DataFrame
-            df = pd.DataFrame(export_data)
-
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"inventory_{self.shop_folder}_{timestamp}.xlsx"
-            filepath = os.path.join(self.shop_path, filename)
-
-            # Export to Excel
-            df.to_excel(filepath, index=False, sheet_name='Inventory')
-
-            QMessageBox.information(self, "Export Successful",
-                                f"Inventory data exported successfully to:\n{filepath}")
+        if self.export_thread is not None and self.export_thread.isRunning():
+            QMessageBox.information(self, "Export Running", "An export is already in progress.")
+            return
 
+        # Generate filename with timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        default_path = os.path.join(self.shop_path, f"inventory_{self.shop_folder}_{timestamp}.xlsx")
+        filepath, _ = QFileDialog.getSaveFileName(
+            self, "Export Inventory", default_path,
+            "Excel Files (*.xlsx);;CSV Files (*.csv);;JSON Files (*.json)"
+        )
+        if not filepath:
+            return
+        if filepath.lower().endswith('.json'):
+            self.export_json(filepath)
+            return
+        if not filepath.lower().endswith(('.xlsx', '.csv')):
+            filepath += '.xlsx'
+
+        self.export_progress = QProgressDialog("Exporting inventory...", "Cancel", 0, len(self.inventory_data), self)
+        self.export_progress.setWindowTitle("Export")
+        self.export_progress.setWindowModality(Qt.WindowModal)
+        self.export_progress.setMinimumDuration(300)
+
+        # openpyxl is only loaded once something is exported
+        from inventory_export import InventoryExportThread
+        self.export_thread = InventoryExportThread(self.inventory_data, filepath, self)
+        self.export_thread.progress.connect(self.on_export_progress)
+        self.export_thread.export_finished.connect(self.on_export_finished)
+        self.export_thread.export_failed.connect(self.on_export_failed)
+        self.export_progress.canceled.connect(self.export_thread.cancel)
+        self.export_thread.start()
+
+    def export_json(self, filepath):
+        """Export the stored inventory in the inventory.json format"""
+        try:
+            self.inventory.require_store().export_json(filepath)
         except Exception as e:
             QMessageBox.critical(self, "Export Error", f"Failed to export data: {str(e)}")
+            return
+        QMessageBox.information(self, "Export Successful",
+                                f"Inventory data exported successfully to:\n{filepath}")
+
+    def on_export_progress(self, written, total):
+        self.export_progress.setMaximum(total)
+        self.export_progress.setValue(written)
+
+    def on_export_finished(self, filepath):
+        self.export_progress.reset()
+        QMessageBox.information(self, "Export Successful",
+                                f"Inventory data exported successfully to:\n{filepath}")
+
+    def on_export_failed(self, error):
+        self.export_progress.reset()
+        QMessageBox.critical(self, "Export Error", f"Failed to export data: {error}")
+
+    def on_add_to_cart_clicked(self, index):
+        """Handle a click on a row's "Add to Cart" button"""
+        self.add_to_cart(self.proxy_model.mapToSource(index).row())
 
     def add_to_cart(self, row):
         """Add item to cart"""
@@ -892,57 +1069,100 @@ class InventoryManager(QMainWindow):
             return
 
         item = self.inventory_data[row]
-        qty_widget = self.table.cellWidget(row, 4)
-        selected_qty = qty_widget.value()
+        selected_qty = self.table_model.selected_quantity(row)
 
-        if selected_qty <= 0:
-            QMessageBox.warning(self, "Invalid Quantity", "Please select a quantity greater than 0.")
+        try:
+            cart_item, is_new = self.cart.add(item, selected_qty)
+        except InvalidQuantityError as e:
+            QMessageBox.warning(self, "Invalid Quantity", str(e))
             return
-
-        if selected_qty > item.get('quantity', 0):
-            QMessageBox.warning(self, "Insufficient Stock",
-                            f"Only {item.get('quantity', 0)} items available in stock.")
+        except InsufficientStockError as e:
+            QMessageBox.warning(self, "Insufficient Stock", str(e))
             return
 
-        # Check if item already in cart
-        for cart_item in self.cart_items:
-            if cart_item['name'] == item['name']:
-                cart_item['quantity'] += selected_qty
-                QMessageBox.information(self, "Updated Cart",
-                                    f"Updated quantity for '{item['name']}' in cart.")
-                qty_widget.setValue(0)
-                total_in_cart = sum(ci['quantity'] for ci in self.cart_items if ci['name'] == item['name'])
-                remaining_qty = item['quantity'] - total_in_cart
-                qty_widget.setMaximum(remaining_qty)
-                return
+        if is_new:
+            QMessageBox.information(self, "Added to Cart",
+                                f"Added {selected_qty} x '{item['name']}' to cart.")
+        else:
+            QMessageBox.information(self, "Updated Cart",
+                                f"Updated quantity for '{item['name']}' in cart.")
+        self.table_model.set_reserved_quantities(self.cart.items)
+        self.table_model.set_selected_quantity(row, 0)
+
+    def scan_to_cart(self):
+        """Add one unit of the scanned item to the cart, without any dialog
+
+        The item is found with one lookup in the SKU index; the outcome is
+        shown in the status bar, with a beep when the scan was refused.
+        """
+        sku = self.scan_input.text().strip()
+        self.scan_input.clear()
+        if not sku:
+            return
 
-        # Add new item to cart
-        cart_item = {
-            'name': item['name'],
-            'quantity': selected_qty,
-            'unit_price': item['price'],
-            'total_price': selected_qty * item['price'],
-        }
-        self.cart_items.append(cart_item)
+        item = self.inventory.find_sku(sku)
+        if item is None:
+            QApplication.beep()
+            self.statusBar().showMessage(f"No item with SKU '{sku}'", SCAN_MESSAGE_MS)
+            return
+        try:
+            cart_item = self.cart.add(item, 1)[0]
+        except InsufficientStockError as e:
+            QApplication.beep()
+            self.statusBar().showMessage(f"'{item['name']}': {str(e)}", SCAN_MESSAGE_MS)
+            return
 
-        QMessageBox.information(self, "Added to Cart",
-                            f"Added {selected_qty} x '{item['name']}' to cart.")
-        qty_widget.setValue(0)
-        total_in_cart = sum(ci['quantity'] for ci in self.cart_items if ci['name'] == item['name'])
-        remaining_qty = item['quantity'] - total_in_cart
-        qty_widget.setMaximum(remaining_qty)
+        self.table_model.set_reserved_quantities(self.cart.items)
+        self.table_model.update_rows([item.row])
+        self.statusBar().showMessage(
+            f"Added '{item['name']}' ({cart_item['quantity']} in cart). "
+            f"Cart total: Rs {self.cart.total_amount():.2f}",
+            SCAN_MESSAGE_MS
+        )
 
     def show_cart(self):
         """Show the cart dialog"""
-        if not self.cart_items:
+        if not self.cart.items:
             QMessageBox.information(self, "Cart Empty", "Your cart is empty.")
             return
 
-        cart_dialog = CartDialog(self.cart_items)
+        cart_dialog = CartDialog(self.cart.items)
         cart_dialog.setWindowTitle("Your Shopping Cart")
         cart_dialog.exec_()
 
+    def show_sales_report(self):
+        """Show revenue, top sellers and category mix from the sales ledger"""
+        if self.sales_ledger is None:
+            QMessageBox.warning(self, "No Sales Data", "The sales ledger is not available.")
+            return
+
+        try:
+            # Imports pandas, which is only needed for reports
+            from sales_report import SalesReportDialog
+            report_dialog = SalesReportDialog(self.sales_ledger, self)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to open sales report: {str(e)}")
+            return
+        report_dialog.exec_()
+
     def closeEvent(self, event):
+        if self.export_thread is not None and self.export_thread.isRunning():
+            self.export_thread.cancel()
+            self.export_thread.wait()
+        if self.inventory.store is not None:
+            self.changes_timer.stop()
+        if self.poll_thread is not None:
+            self.poll_thread.wait()  # bounded by the shop client's timeout
+        if PRINT_RECEIPT_AVAILABLE:
+            # The spooler outlives this window
+            try:
+                get_print_spooler().job_status.disconnect(self.on_print_job_status)
+            except TypeError:
+                pass  # already disconnected by an earlier close
+        self.inventory.close()
+        if self.sales_ledger is not None:
+            self.sales_ledger.close()
+            self.sales_ledger = None
         if self.previous_window:
             self.previous_window.show()
         super().closeEvent(event)
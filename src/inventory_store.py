@@ -0,0 +1,694 @@
+import os
+import json
+import sqlite3
+import threading
+from file_utils import FileLock, write_json_atomic
+from inventory_index import name_key, sku_key
+
+INVENTORY_JSON = "inventory.json"
+INVENTORY_DB = "inventory.db"
+JOURNAL_EXTENSION = ".journal"
+SQLITE_SIDE_FILES = ("-journal", "-wal", "-shm")  # created next to a database by SQLite
+# WAL needs shared memory, which a shop folder on a network drive used by
+# several computers does not have; FileLock and BEGIN IMMEDIATE already
+# make writers take turns
+SQLITE_JOURNAL_MODE = "DELETE"
+
+DEFAULT_STORAGE_BACKEND = "sqlite"
+
+
+def normalize_item(item):
+    """Convert an item to the current format (backward compatibility)"""
+    if 'category' in item and 'categories' not in item:
+        item['categories'] = [item['category']] if item['category'] else []
+        del item['category']
+    elif 'categories' not in item:
+        item['categories'] = []
+    item.setdefault('sku', '')
+    # Older files may hold 5.0 for a quantity; the columns only take ints and floats
+    item['quantity'] = int(item.get('quantity', 0))
+    item['price'] = float(item.get('price', 0.0))
+    return item
+
+
+def read_inventory_json(json_path):
+    """Read and normalize the items of an inventory.json file"""
+    with open(json_path, 'r') as f:
+        items = json.load(f)
+    return [normalize_item(item) for item in items]
+
+
+class ConflictError(Exception):
+    """Another window or process changed the stored inventory first"""
+
+
+CHANGED_ELSEWHERE = "The inventory was changed in another window. Reload and try again."
+
+
+def merge_update(name, current, item, base=None):
+    """Values to store when item replaces current, the item stored under name
+
+    base holds the values the change was made from. If another window
+    changed the name, SKU, categories or price since, the update is refused;
+    a quantity changed meanwhile (by sales) is kept and the update's own
+    change of quantity is added to it.
+    """
+    if current is None:
+        raise ConflictError(f"'{name}' was deleted or renamed in another window.")
+    merged = dict(item)
+    if base is None:
+        return merged
+    if current['name'] != base['name'] or current.get('sku', '') != base.get('sku', '') \
+            or current.get('price') != base.get('price') \
+            or set(current.get('categories', [])) != set(base.get('categories', [])):
+        raise ConflictError(f"'{name}' was changed in another window. Reload and try again.")
+    merged['quantity'] = max(current.get('quantity', 0) + item.get('quantity', 0) - base.get('quantity', 0), 0)
+    return merged
+
+
+class InventoryStore:
+    """Base class for inventory storage backends
+
+    Items are plain dicts with 'name', 'sku', 'categories', 'quantity' and
+    'price'. Item names are unique ignoring case and are used as the row
+    key; SKUs (barcodes) are optional, and unique when given. Both are
+    compared by the keys of inventory_index (name_key, sku_key), the same
+    ones the in-memory indexes use.
+
+    Several windows and processes may open the same shop. Every write
+    holds the shop's file lock and is made against the latest stored
+    state, and the stored inventory carries a version stamp. version is
+    the stamp the caller's copy of the items matches: it is set by
+    load_items() and follows the caller's own writes, but not those made
+    elsewhere.
+    """
+
+    version = None
+
+    def load_items(self):
+        """Return all items in their stored order"""
+        raise NotImplementedError
+
+    def read_version(self):
+        """The current version stamp of the stored inventory"""
+        raise NotImplementedError
+
+    def add_item(self, item):
+        """Store a new item"""
+        raise NotImplementedError
+
+    def update_item(self, name, item, base=None):
+        """Replace the item currently stored under name, returns the stored values
+
+        base holds the values the change was made from, see merge_update().
+        """
+        raise NotImplementedError
+
+    def delete_item(self, name):
+        """Remove the item stored under name"""
+        raise NotImplementedError
+
+    def adjust_quantities(self, deltas):
+        """Apply (name, delta) quantity changes, never going below 0
+
+        The deltas are added to the stored quantities, so sales made in
+        other windows are kept. Returns {name: stored quantity}.
+        """
+        raise NotImplementedError
+
+    def save_all(self, items, check_version=False):
+        """Replace the whole inventory with items
+
+        With check_version the inventory is only replaced if nobody else
+        changed it since it was loaded, otherwise ConflictError is raised.
+        """
+        raise NotImplementedError
+
+    def changes(self):
+        """What was changed elsewhere since the items were loaded: {'reload', 'quantities'}
+
+        quantities holds {name: stored quantity} of the items whose stock
+        changed, and version moves on past them. reload is set instead when
+        items were added, removed or edited; load_items() then catches up.
+        """
+        return {'reload': self.read_version() != self.version, 'quantities': {}}
+
+    def export_json(self, json_path):
+        """Export the inventory in the inventory.json format"""
+        # Reading the items must not make the caller's copy look up to date
+        version = self.version
+        try:
+            items = self.load_items()
+        finally:
+            self.version = version
+        write_json_atomic(json_path, items)
+
+    def close(self):
+        pass
+
+
+class JsonInventoryStore(InventoryStore):
+    """Stores the inventory as an inventory.json snapshot plus a mutation journal
+
+    Every change is appended to inventory.journal as one JSON line, so a
+    sale costs a few bytes instead of a full inventory.json rewrite.
+    Opening the store replays the journal over the snapshot. Once the
+    journal grows past COMPACT_THRESHOLD it is folded into a new snapshot
+    on a background thread.
+
+    Journal entries are idempotent (quantity changes also record the
+    resulting quantity), so replaying a journal that was already folded
+    into the snapshot is harmless.
+
+    Before each change the store replays what other processes appended
+    to the journal since, or reloads when one of them wrote a new
+    snapshot. The version stamp is the snapshot's identity plus the
+    journal's length, so checking it costs two stat calls, and the
+    entries appended since a stamp are what changed after it.
+    """
+
+    COMPACT_THRESHOLD = 256 * 1024  # bytes
+
+    def __init__(self, json_path):
+        self.json_path = json_path
+        base_path = os.path.splitext(json_path)[0]
+        self.journal_path = base_path + JOURNAL_EXTENSION
+        self.items = {}
+        self.journal = None
+        self.offset = 0  # bytes of the journal applied to items
+        self.snapshot = None  # identity of the snapshot items were read from
+        self.lock = threading.Lock()
+        self.file_lock = FileLock(json_path)
+        self.compactor = None
+
+    def snapshot_id(self):
+        try:
+            stat = os.stat(self.json_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def journal_size(self):
+        try:
+            return os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            return 0
+
+    def read_version(self):
+        return (self.snapshot_id(), self.journal_size())
+
+    def load_items(self):
+        self.wait_for_compaction()
+        with self.lock, self.file_lock:
+            self.reload()
+            self.version = self.read_version()
+            return [dict(item) for item in self.items.values()]
+
+    def changes(self):
+        with self.lock, self.file_lock:
+            version = self.read_version()
+            if version == self.version:
+                return {'reload': False, 'quantities': {}}
+            # A new snapshot or a shorter journal: the entries since are gone
+            if self.version is None or version[0] != self.version[0] or version[1] < self.version[1]:
+                return {'reload': True, 'quantities': {}}
+            quantities = {}
+            for entry, _ in self.journal_entries(self.journal_path, self.version[1]):
+                if entry.get('op') != 'adjust':
+                    return {'reload': True, 'quantities': {}}
+                quantities[entry['name']] = entry['quantity']
+            self.version = version
+            return {'reload': False, 'quantities': quantities}
+
+    def reload(self):
+        """Read the snapshot and replay the whole journal (file lock held)"""
+        self.snapshot = self.snapshot_id()
+        items = read_inventory_json(self.json_path) if self.snapshot is not None else []
+        self.items = {name_key(item['name']): item for item in items}
+        self.offset = 0
+        self.catch_up_journal()
+        if self.journal is None:
+            self.journal = open(self.journal_path, 'ab')
+
+    def catch_up_journal(self):
+        """Apply the journal entries appended since offset"""
+        size = self.journal_size()
+        if size <= self.offset:
+            return
+        valid_length = self.replay(self.journal_path, self.offset)
+        if size > valid_length:
+            # Drop a torn final entry so new appends start on a clean line
+            os.truncate(self.journal_path, valid_length)
+        self.offset = valid_length
+
+    def catch_up(self):
+        """Take in what other processes stored since we last looked (file lock held)"""
+        if self.snapshot_id() != self.snapshot or self.journal_size() < self.offset:
+            self.reload()
+        else:
+            self.catch_up_journal()
+
+    def write(self, make_entries):
+        """Append the entries of a change made against the latest stored items
+
+        make_entries() is called holding the locks, once the items are up
+        to date, and returns (entries, result); returns result.
+        """
+        with self.lock, self.file_lock:
+            in_sync = self.read_version() == self.version
+            self.catch_up()
+            entries, result = make_entries()
+            self.write_entries(entries)
+            for entry in entries:
+                self.apply_entry(entry)
+            if in_sync:
+                self.version = self.read_version()
+        self.maybe_compact()
+        return result
+
+    def add_item(self, item):
+        item = dict(item)
+
+        def entries():
+            if name_key(item['name']) in self.items:
+                raise ConflictError(f"An item named '{item['name']}' was added in another window.")
+            if self.sku_taken(item.get('sku', '')):
+                raise ConflictError(f"SKU '{item['sku']}' was given to another item in another window.")
+            return [{'op': 'add', 'item': item}], None
+        self.write(entries)
+
+    def update_item(self, name, item, base=None):
+        def entries():
+            stored = merge_update(name, self.items.get(name_key(name)), item, base)
+            new_key = name_key(stored['name'])
+            if new_key != name_key(name) and new_key in self.items:
+                raise ConflictError(f"An item named '{stored['name']}' was added in another window.")
+            if self.sku_taken(stored.get('sku', ''), name):
+                raise ConflictError(f"SKU '{stored['sku']}' was given to another item in another window.")
+            return [{'op': 'update', 'name': name, 'item': stored}], dict(stored)
+        return self.write(entries)
+
+    def delete_item(self, name):
+        def entries():
+            if name_key(name) not in self.items:
+                return [], None
+            return [{'op': 'delete', 'name': name}], None
+        self.write(entries)
+
+    def adjust_quantities(self, deltas):
+        def entries():
+            entries = []
+            quantities = {}
+            for name, delta in deltas:
+                item = self.items.get(name_key(name))
+                if item is None:
+                    continue
+                quantity = max(quantities.get(name, item.get('quantity', 0)) + delta, 0)
+                quantities[name] = quantity
+                entries.append({'op': 'adjust', 'name': name, 'delta': delta, 'quantity': quantity})
+            return entries, quantities
+        return self.write(entries)
+
+    def save_all(self, items, check_version=False):
+        self.wait_for_compaction()
+        with self.lock, self.file_lock:
+            if check_version and self.read_version() != self.version:
+                raise ConflictError(CHANGED_ELSEWHERE)
+            self.items = {name_key(item['name']): dict(item) for item in items}
+            write_json_atomic(self.json_path, list(self.items.values()))
+            if self.journal is not None:
+                self.journal.truncate(0)
+            self.offset = 0
+            self.snapshot = self.snapshot_id()
+            self.version = self.read_version()
+
+    def sku_taken(self, sku, name=None):
+        """Whether a stored item other than the one named name has the SKU"""
+        if not sku:
+            return False
+        sku = sku_key(sku)
+        own_key = name_key(name) if name is not None else None
+        return any(
+            key != own_key and sku_key(item.get('sku', '')) == sku
+            for key, item in self.items.items()
+        )
+
+    def put(self, name, item):
+        """Insert item, replacing the entry stored under name in place"""
+        key = name_key(name)
+        new_key = name_key(item['name'])
+        if key == new_key or key not in self.items:
+            self.items[new_key] = item
+        else:
+            # Keep the renamed item at its original position
+            self.items = {
+                (new_key if k == key else k): (item if k == key else v)
+                for k, v in self.items.items()
+            }
+
+    def write_entries(self, entries):
+        if not entries:
+            return
+        if self.journal is None:
+            self.journal = open(self.journal_path, 'ab')
+        data = "".join(json.dumps(entry, separators=(',', ':')) + "\n" for entry in entries).encode('utf-8')
+        self.journal.write(data)
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+        self.offset += len(data)
+
+    def apply_entry(self, entry):
+        op = entry.get('op')
+        if op in ('add', 'update'):
+            item = normalize_item(dict(entry['item']))
+            self.put(entry.get('name', item['name']), item)
+        elif op == 'delete':
+            self.items.pop(name_key(entry['name']), None)
+        elif op == 'adjust':
+            item = self.items.get(name_key(entry['name']))
+            if item is not None:
+                item['quantity'] = entry['quantity']
+
+    def journal_entries(self, journal_path, start):
+        """Yield (entry, length in bytes) for the entries of a journal file from byte start"""
+        with open(journal_path, 'rb') as f:
+            f.seek(start)
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete entry")
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-append
+                    return
+                yield entry, len(line)
+
+    def replay(self, journal_path, start):
+        """Apply the entries of a journal file from byte start, returns where its valid part ends"""
+        valid_length = start
+        for entry, length in self.journal_entries(journal_path, start):
+            valid_length += length
+            self.apply_entry(entry)
+        return valid_length
+
+    def maybe_compact(self):
+        """Start a background compaction once the journal is big enough"""
+        if self.compactor is not None and self.compactor.is_alive():
+            return
+        if self.offset < self.COMPACT_THRESHOLD:
+            return
+        self.compactor = threading.Thread(target=self.compact, daemon=True)
+        self.compactor.start()
+
+    def compact(self):
+        """Write a new snapshot and empty the journal it replaces
+
+        Holds the file lock, so other processes wait for the snapshot and
+        then reload from it. A crash before the journal is emptied only
+        means its entries are replayed over the snapshot once more.
+        """
+        try:
+            with self.lock, self.file_lock:
+                in_sync = self.read_version() == self.version
+                self.catch_up()
+                write_json_atomic(self.json_path, list(self.items.values()))
+                self.journal.truncate(0)
+                self.offset = 0
+                self.snapshot = self.snapshot_id()
+                if in_sync:
+                    self.version = self.read_version()
+        except Exception as e:
+            # The journal is kept and replayed on the next open
+            print(f"Inventory compaction error: {e}")
+
+    def wait_for_compaction(self):
+        if self.compactor is not None:
+            self.compactor.join()
+            self.compactor = None
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def close(self):
+        self.wait_for_compaction()
+        with self.lock:
+            self.close_journal()
+
+
+class SQLiteInventoryStore(InventoryStore):
+    """Stores the inventory in an embedded SQLite database, one row per item
+
+    The version stamp is a counter in the database, raised by every
+    write in the same transaction. Each row records the version that last
+    wrote it, and layout_version the last write that added, removed or
+    edited items, so changes() can tell sales apart from edits.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        self.file_lock = FileLock(db_path)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS items (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    name_key TEXT NOT NULL,
+                    categories TEXT NOT NULL DEFAULT '[]',
+                    quantity INTEGER NOT NULL DEFAULT 0,
+                    price REAL NOT NULL DEFAULT 0,
+                    sku TEXT NOT NULL DEFAULT '',
+                    sku_key TEXT NOT NULL DEFAULT '',
+                    changed_version INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self.upgrade_items_table()
+            # Names and SKUs are compared by the keys the in-memory indexes use
+            self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS items_name_key ON items (name_key)")
+            self.conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS items_sku_key ON items (sku_key) WHERE sku_key != ''"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS items_changed_version ON items (changed_version)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS inventory_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version INTEGER NOT NULL,
+                    layout_version INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(inventory_version)")]
+            if 'layout_version' not in columns:
+                self.conn.execute("ALTER TABLE inventory_version ADD COLUMN layout_version INTEGER NOT NULL DEFAULT 0")
+            self.conn.execute("INSERT OR IGNORE INTO inventory_version (id, version) VALUES (1, 0)")
+
+    def upgrade_items_table(self):
+        """Add the columns missing from databases made by earlier versions"""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(items)")]
+        if 'sku' not in columns:
+            self.conn.execute("ALTER TABLE items ADD COLUMN sku TEXT NOT NULL DEFAULT ''")
+        if 'changed_version' not in columns:
+            self.conn.execute("ALTER TABLE items ADD COLUMN changed_version INTEGER NOT NULL DEFAULT 0")
+        if 'name_key' not in columns:
+            self.conn.execute("ALTER TABLE items ADD COLUMN name_key TEXT NOT NULL DEFAULT ''")
+            self.conn.execute("ALTER TABLE items ADD COLUMN sku_key TEXT NOT NULL DEFAULT ''")
+            self.conn.executemany(
+                "UPDATE items SET name_key = ?, sku_key = ? WHERE id = ?",
+                [(name_key(name), sku_key(sku), item_id)
+                 for item_id, name, sku in self.conn.execute("SELECT id, name, sku FROM items")]
+            )
+            self.conn.execute("DROP INDEX IF EXISTS items_sku")
+
+    def read_version(self):
+        return self.conn.execute("SELECT version FROM inventory_version").fetchone()[0]
+
+    def changes(self):
+        # One read transaction, so the quantities match the version
+        with self.conn:
+            self.conn.execute("BEGIN")
+            version, layout_version = self.conn.execute(
+                "SELECT version, layout_version FROM inventory_version"
+            ).fetchone()
+            if version == self.version:
+                return {'reload': False, 'quantities': {}}
+            if self.version is None or layout_version > self.version or version < self.version:
+                return {'reload': True, 'quantities': {}}
+            rows = self.conn.execute(
+                "SELECT name, quantity FROM items WHERE changed_version > ?", (self.version,)
+            ).fetchall()
+        self.version = version
+        return {'reload': False, 'quantities': dict(rows)}
+
+    def load_items(self):
+        # One read transaction, so the version matches the items
+        with self.conn:
+            self.conn.execute("BEGIN")
+            rows = self.conn.execute(
+                "SELECT name, sku, categories, quantity, price FROM items ORDER BY id"
+            ).fetchall()
+            self.version = self.read_version()
+        return [
+            {
+                'name': name,
+                'sku': sku,
+                'categories': json.loads(categories),
+                'quantity': quantity,
+                'price': price
+            }
+            for name, sku, categories, quantity, price in rows
+        ]
+
+    def write(self, change, check_version=False):
+        """Run change() in one write transaction holding the shop's lock, returns its result"""
+        with self.file_lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            version = self.read_version()
+            if check_version and version != self.version:
+                raise ConflictError(CHANGED_ELSEWHERE)
+            # Raised first, so change() can stamp the rows it writes with it
+            self.conn.execute("UPDATE inventory_version SET version = version + 1")
+            try:
+                result = change()
+            except sqlite3.IntegrityError as e:
+                raise self.integrity_error(e) from e
+        if version == self.version:
+            self.version = version + 1
+        return result
+
+    def integrity_error(self, error):
+        """The error to raise for a refused write: only a taken name or SKU is a conflict"""
+        message = str(error)
+        if message.startswith("UNIQUE constraint failed: items.name_key"):
+            return ConflictError("An item with this name was added in another window.")
+        if message.startswith("UNIQUE constraint failed: items.sku_key"):
+            return ConflictError("This SKU was given to another item in another window.")
+        # core imports this module, so its errors are only imported here
+        from core import InventoryError
+        return InventoryError(f"The item could not be stored: {message}")
+
+    def stored_item(self, name):
+        row = self.conn.execute(
+            "SELECT name, sku, categories, quantity, price FROM items WHERE name_key = ?", (name_key(name),)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'name': row[0], 'sku': row[1], 'categories': json.loads(row[2]), 'quantity': row[3], 'price': row[4]}
+
+    def layout_changed(self):
+        """Make other windows reload rather than take over changed quantities (in a write)"""
+        self.conn.execute("UPDATE inventory_version SET layout_version = version")
+
+    def add_item(self, item):
+        def change():
+            self.conn.execute(
+                "INSERT INTO items (name, name_key, categories, quantity, price, sku, sku_key, changed_version) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, (SELECT version FROM inventory_version))",
+                self.row_values(item)
+            )
+            self.layout_changed()
+        self.write(change)
+
+    def update_item(self, name, item, base=None):
+        def change():
+            current = self.stored_item(name)
+            stored = merge_update(name, current, item, base)
+            self.conn.execute(
+                "UPDATE items SET name = ?, name_key = ?, categories = ?, quantity = ?, price = ?, "
+                "sku = ?, sku_key = ?, changed_version = (SELECT version FROM inventory_version) "
+                "WHERE name_key = ?",
+                self.row_values(stored) + (name_key(name),)
+            )
+            if any(stored.get(field) != current[field] for field in ('name', 'sku', 'categories', 'price')):
+                self.layout_changed()
+            return stored
+        return self.write(change)
+
+    def delete_item(self, name):
+        def change():
+            self.conn.execute("DELETE FROM items WHERE name_key = ?", (name_key(name),))
+            self.layout_changed()
+        self.write(change)
+
+    def adjust_quantities(self, deltas):
+        def change():
+            self.conn.executemany(
+                "UPDATE items SET quantity = MAX(quantity + ?, 0), "
+                "changed_version = (SELECT version FROM inventory_version) WHERE name_key = ?",
+                [(delta, name_key(name)) for name, delta in deltas]
+            )
+            quantities = {}
+            for name, delta in deltas:
+                row = self.conn.execute(
+                    "SELECT quantity FROM items WHERE name_key = ?", (name_key(name),)
+                ).fetchone()
+                if row is not None:
+                    quantities[name] = row[0]
+            return quantities
+        return self.write(change)
+
+    def save_all(self, items, check_version=False):
+        def change():
+            self.conn.execute("DELETE FROM items")
+            self.conn.executemany(
+                "INSERT INTO items (name, name_key, categories, quantity, price, sku, sku_key) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self.row_values(normalize_item(dict(item))) for item in items]
+            )
+            self.layout_changed()
+        self.write(change, check_version)
+
+    def row_values(self, item):
+        return (
+            item['name'],
+            name_key(item['name']),
+            json.dumps(item.get('categories', [])),
+            item.get('quantity', 0),
+            item.get('price', 0.0),
+            item.get('sku', ''),
+            sku_key(item.get('sku', ''))
+        )
+
+    def close(self):
+        self.conn.close()
+
+
+def import_inventory_json(json_path, store):
+    """One-time import of an existing inventory.json into a store"""
+    items = read_inventory_json(json_path)
+    store.save_all(items)
+    return len(items)
+
+
+def remove_database(db_path):
+    """Delete a database file with its journal files, so none is attached to a new database"""
+    for path in [db_path] + [db_path + suffix for suffix in SQLITE_SIDE_FILES]:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def open_inventory_store(shop_path, backend=DEFAULT_STORAGE_BACKEND):
+    """Open the inventory store of a shop folder
+
+    When the SQLite backend is opened for the first time the shop's
+    existing inventory.json is imported; the JSON file is left in place.
+    """
+    json_path = os.path.join(shop_path, INVENTORY_JSON)
+
+    if backend == "json":
+        return JsonInventoryStore(json_path)
+    if backend != "sqlite":
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    db_path = os.path.join(shop_path, INVENTORY_DB)
+    needs_import = not os.path.exists(db_path) and os.path.exists(json_path)
+    store = SQLiteInventoryStore(db_path)
+    if needs_import:
+        try:
+            import_inventory_json(json_path, store)
+        except Exception:
+            store.close()
+            remove_database(db_path)
+            raise
+    return store
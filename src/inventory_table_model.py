@@ -0,0 +1,478 @@
+from PyQt5.QtWidgets import (
+    QStyledItemDelegate, QStyle, QStyleOptionSpinBox, QSpinBox, QApplication
+)
+from PyQt5.QtCore import (
+    Qt, QAbstractTableModel, QAbstractProxyModel, QModelIndex, QEvent,
+    QRect, pyqtSignal
+)
+from PyQt5.QtGui import QColor, QPainter, QPainterPath, QFont
+from inventory_columns import InventoryColumns
+from inventory_index import name_key
+
+COLUMN_HEADERS = ["Item Name", "SKU", "Categories", "Quantity", "Price (Rs)", "Select Qty", "Add to Cart"]
+(NAME_COLUMN, SKU_COLUMN, CATEGORIES_COLUMN, QUANTITY_COLUMN,
+ PRICE_COLUMN, SELECT_QTY_COLUMN, ADD_TO_CART_COLUMN) = range(len(COLUMN_HEADERS))
+
+# Raw values used for sorting, and the upper bound of the quantity picker
+SORT_ROLE = Qt.UserRole
+MAX_QTY_ROLE = Qt.UserRole + 1
+
+# Columns sorted directly on the InventoryColumns fields
+COLUMN_FIELDS = {NAME_COLUMN: 'name', QUANTITY_COLUMN: 'quantity', PRICE_COLUMN: 'price'}
+
+ALL_CATEGORIES = "All Categories"
+
+
+def categories_text(item):
+    """Text shown in the categories column"""
+    categories = item.get('categories', [])
+    return ", ".join(sorted(categories)) if categories else "No Category"
+
+
+class InventoryTableModel(QAbstractTableModel):
+    """Table model over an InventoryColumns item table
+
+    Changes to the items are made by core.InventoryRepository, which
+    reports them to the model as its listener. The quantity picked in the "Select Qty" column is kept in the model,
+    keyed by item name, so no widget is created per row.
+    """
+
+    def __init__(self, items=None, parent=None):
+        super().__init__(parent)
+        self.items = items if items is not None else InventoryColumns()
+        self.selected_quantities = {}
+        self.reserved_quantities = {}
+        self.rows = {}
+        self.index_rows()
+
+    def set_items(self, items):
+        """Show a new item list"""
+        self.beginResetModel()
+        self.items = items
+        self.selected_quantities.clear()
+        self.index_rows()
+        self.endResetModel()
+
+    def index_rows(self, start=0):
+        """Record the row of every item from start onwards"""
+        if start == 0:
+            self.rows = {}
+        for row in range(start, len(self.items)):
+            self.rows[id(self.items[row])] = row
+
+    def row_of(self, item):
+        """Row showing item, or -1"""
+        return self.rows.get(id(item), -1)
+
+    # Listener of core.InventoryRepository, which changes the shared items
+
+    def inserting_item(self, row):
+        self.beginInsertRows(QModelIndex(), row, row)
+
+    def item_inserted(self, row):
+        self.rows[id(self.items[row])] = row
+        self.endInsertRows()
+
+    def item_replaced(self, row, old_name):
+        """Repaint only the replaced row"""
+        if name_key(old_name) != name_key(self.items[row]['name']):
+            self.selected_quantities.pop(name_key(old_name), None)
+        self.update_rows([row])
+
+    def removing_item(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+
+    def item_removed(self, row, item):
+        self.rows.pop(id(item), None)
+        self.index_rows(row)
+        self.endRemoveRows()
+        self.selected_quantities.pop(name_key(item['name']), None)
+
+    def items_changed(self, rows):
+        self.update_rows(rows)
+
+    def update_rows(self, rows):
+        """Repaint rows whose item changed in place"""
+        last_column = len(COLUMN_HEADERS) - 1
+        for row in rows:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, last_column))
+
+    def sync_items(self, items):
+        """Show a reloaded item list, repainting only the rows that differ
+
+        Falls back to a full reset when items were added, removed or reordered.
+        """
+        same_rows = len(items) == len(self.items) and all(
+            new['name'] == old['name'] for new, old in zip(items, self.items)
+        )
+        if not same_rows:
+            self.set_items(items)
+            return
+
+        changed_rows = [row for row, (new, old) in enumerate(zip(items, self.items)) if new != old]
+        self.items = items
+        self.index_rows()
+        self.update_rows(changed_rows)
+
+    def item_at(self, row):
+        return self.items[row] if 0 <= row < len(self.items) else None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMN_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMN_HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.column() == SELECT_QTY_COLUMN:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        item = self.items[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == NAME_COLUMN:
+                return item.get('name', '')
+            if column == SKU_COLUMN:
+                return item.get('sku', '')
+            if column == CATEGORIES_COLUMN:
+                return categories_text(item)
+            if column == QUANTITY_COLUMN:
+                return str(item.get('quantity', 0))
+            if column == PRICE_COLUMN:
+                return f"Rs {item.get('price', 0.0):.2f}"
+            if column == SELECT_QTY_COLUMN:
+                return str(self.selected_quantity(index.row()))
+            if column == ADD_TO_CART_COLUMN:
+                return "Add to Cart"
+
+        elif role == Qt.EditRole and column == SELECT_QTY_COLUMN:
+            return self.selected_quantity(index.row())
+
+        elif role == SORT_ROLE:
+            return self.sort_key(index.row(), column)
+
+        elif role == MAX_QTY_ROLE:
+            return self.available_quantity(index.row())
+
+        elif role == Qt.TextAlignmentRole:
+            if column in (QUANTITY_COLUMN, SELECT_QTY_COLUMN):
+                return Qt.AlignCenter
+            if column == PRICE_COLUMN:
+                return Qt.AlignRight | Qt.AlignVCenter
+            return Qt.AlignLeft | Qt.AlignVCenter
+
+        return None
+
+    def sort_key(self, row, column):
+        """Raw value a column is sorted by"""
+        item = self.items[row]
+        if column == NAME_COLUMN:
+            return item.get('name', '').lower()
+        if column == SKU_COLUMN:
+            return item.get('sku', '').lower()
+        if column == CATEGORIES_COLUMN:
+            return categories_text(item).lower()
+        if column == QUANTITY_COLUMN:
+            return item.get('quantity', 0)
+        if column == PRICE_COLUMN:
+            return item.get('price', 0.0)
+        if column == SELECT_QTY_COLUMN:
+            return self.selected_quantity(row)
+        return 0
+
+    def sort_rows(self, rows, column, descending=False):
+        """rows ordered by a column"""
+        field = COLUMN_FIELDS.get(column)
+        if field is not None:
+            return self.items.sorted_rows(rows, field, descending)
+        return sorted(rows, key=lambda row: self.sort_key(row, column), reverse=descending)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or index.column() != SELECT_QTY_COLUMN or role != Qt.EditRole:
+            return False
+
+        self.set_selected_quantity(index.row(), int(value))
+        return True
+
+    def selected_quantity(self, row):
+        return self.selected_quantities.get(name_key(self.items[row]['name']), 0)
+
+    def set_selected_quantity(self, row, quantity):
+        key = name_key(self.items[row]['name'])
+        if quantity > 0:
+            self.selected_quantities[key] = quantity
+        else:
+            self.selected_quantities.pop(key, None)
+        index = self.index(row, SELECT_QTY_COLUMN)
+        self.dataChanged.emit(index, index)
+
+    def available_quantity(self, row):
+        """Stock that can still be picked, excluding what is already in the cart"""
+        item = self.items[row]
+        reserved = self.reserved_quantities.get(name_key(item['name']), 0)
+        return max(item.get('quantity', 0) - reserved, 0)
+
+    def set_reserved_quantities(self, cart_items):
+        """Update how much of each item is already in the cart"""
+        self.reserved_quantities = {}
+        for cart_item in cart_items:
+            key = name_key(cart_item['name'])
+            self.reserved_quantities[key] = self.reserved_quantities.get(key, 0) + cart_item['quantity']
+
+
+class InventoryFilterProxyModel(QAbstractProxyModel):
+    """Sorts the inventory and filters it by search results and category
+
+    Filters are given as precomputed item id sets (from CategoryIndex) and
+    ranked search results (from SearchIndex), so the visible rows are built
+    from the matching ids directly instead of testing every row. Sorting
+    calls the source model once per row rather than once per comparison.
+    While a search is active and no column is sorted, rows follow the
+    search ranking.
+
+    Rows changed or added while a filter is active stay visible until the
+    filter is applied again.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.search_ranks = None
+        self.category_items = None
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+        self.source_rows = []
+        self.proxy_rows = {}
+        self.pending_removal = None
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self.on_source_reset)
+        model.dataChanged.connect(self.on_source_data_changed)
+        model.rowsInserted.connect(self.on_source_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self.on_source_rows_about_to_be_removed)
+        model.rowsRemoved.connect(self.on_source_rows_removed)
+        self.beginResetModel()
+        self.source_rows = self.visible_source_rows()
+        self.index_proxy_rows()
+        self.endResetModel()
+
+    def set_filter(self, search_ranks=None, category_items=None):
+        """Show only the ranked search results (None for no search) in category_items"""
+        self.search_ranks = search_ranks
+        self.category_items = category_items
+        self.relayout()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.relayout()
+
+    def visible_source_rows(self):
+        """Source rows that pass the filters, in display order"""
+        model = self.sourceModel()
+        if model is None:
+            return []
+
+        if self.search_ranks is not None:
+            # Ranked order, restricted to the category
+            ids = self.search_ranks
+            if self.category_items is not None:
+                ids = [key for key in ids if key in self.category_items]
+            rows = [model.rows[key] for key in ids if key in model.rows]
+        elif self.category_items is not None:
+            rows = sorted(model.rows[key] for key in self.category_items if key in model.rows)
+        else:
+            rows = list(range(model.rowCount()))
+
+        if self.sort_column >= 0:
+            rows = model.sort_rows(rows, self.sort_column, self.sort_order == Qt.DescendingOrder)
+        return rows
+
+    def index_proxy_rows(self):
+        self.proxy_rows = {source_row: row for row, source_row in enumerate(self.source_rows)}
+
+    def relayout(self):
+        """Recompute the visible rows, keeping selection on rows that stay visible"""
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        source_indexes = [self.mapToSource(index) for index in persistent]
+
+        self.source_rows = self.visible_source_rows()
+        self.index_proxy_rows()
+
+        self.changePersistentIndexList(persistent, [self.mapFromSource(index) for index in source_indexes])
+        self.layoutChanged.emit()
+
+    def on_source_reset(self):
+        self.source_rows = self.visible_source_rows()
+        self.index_proxy_rows()
+        self.endResetModel()
+
+    def on_source_data_changed(self, top_left, bottom_right, roles=()):
+        for source_row in range(top_left.row(), bottom_right.row() + 1):
+            row = self.proxy_rows.get(source_row)
+            if row is not None:
+                self.dataChanged.emit(self.index(row, top_left.column()),
+                                      self.index(row, bottom_right.column()), roles)
+
+    def on_source_rows_inserted(self, parent, first, last):
+        # New rows are shown at the end, whatever the filter
+        start = len(self.source_rows)
+        self.beginInsertRows(QModelIndex(), start, start + last - first)
+        for source_row in range(first, last + 1):
+            self.proxy_rows[source_row] = len(self.source_rows)
+            self.source_rows.append(source_row)
+        self.endInsertRows()
+
+    def on_source_rows_about_to_be_removed(self, parent, first, last):
+        visible = sorted(self.proxy_rows[row] for row in range(first, last + 1) if row in self.proxy_rows)
+        if not visible:
+            self.pending_removal = ('layout', first, last)
+            self.layoutAboutToBeChanged.emit()
+        elif visible[-1] - visible[0] + 1 == len(visible):
+            self.pending_removal = ('rows', first, last)
+            self.beginRemoveRows(QModelIndex(), visible[0], visible[-1])
+        else:
+            self.pending_removal = ('reset', first, last)
+            self.beginResetModel()
+
+    def on_source_rows_removed(self, parent, first, last):
+        kind = self.pending_removal[0]
+        self.pending_removal = None
+        if kind == 'layout':
+            persistent = self.persistentIndexList()
+            old_rows = [(index.row(), index.column()) for index in persistent]
+
+        removed = last - first + 1
+        self.source_rows = [
+            row - removed if row > last else row
+            for row in self.source_rows if not first <= row <= last
+        ]
+        self.index_proxy_rows()
+
+        if kind == 'rows':
+            self.endRemoveRows()
+        elif kind == 'reset':
+            self.endResetModel()
+        else:
+            # Visible rows kept their positions, only their source rows moved
+            self.changePersistentIndexList(persistent, [self.index(row, column) for row, column in old_rows])
+            self.layoutChanged.emit()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        model = self.sourceModel()
+        if orientation == Qt.Vertical and 0 <= section < len(self.source_rows):
+            section = self.source_rows[section]
+        return model.headerData(section, orientation, role)
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid() or proxy_index.row() >= len(self.source_rows):
+            return QModelIndex()
+        return self.sourceModel().index(self.source_rows[proxy_index.row()], proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        row = self.proxy_rows.get(source_index.row())
+        if row is None:
+            return QModelIndex()
+        return self.index(row, source_index.column())
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not 0 <= row < len(self.source_rows):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.source_rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        model = self.sourceModel()
+        return 0 if parent.isValid() or model is None else model.columnCount()
+
+
+class QuantitySpinBoxDelegate(QStyledItemDelegate):
+    """Paints a spin box for the quantity picker, a real one only while editing"""
+
+    def paint(self, painter, option, index):
+        spin_option = QStyleOptionSpinBox()
+        spin_option.rect = option.rect.adjusted(4, 4, -4, -4)
+        spin_option.state = option.state | QStyle.State_Enabled
+        spin_option.frame = True
+        spin_option.stepEnabled = QSpinBox.StepUpEnabled | QSpinBox.StepDownEnabled
+
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawComplexControl(QStyle.CC_SpinBox, spin_option, painter, option.widget)
+
+        # Leave room for the up/down arrows on the right
+        text_rect = spin_option.rect.adjusted(6, 0, -22, 0)
+        painter.save()
+        painter.setPen(option.palette.color(option.palette.Text))
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter, index.data(Qt.DisplayRole))
+        painter.restore()
+
+    def createEditor(self, parent, option, index):
+        editor = QSpinBox(parent)
+        editor.setRange(0, index.data(MAX_QTY_ROLE) or 0)
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.setValue(index.data(Qt.EditRole) or 0)
+
+    def setModelData(self, editor, model, index):
+        editor.interpretText()
+        model.setData(index, editor.value(), Qt.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect.adjusted(4, 4, -4, -4))
+
+
+class AddToCartButtonDelegate(QStyledItemDelegate):
+    """Paints the "Add to Cart" button and reports clicks on it"""
+    clicked = pyqtSignal(QModelIndex)
+
+    BUTTON_COLOR = QColor("#28a745")
+    BUTTON_HOVER_COLOR = QColor("#218838")
+
+    def button_rect(self, option):
+        return QRect(option.rect).adjusted(6, 6, -6, -6)
+
+    def paint(self, painter, option, index):
+        rect = self.button_rect(option)
+        hovering = bool(option.state & QStyle.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        path = QPainterPath()
+        path.addRoundedRect(rect.x(), rect.y(), rect.width(), rect.height(), 3, 3)
+        painter.fillPath(path, self.BUTTON_HOVER_COLOR if hovering else self.BUTTON_COLOR)
+
+        font = QFont(option.font)
+        font.setPixelSize(10)
+        painter.setFont(font)
+        painter.setPen(Qt.white)
+        painter.drawText(rect, Qt.AlignCenter, index.data(Qt.DisplayRole))
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton
+                and self.button_rect(option).contains(event.pos())):
+            self.clicked.emit(index)
+            return True
+        return super().editorEvent(event, model, option, index)
@@ -0,0 +1,114 @@
+import asyncio
+import ipaddress
+import socket
+
+RAW_PRINTER_PORT = 9100  # JetDirect: takes raw ESC/POS bytes
+
+# Ports receipt printers listen on, in order of preference. Only the raw
+# port prints ESC/POS; LPD and IPP expect their own protocols.
+PRINTER_PORTS = {
+    RAW_PRINTER_PORT: 'raw',
+    515: 'lpd',
+    631: 'ipp'
+}
+
+CONNECT_TIMEOUT = 0.5  # seconds per connection attempt
+STATUS_TIMEOUT = 0.5  # seconds to wait for an ESC/POS status reply
+MAX_CONCURRENT_PROBES = 128
+
+# DLE EOT 1: transmit printer status. ESC/POS printers answer with one
+# byte whose bits 1 and 4 are always set and bits 0 and 7 always clear.
+ESCPOS_STATUS_REQUEST = b"\x10\x04\x01"
+ESCPOS_STATUS_MASK = 0x93
+ESCPOS_STATUS_FIXED = 0x12
+
+
+def local_subnet_hosts():
+    """Addresses of the other hosts on this machine's /24 network"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        # Picks the interface used for outgoing traffic; nothing is sent
+        sock.connect(("10.255.255.255", 1))
+        local_ip = sock.getsockname()[0]
+    except OSError:
+        return []
+    finally:
+        sock.close()
+
+    if local_ip.startswith("127."):
+        return []
+    network = ipaddress.ip_network(f"{local_ip}/24", strict=False)
+    return [str(host) for host in network.hosts() if str(host) != local_ip]
+
+
+async def probe_port(host, port, protocol, semaphore, timeout):
+    """Return (host, port, is_escpos) if host accepts connections on port, else None"""
+    async with semaphore:
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return None
+
+        is_escpos = False
+        try:
+            if protocol == 'raw':
+                writer.write(ESCPOS_STATUS_REQUEST)
+                await writer.drain()
+                reply = await asyncio.wait_for(reader.read(1), STATUS_TIMEOUT)
+                is_escpos = len(reply) == 1 and reply[0] & ESCPOS_STATUS_MASK == ESCPOS_STATUS_FIXED
+        except (OSError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+        return host, port, is_escpos
+
+
+async def scan_printers(hosts, ports=None, concurrency=MAX_CONCURRENT_PROBES, timeout=CONNECT_TIMEOUT):
+    """Probe every host on every printer port, at most concurrency at a time"""
+    ports = ports or PRINTER_PORTS
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(*(
+        probe_port(host, port, protocol, semaphore, timeout) for host in hosts for port, protocol in ports.items()
+    ))
+
+    # One entry per host, on its most preferred open port
+    found = {}
+    port_order = list(ports)
+    for result in results:
+        if result is None:
+            continue
+        host, port, is_escpos = result
+        current = found.get(host)
+        if current is None or port_order.index(port) < port_order.index(current[0]):
+            found[host] = (port, is_escpos)
+
+    printers = []
+    for host, (port, is_escpos) in found.items():
+        protocol = ports[port]
+        label = "ESC/POS" if is_escpos else protocol.upper()
+        printers.append({
+            'name': f"Network Printer {host}:{port} ({label})",
+            'ip': host,
+            'port': port,
+            'protocol': protocol,
+            'escpos': is_escpos
+        })
+    printers.sort(key=lambda printer: (not printer['escpos'], ipaddress.ip_address(printer['ip'])))
+    return printers
+
+
+def discover_network_printers(hosts=None, ports=None, concurrency=MAX_CONCURRENT_PROBES, timeout=CONNECT_TIMEOUT):
+    """Find printers on the local network (or on the given hosts)
+
+    ESC/POS printers that answer a status request are listed first. ports
+    maps port numbers to protocol names, defaulting to PRINTER_PORTS.
+    """
+    if hosts is None:
+        hosts = local_subnet_hosts()
+    if not hosts:
+        return []
+    return asyncio.run(scan_printers(hosts, ports, concurrency, timeout))
@@ -18,4 +18,15 @@ def get_base_path():
         
         return user_data_path
     # Running from .py source - use original location
-    return os.path.dirname(os.path.abspath(__file__))
\ No newline at end of file
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def shop_path_of(shop):
+    """Folder of a shop given by its folder name under the data folder or by a path"""
+    # Imported here so get_base_path stays usable without the rest of the app
+    from core import InventoryError
+    from shop_catalog import SHOP_INFO_FILE
+    shop_path = shop if os.path.isdir(shop) else os.path.join(get_base_path(), 'data', shop)
+    if not os.path.isfile(os.path.join(shop_path, SHOP_INFO_FILE)):
+        raise InventoryError(f"No shop found at {shop_path}")
+    return shop_path
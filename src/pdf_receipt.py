@@ -0,0 +1,143 @@
+import copy
+import threading
+from datetime import datetime
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+RECEIPT_WIDTH_MM = 80  # thermal roll width
+RECEIPT_MARGIN_MM = 4
+
+
+def header_fields(shop_data):
+    """The shop_info.json fields printed in the receipt header"""
+    return (
+        shop_data.get('shop_name', 'Unknown Shop'),
+        shop_data.get('owner_name', ''),
+        shop_data.get('address', ''),
+        tuple(shop_data.get('mobile_numbers', [])),
+    )
+
+
+def escape(text):
+    """Escape text for use in Paragraph markup"""
+    return str(text).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+class ReceiptPdfRenderer:
+    """Lays out receipt PDFs for one shop
+
+    Paragraph and table styles and the shop header flowables are built
+    once when the renderer is created, so rendering a receipt only lays
+    out its own lines. Use get_receipt_renderer() to share renderers.
+    """
+
+    def __init__(self, shop_data):
+        self.fields = header_fields(shop_data)
+        self.width = RECEIPT_WIDTH_MM * mm
+        self.margin = RECEIPT_MARGIN_MM * mm
+        self.content_width = self.width - 2 * self.margin
+
+        self.title_style = ParagraphStyle('ReceiptTitle', fontName='Helvetica-Bold', fontSize=12,
+                                          leading=15, alignment=TA_CENTER)
+        self.header_style = ParagraphStyle('ReceiptHeader', fontName='Helvetica', fontSize=8,
+                                           leading=10, alignment=TA_CENTER)
+        self.text_style = ParagraphStyle('ReceiptText', fontName='Helvetica', fontSize=8, leading=10)
+        self.item_style = ParagraphStyle('ReceiptItem', fontName='Helvetica', fontSize=8, leading=10)
+        self.amount_style = ParagraphStyle('ReceiptAmount', fontName='Helvetica', fontSize=8,
+                                           leading=10, alignment=TA_RIGHT)
+        self.total_style = ParagraphStyle('ReceiptTotal', fontName='Helvetica-Bold', fontSize=9,
+                                          leading=11, alignment=TA_RIGHT)
+
+        self.column_widths = [self.content_width * 0.62, self.content_width * 0.38]
+        self.table_style = TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+            ('TOPPADDING', (0, 0), (-1, -1), 1),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+            ('LINEBELOW', (0, 0), (-1, 0), 0.5, colors.black),
+            ('LINEABOVE', (0, -1), (-1, -1), 0.5, colors.black),
+        ])
+
+        self.header = self.build_header()
+        self.footer = [Spacer(1, 3 * mm), Paragraph("THANK YOU!", self.header_style)]
+
+    def build_header(self):
+        shop_name, owner_name, address, mobile_numbers = self.fields
+        header = [Paragraph("RECEIPT", self.title_style), Paragraph(escape(shop_name), self.title_style)]
+        if owner_name:
+            header.append(Paragraph(f"Owner: {escape(owner_name)}", self.header_style))
+        if address:
+            header.append(Paragraph(escape(address), self.header_style))
+        if mobile_numbers:
+            header.append(Paragraph(escape(" | ".join(mobile_numbers)), self.header_style))
+        header.append(Spacer(1, 3 * mm))
+        return header
+
+    def render(self, file_path, receipt_no, cart_data, when=None):
+        """Write the receipt PDF for cart_data to file_path"""
+        when = when or datetime.now()
+
+        details = [
+            Paragraph(f"Date: {when.strftime('%d-%m-%Y')} &nbsp; Time: {when.strftime('%I:%M %p')}", self.text_style),
+            Paragraph(f"Receipt#: {escape(receipt_no)}", self.text_style),
+            Spacer(1, 2 * mm),
+        ]
+
+        rows = [[Paragraph("<b>ITEMS</b>", self.item_style), Paragraph("<b>AMOUNT</b>", self.amount_style)]]
+        total_amount = 0.0
+        for item in cart_data:
+            total_amount += item['total_price']
+            rows.append([
+                Paragraph(f"{item['quantity']} x {escape(item['name'])}", self.item_style),
+                Paragraph(f"Rs {item['total_price']:.2f}", self.amount_style),
+            ])
+        rows.append([Paragraph("<b>TOTAL AMOUNT</b>", self.item_style),
+                     Paragraph(f"Rs {total_amount:.2f}", self.total_style)])
+
+        items_table = Table(rows, colWidths=self.column_widths)
+        items_table.setStyle(self.table_style)
+
+        # Layout marks flowables, so the prebuilt ones are copied per receipt
+        story = [copy.copy(flowable) for flowable in self.header] + details + [items_table]
+        story += [copy.copy(flowable) for flowable in self.footer]
+
+        # One page exactly as long as the receipt, like a till roll. The
+        # document frame pads its content by 6pt on every side.
+        frame_width = self.content_width - 12
+        height = 2 * self.margin + 12 + 2 * mm
+        for flowable in story:
+            height += flowable.wrap(frame_width, 1e6)[1]
+            height += flowable.getSpaceBefore() + flowable.getSpaceAfter()
+
+        document = SimpleDocTemplate(
+            file_path, pagesize=(self.width, height),
+            leftMargin=self.margin, rightMargin=self.margin,
+            topMargin=self.margin, bottomMargin=self.margin,
+            title=f"Receipt {receipt_no}",
+        )
+        document.build(story)
+
+
+receipt_renderers = {}
+receipt_renderers_lock = threading.Lock()
+
+
+def get_receipt_renderer(shop_folder, shop_data):
+    """Cached renderer of a shop, rebuilt when its header fields change"""
+    if not REPORTLAB_AVAILABLE:
+        raise RuntimeError("PDF receipts require reportlab. Install it with: pip install reportlab")
+
+    with receipt_renderers_lock:
+        renderer = receipt_renderers.get(shop_folder)
+        if renderer is None or renderer.fields != header_fields(shop_data):
+            renderer = receipt_renderers[shop_folder] = ReceiptPdfRenderer(shop_data)
+        return renderer
@@ -1,6 +1,5 @@
 import os
 import json
-from datetime import datetime
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
     QComboBox, QGroupBox, QMessageBox, QTextEdit,
@@ -11,58 +10,141 @@ from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
 from PyQt5.QtGui import QTextDocument
 import sys
+import time
 import subprocess
 import platform
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from file_utils import write_json_atomic
+from network_discovery import discover_network_printers, RAW_PRINTER_PORT
+from receipt_numbers import get_receipt_allocator
+from shop_client import SHOP_SERVER_KEY, SHOP_TOKEN_KEY, get_shop_client, RemoteReceiptAllocator
+from print_spooler import get_print_spooler, escpos_available
+from core.receipts import format_receipt_text
 
-try:
-    from escpos.printer import Usb, Serial, Network, File
-    from escpos import printer
-    import usb.core
-    import serial.tools.list_ports
-    ESCPOS_AVAILABLE = True
-except ImportError:
-    ESCPOS_AVAILABLE = False
+# python-escpos, pyusb and pyserial are imported where printers are
+# detected or printed to, and ReportLab (pdf_receipt) when a PDF is saved
+
+PRINTER_CACHE_FILE = "printer_cache.json"
+PRINTER_CACHE_TTL = 10 * 60  # seconds
+
+# Seconds each detector may take before its results are given up on
+DETECTOR_TIMEOUTS = {
+    'usb': 5,
+    'serial': 5,
+    'network': 10,
+    'system': 10
+}
+
+
+def device_signature():
+    """Cheap fingerprint of the attached serial and USB devices
+
+    Changes when a device is plugged in or removed, which invalidates the
+    cached detection results.
+    """
+    signature = []
+    try:
+        import serial.tools.list_ports
+        signature.extend(sorted(port.device for port in serial.tools.list_ports.comports()))
+    except Exception:
+        pass
+    try:
+        if os.path.isdir('/sys/bus/usb/devices'):
+            signature.extend(sorted(os.listdir('/sys/bus/usb/devices')))
+        elif escpos_available():
+            import usb.core
+            signature.extend(sorted(f"{d.idVendor:04x}:{d.idProduct:04x}" for d in usb.core.find(find_all=True)))
+    except Exception:
+        pass
+    return signature
+
+
+class PrinterCache:
+    """Last detected printers of a shop, kept in the shop folder"""
+
+    def __init__(self, shop_dir):
+        self.path = os.path.join(shop_dir, PRINTER_CACHE_FILE)
+
+    def load(self):
+        """Cached entry ({'detected_at', 'signature', 'printers'}), or None"""
+        try:
+            with open(self.path, 'r') as f:
+                entry = json.load(f)
+            return entry if isinstance(entry.get('printers'), dict) else None
+        except (OSError, ValueError):
+            return None
+
+    def save(self, printers, signature):
+        try:
+            write_json_atomic(self.path, {
+                'detected_at': time.time(),
+                'signature': signature,
+                'printers': printers
+            })
+        except OSError as e:
+            print(f"Could not save printer cache: {e}")
+
+    def is_fresh(self, entry, signature):
+        return (entry is not None
+                and time.time() - entry.get('detected_at', 0) < PRINTER_CACHE_TTL
+                and entry.get('signature') == signature)
 
-try:
-    from reportlab.lib.pagesizes import letter, A4, A5
-    from reportlab.lib import colors
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.enums import TA_CENTER
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
 
 class PrinterDetectionThread(QThread):
-    """Thread for detecting available printers"""
+    """Thread for detecting available printers
+
+    The detectors run concurrently, each with its own timeout. With a
+    cache, results are reused while they are younger than
+    PRINTER_CACHE_TTL and no device was plugged in or removed, unless
+    force is set.
+    """
     printers_found = pyqtSignal(dict)
     detection_finished = pyqtSignal()
     
+    def __init__(self, cache=None, force=True, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.force = force
+    
     def run(self):
-        printers = self.detect_all_printers()
+        if self.cache is None:
+            printers = self.detect_all_printers()
+        else:
+            signature = device_signature()
+            entry = self.cache.load()
+            if not self.force and self.cache.is_fresh(entry, signature):
+                printers = entry['printers']
+            else:
+                printers = self.detect_all_printers()
+                self.cache.save(printers, signature)
         self.printers_found.emit(printers)
         self.detection_finished.emit()
     
     def detect_all_printers(self):
         """Detect all available printers"""
-        printers = {
-            'usb': [],
-            'serial': [],
-            'network': [],
-            'system': []
+        detectors = {
+            'usb': self.detect_usb_printers,
+            'serial': self.detect_serial_printers,
+            'network': self.detect_network_printers,
+            'system': self.detect_system_printers
         }
+        printers = {}
         
-        # Detect USB printers
-        printers['usb'] = self.detect_usb_printers()
-        
-        # Detect Serial printers
-        printers['serial'] = self.detect_serial_printers()
-        
-        # Detect Network printers (basic scan)
-        printers['network'] = self.detect_network_printers()
-        
-        # Detect System printers
-        printers['system'] = self.detect_system_printers()
+        executor = ThreadPoolExecutor(max_workers=len(detectors), thread_name_prefix="printer-detect")
+        futures = {kind: executor.submit(detect) for kind, detect in detectors.items()}
+        started = time.monotonic()
+        for kind, future in futures.items():
+            remaining = DETECTOR_TIMEOUTS[kind] - (time.monotonic() - started)
+            try:
+                printers[kind] = future.result(timeout=max(remaining, 0))
+            except FutureTimeoutError:
+                print(f"{kind.capitalize()} printer detection timed out")
+                printers[kind] = []
+            except Exception as e:
+                print(f"{kind.capitalize()} printer detection error: {e}")
+                printers[kind] = []
+        # A detector that timed out is left to finish on its own
+        executor.shutdown(wait=False)
         
         return printers
     
@@ -70,7 +152,7 @@ class PrinterDetectionThread(QThread):
         """Detect USB thermal printers"""
         usb_printers = []
         
-        if not ESCPOS_AVAILABLE:
+        if not escpos_available():
             return usb_printers
         
         try:
@@ -142,24 +224,16 @@ class PrinterDetectionThread(QThread):
         return serial_printers
     
     def detect_network_printers(self):
-        """Basic network printer detection"""
-        network_printers = []
-        
-        # This is a basic implementation - you might want to implement
-        # more sophisticated network discovery
+        """Scan the local network for printers taking raw ESC/POS on port 9100
+
+        LPD and IPP queues are not offered: raw ESC/POS sent to them does
+        not print and may get stuck in the printer's queue.
+        """
         try:
-            # Common thermal printer IP ranges and ports
-            common_ports = [9100, 515, 631]  # Raw, LPD, IPP
-            
-            # You could implement network scanning here
-            # For now, we'll just return an empty list
-            # In a real implementation, you might scan local network
-            pass
-            
+            return discover_network_printers(ports={RAW_PRINTER_PORT: 'raw'})
         except Exception as e:
             print(f"Network detection error: {e}")
-        
-        return network_printers
+            return []
     
     def detect_system_printers(self):
         """Detect system-installed printers"""
@@ -185,7 +259,8 @@ class PrinterDetectionThread(QThread):
                     # Alternative method using subprocess
                     try:
                         result = subprocess.run(['wmic', 'printer', 'get', 'name,status'], 
-                                              capture_output=True, text=True)
+                                              capture_output=True, text=True,
+                                              timeout=DETECTOR_TIMEOUTS['system'])
                         lines = result.stdout.strip().split('\n')[1:]  # Skip header
                         for line in lines:
                             if line.strip():
@@ -202,7 +277,8 @@ class PrinterDetectionThread(QThread):
             elif system == "Linux":
                 # Linux CUPS printers
                 try:
-                    result = subprocess.run(['lpstat', '-p'], capture_output=True, text=True)
+                    result = subprocess.run(['lpstat', '-p'], capture_output=True, text=True,
+                                            timeout=DETECTOR_TIMEOUTS['system'])
                     lines = result.stdout.strip().split('\n')
                     for line in lines:
                         if line.startswith('printer'):
@@ -218,7 +294,8 @@ class PrinterDetectionThread(QThread):
             
             elif system == "Darwin":  # macOS
                 try:
-                    result = subprocess.run(['lpstat', '-p'], capture_output=True, text=True)
+                    result = subprocess.run(['lpstat', '-p'], capture_output=True, text=True,
+                                            timeout=DETECTOR_TIMEOUTS['system'])
                     lines = result.stdout.strip().split('\n')
                     for line in lines:
                         if line.startswith('printer'):
@@ -237,6 +314,10 @@ class PrinterDetectionThread(QThread):
         
         return system_printers
 
+# Detection threads still running, see PrintReceiptDialog.start_detection
+running_detections = set()
+
+
 def get_base_path():
     if getattr(sys, 'frozen', False):
         # PyInstaller: use the temp extraction directory
@@ -245,11 +326,12 @@ def get_base_path():
 
 
 class PrintReceiptDialog(QDialog):
-    def __init__(self, shop_data, cart_data, shop_folder, parent=None):
+    def __init__(self, shop_data, cart_data, shop_folder, parent=None, print_jobs=None):
         super().__init__(parent)
         self.shop_data = shop_data
         self.cart_data = cart_data
         self.shop_folder = shop_folder
+        self.print_jobs = print_jobs  # set the ids of queued print jobs are added to
         self.detected_printers = {}
         
         # Get the project structure paths
@@ -265,8 +347,24 @@ class PrintReceiptDialog(QDialog):
         
         # Create bills directory if it doesn't exist
         os.makedirs(self.bills_dir, exist_ok=True)
+
+        # The receipt number is only used up when the receipt is issued. Tills
+        # on a shop server share its counter.
+        if self.shop_data.get(SHOP_SERVER_KEY):
+            self.receipt_allocator = RemoteReceiptAllocator(
+                get_shop_client(self.shop_data[SHOP_SERVER_KEY], self.shop_data.get(SHOP_TOKEN_KEY))
+            )
+        else:
+            self.receipt_allocator = get_receipt_allocator(
+                self.shop_dir, self.shop_data.get('receipt_block_size', 1)
+            )
+        self.receipt_no = None
+        
+        self.printer_cache = PrinterCache(self.shop_dir)
+        self.detection_thread = None
         
         self.setup_ui()
+        self.load_cached_printers()
         
     def setup_ui(self):
         self.setWindowTitle("Print Receipt")
@@ -304,7 +402,7 @@ class PrintReceiptDialog(QDialog):
         printer_label = QLabel("Output Type:")
         self.printer_combo = QComboBox()
         self.printer_combo.addItems(["Save as PDF", "Thermal Printer (ESC/POS)", "Regular Printer"])
-        if not ESCPOS_AVAILABLE:
+        if not escpos_available():
             self.printer_combo.setItemData(1, 0, Qt.UserRole - 1)  # Disable thermal printer
         
         print_layout.addWidget(printer_label)
@@ -375,7 +473,7 @@ class PrintReceiptDialog(QDialog):
         
         # Manual entry (for network printers or custom configurations)
         self.manual_entry_input = QLineEdit()
-        self.manual_entry_input.setPlaceholderText("Manual IP/Path (optional)")
+        self.manual_entry_input.setPlaceholderText("Manual IP[:port]/Path (optional)")
         form_layout.addRow("Manual Entry:", self.manual_entry_input)
         
         thermal_layout.addLayout(form_layout)
@@ -439,16 +537,34 @@ class PrintReceiptDialog(QDialog):
         else:
             self.thermal_group.setVisible(False)
     
+    def load_cached_printers(self):
+        """Show the last known printers at once, and refresh them in the background"""
+        entry = self.printer_cache.load()
+        if entry is not None:
+            self.detected_printers = entry['printers']
+            self.update_printer_list()
+        self.start_detection(force=False)
+    
     def detect_printers(self):
         """Start printer detection in background thread"""
+        self.start_detection(force=True)
+    
+    def start_detection(self, force):
+        if self.detection_thread is not None and self.detection_thread.isRunning():
+            return
+        self.detection_forced = force
         self.detect_btn.setEnabled(False)
         self.detection_progress.setVisible(True)
         
-        # Start detection thread
-        self.detection_thread = PrinterDetectionThread()
-        self.detection_thread.printers_found.connect(self.on_printers_detected)
-        self.detection_thread.detection_finished.connect(self.on_detection_finished)
-        self.detection_thread.start()
+        # Start detection thread; it is kept alive until it finishes,
+        # even if the dialog is closed first
+        thread = PrinterDetectionThread(self.printer_cache, force)
+        thread.printers_found.connect(self.on_printers_detected)
+        thread.detection_finished.connect(self.on_detection_finished)
+        running_detections.add(thread)
+        thread.finished.connect(lambda: running_detections.discard(thread))
+        self.detection_thread = thread
+        thread.start()
     
     def on_printers_detected(self, printers):
         """Handle detected printers"""
@@ -460,6 +576,10 @@ class PrintReceiptDialog(QDialog):
         self.detect_btn.setEnabled(True)
         self.detection_progress.setVisible(False)
         
+        # Background refreshes finish quietly
+        if not self.detection_forced:
+            return
+        
         # Show detection results
         total_found = sum(len(printers) for printers in self.detected_printers.values())
         if total_found > 0:
@@ -482,6 +602,9 @@ class PrintReceiptDialog(QDialog):
         
         if connection_type in self.detected_printers:
             printers = self.detected_printers[connection_type]
+            if connection_type == 'network':
+                # Caches of older versions also list LPD and IPP printers
+                printers = [printer for printer in printers if printer.get('port') == RAW_PRINTER_PORT]
             if printers:
                 for printer in printers:
                     self.available_printers_combo.addItem(printer['name'], printer)
@@ -515,9 +638,43 @@ class PrintReceiptDialog(QDialog):
         
         return None
     
+    def thermal_printer_spec(self, printer_config):
+        """Printer spec for the print spooler from the selected configuration"""
+        connection_type = printer_config['type']
+        
+        if printer_config['manual']:
+            # Manual configuration
+            address = printer_config['address']
+            
+            if connection_type == 'usb':
+                # Parse USB address (vendor_id:product_id)
+                if ':' in address:
+                    vid, pid = address.split(':')
+                    return ('usb', int(vid, 16), int(pid, 16))
+                raise ValueError("USB format should be vendor_id:product_id (hex)")
+            if connection_type == 'serial':
+                return ('serial', address)
+            if connection_type == 'network':
+                # host or host:port
+                host, _, port = address.partition(':')
+                return ('network', host, int(port) if port else RAW_PRINTER_PORT)
+        
+        else:
+            # Auto-detected printer
+            printer_data = printer_config['printer_data']
+            
+            if connection_type == 'usb':
+                return ('usb', int(printer_data['vendor_id'], 16), int(printer_data['product_id'], 16))
+            if connection_type == 'serial':
+                return ('serial', printer_data['device'])
+            if connection_type == 'network':
+                return ('network', printer_data['ip'], RAW_PRINTER_PORT)
+        
+        raise ValueError(f"Unsupported connection type: {connection_type}")
+    
     def print_thermal(self):
-        """Print using thermal printer with auto-detected configuration"""
-        if not ESCPOS_AVAILABLE:
+        """Queue the receipt on the background thermal print spooler"""
+        if not escpos_available():
             QMessageBox.warning(self, "Not Available", 
                               "ESC/POS library not installed. Please install python-escpos.")
             return False
@@ -529,59 +686,13 @@ class PrintReceiptDialog(QDialog):
             return False
         
         try:
-            # Create printer instance based on configuration
-            if printer_config['manual']:
-                # Manual configuration
-                connection_type = printer_config['type']
-                address = printer_config['address']
-                
-                if connection_type == 'usb':
-                    # Parse USB address (vendor_id:product_id)
-                    if ':' in address:
-                        vid, pid = address.split(':')
-                        p = Usb(int(vid, 16), int(pid, 16))
-                    else:
-                        raise ValueError("USB format should be vendor_id:product_id (hex)")
-                        
-                elif connection_type == 'serial':
-                    p = Serial(address)
-                    
-                elif connection_type == 'network':
-                    p = Network(address)
-                    
-                else:
-                    raise ValueError(f"Unsupported connection type: {connection_type}")
+            printer_spec = self.thermal_printer_spec(printer_config)
+            receipt_no = self.receipt_number()
+            receipt_text = self.generate_receipt_text(receipt_no)
             
-            else:
-                # Auto-detected printer
-                printer_data = printer_config['printer_data']
-                connection_type = printer_config['type']
-                
-                if connection_type == 'usb':
-                    vid = int(printer_data['vendor_id'], 16)
-                    pid = int(printer_data['product_id'], 16)
-                    p = Usb(vid, pid)
-                    
-                elif connection_type == 'serial':
-                    p = Serial(printer_data['device'])
-                    
-                elif connection_type == 'network':
-                    # This would need the IP address from network detection
-                    ip = printer_data.get('ip', '192.168.1.100')
-                    p = Network(ip)
-                    
-                else:
-                    raise ValueError(f"Unsupported connection type: {connection_type}")
-            
-            # Generate and print receipt
-            receipt_text = self.generate_receipt_text()
-            
-            # Print the receipt
-            p.text(receipt_text)
-            p.cut()
-            p.close()
-            
-            QMessageBox.information(self, "Success", "Receipt printed successfully!")
+            # Printing happens in the background; the spooler reports
+            # progress to the inventory window
+            get_print_spooler().submit(printer_spec, receipt_text, receipt_no, self.print_jobs)
             return True
             
         except Exception as e:
@@ -595,92 +706,26 @@ class PrintReceiptDialog(QDialog):
         receipt_text = self.generate_receipt_text()
         self.preview_text.setText(receipt_text)
     
-    def generate_receipt_text(self):
-        """Generate receipt text content"""
-        receipt = []
-        
-        # Header
-        receipt.append("*" * 35)
-        receipt.append("RECEIPT".center(35))
-        receipt.append("*" * 35)
-        
-        # Shop Info
-        shop_name = self.shop_data.get('shop_name', 'Unknown Shop')
-        receipt.append(shop_name.center(35))
-        
-        owner_name = self.shop_data.get('owner_name', '')
-        if owner_name:
-            receipt.append(f"Owner: {owner_name}".center(35))
-        
-        address = self.shop_data.get('address', '')
-        if address:
-            receipt.append(address.center(35))
-        
-        mobile_numbers = self.shop_data.get('mobile_numbers', [])
-        if mobile_numbers:
-            mobile_text = " | ".join(mobile_numbers)
-            receipt.append(mobile_text.center(35))
-        
-        receipt.append("-" * 35)
-        
-        # Date and Time
-        now = datetime.now()
-        receipt.append(f"Date: {now.strftime('%d-%m-%Y')}")
-        receipt.append(f"Time: {now.strftime('%I:%M %p')}")
-        
-        # Receipt Number
-        receipt_no = self.get_next_receipt_number()
-        receipt.append(f"Receipt#: {receipt_no}")
-        receipt.append("-" * 35)
-        
-        # Items
-        receipt.append("ITEMS:")
-        receipt.append("-" * 35)
-        
-        for item in self.cart_data:
-            item_line = f"{item['quantity']} x {item['name']}"
-            if len(item_line) > 25:
-                item_line = item_line[:22] + "..."
-            price_text = f"Rs {item['total_price']:.2f}"
-            receipt.append(f"{item_line:<25} {price_text:>9}")
-        
-        receipt.append("-" * 35)
-        
-        # Totals
-        total_line = f"TOTAL AMOUNT"
-        total_amount = sum(item['total_price'] for item in self.cart_data)
-        total_price = f"Rs {total_amount:.2f}"
-        receipt.append(f"{total_line:<25} {total_price:>9}")
-        
-        receipt.append("-" * 35)
-        receipt.append("THANK YOU!".center(35))
-        receipt.append("*" * 35)
-        
-        return "\n".join(receipt)
-    
-    def get_next_receipt_number(self):
-        """Generate next receipt number"""
-        receipt_files = [f for f in os.listdir(self.bills_dir) if f.startswith('sr#') and f.endswith('.pdf')]
-        
-        if not receipt_files:
-            return "sr#0001"
-        
-        # Extract numbers and find max
-        numbers = []
-        for filename in receipt_files:
-            try:
-                num_str = filename[3:7]  # Extract 4 digits after "sr#"
-                numbers.append(int(num_str))
-            except:
-                continue
-        
-        if numbers:
-            next_num = max(numbers) + 1
-        else:
-            next_num = 1
-        
-        return f"sr#{next_num:04d}"
+    def generate_receipt_text(self, receipt_no=None):
+        """Generate receipt text content
+
+        Without a receipt_no (the preview) the number shown is the one the
+        receipt will most likely get.
+        """
+        if receipt_no is None:
+            receipt_no = self.receipt_no or self.receipt_allocator.peek()
+        return format_receipt_text(self.shop_data, self.cart_data, receipt_no)
     
+    def receipt_number(self):
+        """Number of the receipt being issued, allocated on first use
+
+        Kept for the life of the dialog, so retrying after a cancelled
+        save or a printer error does not use up another number.
+        """
+        if self.receipt_no is None:
+            self.receipt_no = self.receipt_allocator.allocate()
+        return self.receipt_no
+
     def print_receipt(self):
         """Print or save the receipt"""
         printer_type = self.printer_combo.currentText()
@@ -725,28 +770,22 @@ class PrintReceiptDialog(QDialog):
         #     QMessageBox.critical(self, "Error", f"Failed to process receipt: {str(e)}")
     
     def save_as_pdf(self):
-        """Save receipt as PDF"""
+        """Save receipt as PDF in the shop's bills folder"""
+        from pdf_receipt import REPORTLAB_AVAILABLE, get_receipt_renderer
         if not REPORTLAB_AVAILABLE:
             # Fallback to simple text file
             return self.save_as_text_file()
         
-        receipt_no = self.get_next_receipt_number()
-        
-        # Show file dialog to let user choose where to save
-        default_filename = f"{receipt_no}.pdf"
-        default_path = os.path.join(self.bills_dir, default_filename)
+        receipt_no = self.receipt_number()
+        filename = os.path.join(self.bills_dir, f"{receipt_no}.pdf")
         
-        filename, _ = QFileDialog.getSaveFileName(
-            self,
-            "Save Receipt As PDF",
-            default_path,
-            "PDF Files (*.pdf);;All Files (*)"
-        )
-        
-        if not filename:
+        try:
+            renderer = get_receipt_renderer(self.shop_folder, self.shop_data)
+            renderer.render(filename, receipt_no, self.cart_data)
+        except Exception as e:
+            QMessageBox.critical(self, "Save Error", f"Failed to save receipt as PDF:\n{str(e)}")
             return False
         
-        # Create PDF (implementation remains the same as your original code)
         QMessageBox.information(
             self, 
             "PDF Saved Successfully", 
@@ -757,7 +796,7 @@ class PrintReceiptDialog(QDialog):
     def save_as_text_file(self):
         """Fallback: Save as text file when reportlab is not available"""
         try:
-            receipt_no = self.get_next_receipt_number()
+            receipt_no = self.receipt_number()
             
             # Show file dialog to let user choose where to save
             default_filename = f"{receipt_no}.txt"
@@ -774,7 +813,7 @@ class PrintReceiptDialog(QDialog):
                 return False  # User cancelled
             
             # Generate receipt text
-            receipt_text = self.generate_receipt_text()
+            receipt_text = self.generate_receipt_text(receipt_no)
             
             # Write to file
             with open(filename, 'w', encoding='utf-8') as file:
@@ -793,7 +832,7 @@ class PrintReceiptDialog(QDialog):
     
     def print_regular(self):
         """Print using regular printer"""
-        receipt_text = self.generate_receipt_text()
+        receipt_text = self.generate_receipt_text(self.receipt_number())
         
         printer = QPrinter()
         dialog = QPrintDialog(printer, self)
@@ -805,12 +844,17 @@ class PrintReceiptDialog(QDialog):
             return True
         return False
         
-def show_print_receipt_dialog(inventory_manager, cart_data):
-    """Main function to show print receipt dialog from inventory manager"""
+def show_print_receipt_dialog(inventory_manager, cart_data, print_jobs=None):
+    """Main function to show print receipt dialog from inventory manager
+
+    Returns the number of the issued receipt, or None if none was issued.
+    The ids of receipts queued on the thermal print spooler are added to
+    the set print_jobs.
+    """
     
     if not cart_data or all(not item for item in cart_data):
         QMessageBox.warning(inventory_manager, "Empty Cart", "Please add items to cart before printing receipt.")
-        return
+        return None
     
     try: 
         # Show print dialog
@@ -818,13 +862,14 @@ def show_print_receipt_dialog(inventory_manager, cart_data):
             inventory_manager.shop_info,
             cart_data,
             inventory_manager.shop_folder,
-            inventory_manager
+            inventory_manager,
+            print_jobs
         )
         result = print_dialog.exec_()
-        return result == QDialog.Accepted
+        return print_dialog.receipt_no if result == QDialog.Accepted else None
     except Exception as e:
         print(f"Error! {e}")
-        return False
+        return None
 
 # For testing
 if __name__ == "__main__":
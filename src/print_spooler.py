@@ -0,0 +1,155 @@
+import queue
+import threading
+import importlib.util
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+# Job statuses reported through PrintSpooler.job_status
+JOB_QUEUED = "queued"
+JOB_PRINTING = "printing"
+JOB_RETRYING = "retrying"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+MAX_ATTEMPTS = 4
+RETRY_DELAYS = [1, 2, 4]  # seconds to wait before each retry
+
+
+def escpos_available():
+    """Whether python-escpos is installed, without importing it"""
+    return importlib.util.find_spec("escpos") is not None
+
+
+def open_printer(printer_spec):
+    """Connect to a thermal printer described by a printer spec
+
+    A spec is ('usb', vendor_id, product_id), ('serial', device) or
+    ('network', host, port).
+    """
+    # Imported on the spooler thread when the first receipt is printed
+    from escpos.printer import Usb, Serial, Network
+
+    connection_type = printer_spec[0]
+    if connection_type == 'usb':
+        return Usb(printer_spec[1], printer_spec[2])
+    if connection_type == 'serial':
+        return Serial(printer_spec[1])
+    if connection_type == 'network':
+        return Network(printer_spec[1], port=printer_spec[2])
+    raise ValueError(f"Unsupported connection type: {connection_type}")
+
+
+class PrintSpooler(QThread):
+    """Background queue that sends receipts to thermal printers
+
+    Jobs are printed in the order they were submitted. The connection to
+    each printer is opened on first use and kept open for the next
+    receipts. When a job fails, the connection is dropped and the job is
+    retried on a fresh connection with a growing delay. After
+    MAX_ATTEMPTS failures the job is reported as failed.
+    """
+    job_status = pyqtSignal(int, str, str, str)  # job id, description, status, message
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = queue.Queue()
+        self.connections = {}
+        self.next_job_id = 1
+        self.job_id_lock = threading.Lock()
+        self.stopping = threading.Event()
+
+    def submit(self, printer_spec, receipt_text, description="", jobs=None):
+        """Queue a receipt for printing, returns the job id
+
+        description (e.g. the receipt number) is passed back with every
+        status update of the job. The job id is added to the set jobs
+        before any status is reported, so a window can tell its own jobs
+        from those of other windows.
+        """
+        if not escpos_available():
+            raise RuntimeError("ESC/POS library not installed. Please install python-escpos.")
+
+        with self.job_id_lock:
+            job_id = self.next_job_id
+            self.next_job_id += 1
+        if jobs is not None:
+            jobs.add(job_id)
+
+        self.jobs.put((job_id, tuple(printer_spec), receipt_text, description))
+        self.job_status.emit(job_id, description, JOB_QUEUED, "")
+        if not self.isRunning():
+            self.start()
+        return job_id
+
+    def run(self):
+        while not self.stopping.is_set():
+            job = self.jobs.get()
+            if job is None:
+                break
+            self.print_job(*job)
+        self.close_connections()
+
+    def print_job(self, job_id, printer_spec, receipt_text, description):
+        error = "Printing stopped"
+        for attempt in range(MAX_ATTEMPTS):
+            if attempt:
+                delay = RETRY_DELAYS[min(attempt, len(RETRY_DELAYS)) - 1]
+                self.job_status.emit(job_id, description, JOB_RETRYING, f"Retrying in {delay}s (attempt {attempt + 1} of {MAX_ATTEMPTS})")
+                if self.stopping.wait(delay):
+                    break
+
+            self.job_status.emit(job_id, description, JOB_PRINTING, "")
+            try:
+                printer = self.connection(printer_spec)
+                printer.text(receipt_text)
+                printer.cut()
+            except Exception as e:
+                error = str(e)
+                self.drop_connection(printer_spec)
+                continue
+
+            self.job_status.emit(job_id, description, JOB_DONE, "")
+            return
+
+        self.job_status.emit(job_id, description, JOB_FAILED, error)
+
+    def connection(self, printer_spec):
+        printer = self.connections.get(printer_spec)
+        if printer is None:
+            printer = self.connections[printer_spec] = open_printer(printer_spec)
+        return printer
+
+    def drop_connection(self, printer_spec):
+        printer = self.connections.pop(printer_spec, None)
+        if printer is not None:
+            try:
+                printer.close()
+            except Exception as e:
+                print(f"Error closing printer connection: {e}")
+
+    def close_connections(self):
+        for printer_spec in list(self.connections):
+            self.drop_connection(printer_spec)
+
+    def stop(self):
+        """Finish the job being printed, then close all connections
+
+        Jobs still waiting in the queue are dropped.
+        """
+        self.stopping.set()
+        self.jobs.put(None)
+        self.wait()
+
+
+print_spooler = None
+
+
+def get_print_spooler():
+    """The application's print spooler, created on first use"""
+    global print_spooler
+    if print_spooler is None:
+        print_spooler = PrintSpooler()
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(print_spooler.stop)
+    return print_spooler
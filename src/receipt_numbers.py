@@ -0,0 +1,108 @@
+import os
+import re
+import json
+import threading
+from file_utils import FileLock, write_json_atomic
+
+RECEIPT_COUNTER_FILE = "receipt_counter.json"
+RECEIPT_PREFIX = "sr#"
+RECEIPT_FILE_RE = re.compile(r"^sr#(\d+)\.(?:pdf|txt)$", re.IGNORECASE)
+
+
+def format_receipt_number(number):
+    """Receipt number as shown on receipts and used in file names (sr#0042)"""
+    return f"{RECEIPT_PREFIX}{number:04d}"
+
+
+def scan_bills_dir(bills_dir):
+    """Highest receipt number saved in a bills folder, or 0
+
+    Only used once per shop, to start the counter after existing receipts.
+    """
+    highest = 0
+    if os.path.isdir(bills_dir):
+        for filename in os.listdir(bills_dir):
+            match = RECEIPT_FILE_RE.match(filename)
+            if match:
+                highest = max(highest, int(match.group(1)))
+    return highest
+
+
+class ReceiptNumberAllocator:
+    """Hands out unique receipt numbers from a counter file in the shop folder
+
+    The counter file holds the next free number and is only changed while
+    holding its file lock, so windows and processes checking out at the
+    same time never get the same number. With block_size > 1 a terminal
+    reserves that many numbers at once and hands them out from memory,
+    touching the file once per block; numbers left in a block when the
+    program exits are skipped.
+    """
+
+    def __init__(self, shop_dir, block_size=1):
+        self.counter_path = os.path.join(shop_dir, RECEIPT_COUNTER_FILE)
+        self.bills_dir = os.path.join(shop_dir, "bills")
+        self.block_size = max(int(block_size), 1)
+        self.block_next = 0
+        self.block_end = 0  # exclusive
+        self.lock = threading.Lock()
+
+    def read_counter(self):
+        """Next free number in the counter file, starting after existing bills
+
+        A counter file that cannot be read (cut short by a crash, or edited
+        by hand) is treated like a missing one, so checkouts can go on; the
+        next reserve_block() writes a good one.
+        """
+        try:
+            with open(self.counter_path, 'r') as f:
+                number = int(json.load(f)['next_number'])
+            if number < 1:
+                raise ValueError(f"next_number is {number}")
+            return number
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Receipt counter {self.counter_path} is unreadable ({e!r}), starting after the saved bills")
+        return scan_bills_dir(self.bills_dir) + 1
+
+    def peek(self):
+        """The number the next allocate() will most likely return, without using it up"""
+        with self.lock:
+            if self.block_next < self.block_end:
+                return format_receipt_number(self.block_next)
+        try:
+            return format_receipt_number(self.read_counter())
+        except OSError as e:
+            print(f"Could not read receipt counter: {e}")
+            return format_receipt_number(1)
+
+    def allocate(self):
+        """Use up and return the next receipt number"""
+        with self.lock:
+            if self.block_next >= self.block_end:
+                self.reserve_block()
+            number = self.block_next
+            self.block_next += 1
+        return format_receipt_number(number)
+
+    def reserve_block(self):
+        with FileLock(self.counter_path):
+            start = self.read_counter()
+            write_json_atomic(self.counter_path, {'next_number': start + self.block_size})
+        self.block_next = start
+        self.block_end = start + self.block_size
+
+
+receipt_allocators = {}
+receipt_allocators_lock = threading.Lock()
+
+
+def get_receipt_allocator(shop_dir, block_size=1):
+    """Allocator of a shop, shared by all dialogs so a reserved block is not lost"""
+    key = os.path.abspath(shop_dir)
+    with receipt_allocators_lock:
+        allocator = receipt_allocators.get(key)
+        if allocator is None or allocator.block_size != max(int(block_size), 1):
+            allocator = receipt_allocators[key] = ReceiptNumberAllocator(shop_dir, block_size)
+        return allocator
@@ -0,0 +1,159 @@
+from datetime import date, timedelta
+
+try:
+    import numpy as np
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def require_pandas():
+    if not PANDAS_AVAILABLE:
+        raise RuntimeError("Sales reports require pandas. Install it with: pip install pandas")
+
+
+def day_text(day):
+    return day.strftime("%Y-%m-%d")
+
+
+def read_rollup(ledger, query, start, end):
+    """Rows of a daily rollup from start up to (not including) end, as a DataFrame"""
+    require_pandas()
+    return pd.read_sql_query(query, ledger.conn, params=(day_text(start), day_text(end)))
+
+
+def revenue_by_day(ledger, start, end):
+    """Sales, items and revenue of every day from start up to end; days without sales are zero"""
+    frame = read_rollup(
+        ledger,
+        "SELECT day, sale_count, item_count, revenue FROM daily_sales "
+        "WHERE day >= ? AND day < ? ORDER BY day",
+        start, end
+    )
+    days = pd.date_range(start, end - timedelta(days=1), freq="D")
+    frame.index = pd.to_datetime(frame.pop('day'))
+    return frame.reindex(days, fill_value=0).rename_axis('day')
+
+
+def revenue_by_month(ledger, start_month, end_month):
+    """Sales, items and revenue per month, for months 'YYYY-MM' from start_month up to end_month"""
+    require_pandas()
+    return pd.read_sql_query(
+        "SELECT month, sale_count, item_count, revenue FROM monthly_sales "
+        "WHERE month >= ? AND month < ? ORDER BY month",
+        ledger.conn, params=(start_month, end_month), index_col='month'
+    )
+
+
+def top_sellers(ledger, start, end, limit=10, by='revenue'):
+    """Best selling items between start and end, by 'revenue' or 'quantity'"""
+    frame = read_rollup(
+        ledger,
+        "SELECT name_key, item_name, quantity, revenue FROM daily_item_sales WHERE day >= ? AND day < ?",
+        start, end
+    )
+    # An empty result comes back with untyped columns, which nlargest refuses
+    frame = frame.astype({'quantity': 'int64', 'revenue': 'float64'})
+    totals = frame.groupby('name_key').agg(item_name=('item_name', 'first'), quantity=('quantity', 'sum'),
+                                      revenue=('revenue', 'sum'))
+    return totals.nlargest(limit, by).set_index('item_name')
+
+
+def category_mix(ledger, start, end):
+    """Quantity and revenue per category between start and end, with each category's share of revenue
+
+    Items in several categories count towards each of them, so shares can
+    add up to more than 1.
+    """
+    frame = read_rollup(
+        ledger,
+        "SELECT category, quantity, revenue FROM daily_category_sales WHERE day >= ? AND day < ?",
+        start, end
+    )
+    mix = frame.groupby('category')[['quantity', 'revenue']].sum().sort_values('revenue', ascending=False)
+    total_revenue = revenue_by_day(ledger, start, end)['revenue'].sum()
+    mix['share'] = mix['revenue'] / total_revenue if total_revenue else 0.0
+    return mix
+
+
+def hourly_heatmap(ledger, start, end, value='revenue'):
+    """Weekday x hour table of 'revenue' or 'sale_count' between start and end
+
+    Rows are Mon..Sun and columns the hours 0..23.
+    """
+    frame = read_rollup(
+        ledger,
+        "SELECT day, hour, sale_count, revenue FROM hourly_sales WHERE day >= ? AND day < ?",
+        start, end
+    )
+    frame['weekday'] = pd.to_datetime(frame['day']).dt.dayofweek
+    heatmap = frame.pivot_table(index='weekday', columns='hour', values=value, aggfunc='sum', fill_value=0)
+    heatmap = heatmap.reindex(index=range(7), columns=range(24), fill_value=0)
+    heatmap.index = WEEKDAYS
+    return heatmap
+
+
+def year_to_date(ledger, today=None):
+    """Totals of the current year up to and including today, with the best day
+
+    Reads one rollup row per day of the year, however many sales were made.
+    """
+    today = today or date.today()
+    daily = revenue_by_day(ledger, date(today.year, 1, 1), today + timedelta(days=1))
+    revenue = daily['revenue'].to_numpy()
+    best = int(np.argmax(revenue)) if revenue.any() else None
+    return {
+        'sale_count': int(daily['sale_count'].sum()),
+        'item_count': int(daily['item_count'].sum()),
+        'revenue': float(revenue.sum()),
+        'average_per_day': float(revenue.mean()) if len(revenue) else 0.0,
+        'best_day': daily.index[best].date() if best is not None else None,
+        'best_day_revenue': float(revenue[best]) if best is not None else 0.0,
+    }
+
+
+def sales_report_text(ledger, start, end, period_title):
+    """Text report of the year to date and of the sales from start up to end"""
+    ytd = year_to_date(ledger)
+    report = "📈 YEAR TO DATE\n"
+    report += "=" * 60 + "\n"
+    report += f"{'Sales:':<25} {ytd['sale_count']:>10}\n"
+    report += f"{'Items sold:':<25} {ytd['item_count']:>10}\n"
+    report += f"{'Revenue:':<25} Rs {ytd['revenue']:>10.2f}\n"
+    report += f"{'Average per day:':<25} Rs {ytd['average_per_day']:>10.2f}\n"
+    if ytd['best_day']:
+        report += f"{'Best day:':<25} {ytd['best_day'].strftime('%d-%m-%Y')} (Rs {ytd['best_day_revenue']:.2f})\n"
+
+    daily = revenue_by_day(ledger, start, end)
+    report += f"\n📅 {period_title.upper()}\n"
+    report += "=" * 60 + "\n"
+    report += f"{'Sales:':<25} {int(daily['sale_count'].sum()):>10}\n"
+    report += f"{'Revenue:':<25} Rs {daily['revenue'].sum():>10.2f}\n"
+    sold_days = daily[daily['sale_count'] > 0]
+    for day, row in sold_days.tail(14).iloc[::-1].iterrows():
+        report += f"  {day.strftime('%d-%m-%Y')}  {int(row['sale_count']):>5} sales  Rs {row['revenue']:>10.2f}\n"
+
+    report += "\n🏆 TOP SELLERS\n"
+    report += "=" * 60 + "\n"
+    for name, row in top_sellers(ledger, start, end).iterrows():
+        report += f"{name:<30} {int(row['quantity']):>6} sold  Rs {row['revenue']:>10.2f}\n"
+
+    report += "\n🏷️ CATEGORY MIX\n"
+    report += "=" * 60 + "\n"
+    for category, row in category_mix(ledger, start, end).iterrows():
+        report += f"{category:<30} {row['share']:>6.1%}  Rs {row['revenue']:>10.2f}\n"
+
+    heatmap = hourly_heatmap(ledger, start, end, value='sale_count')
+    busy_hours = heatmap.loc[:, heatmap.sum() > 0]
+    report += "\n🕒 SALES BY WEEKDAY AND HOUR\n"
+    report += "=" * 60 + "\n"
+    if busy_hours.empty:
+        report += "No sales in this period.\n"
+    else:
+        report += "     " + "".join(f"{hour:>4}" for hour in busy_hours.columns) + "\n"
+        for weekday, row in busy_hours.iterrows():
+            report += f"{weekday:<5}" + "".join(f"{int(count):>4}" for count in row) + "\n"
+    return report
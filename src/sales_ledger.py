@@ -0,0 +1,313 @@
+import os
+import sqlite3
+from datetime import datetime
+from inventory_index import name_key
+from inventory_store import SQLITE_JOURNAL_MODE
+
+SALES_DB = "sales.db"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+ROLLUP_VERSION = 2  # PRAGMA user_version once the rollup tables are up to date
+UNCATEGORIZED = "Uncategorized"
+
+
+def format_timestamp(moment):
+    """Stored form of a datetime; sorts in time order as text"""
+    return moment.strftime(TIMESTAMP_FORMAT)
+
+
+class SalesLedger:
+    """Append-only record of completed checkouts, kept in the shop's sales.db
+
+    Each sale is one row in sales (receipt number, time, totals) plus one
+    row per cart line in sale_items. Sales are indexed by time and lines
+    by the name key of their item (inventory_index.name_key), so date
+    ranges and item histories are read through an index. Triggers reject
+    updates and deletes.
+
+    Every sale also adds to the daily, hourly and monthly rollup tables in
+    the same transaction, so reports read one row per day (or month)
+    instead of scanning the sales.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS sales (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    receipt_no TEXT NOT NULL UNIQUE,
+                    sold_at TEXT NOT NULL,
+                    item_count INTEGER NOT NULL,
+                    total REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS sales_sold_at ON sales (sold_at);
+
+                CREATE TABLE IF NOT EXISTS sale_items (
+                    sale_id INTEGER NOT NULL REFERENCES sales (id),
+                    line INTEGER NOT NULL,
+                    item_name TEXT NOT NULL,
+                    quantity INTEGER NOT NULL,
+                    unit_price REAL NOT NULL,
+                    total_price REAL NOT NULL,
+                    name_key TEXT NOT NULL DEFAULT '',
+                    PRIMARY KEY (sale_id, line)
+                ) WITHOUT ROWID;
+            """)
+        self.upgrade_sale_items()
+        with self.conn:
+            self.conn.executescript("""
+                CREATE INDEX IF NOT EXISTS sale_items_name_key ON sale_items (name_key, sale_id);
+
+                CREATE TRIGGER IF NOT EXISTS sales_no_update BEFORE UPDATE ON sales
+                BEGIN SELECT RAISE(ABORT, 'the sales ledger is append-only'); END;
+                CREATE TRIGGER IF NOT EXISTS sales_no_delete BEFORE DELETE ON sales
+                BEGIN SELECT RAISE(ABORT, 'the sales ledger is append-only'); END;
+                CREATE TRIGGER IF NOT EXISTS sale_items_no_update BEFORE UPDATE ON sale_items
+                BEGIN SELECT RAISE(ABORT, 'the sales ledger is append-only'); END;
+                CREATE TRIGGER IF NOT EXISTS sale_items_no_delete BEFORE DELETE ON sale_items
+                BEGIN SELECT RAISE(ABORT, 'the sales ledger is append-only'); END;
+            """)
+        rollup_version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if rollup_version < 1:
+            self.create_rollups()
+        if rollup_version < 2:
+            self.create_item_rollup()
+
+    def upgrade_sale_items(self):
+        """Give the lines of ledgers made by earlier versions their name key
+
+        SQLite cannot casefold, so the keys are filled in here, with the
+        append-only trigger lifted for the length of the transaction.
+        """
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(sale_items)")]
+        if 'name_key' in columns:
+            return
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute("ALTER TABLE sale_items ADD COLUMN name_key TEXT NOT NULL DEFAULT ''")
+            self.conn.execute("DROP TRIGGER IF EXISTS sale_items_no_update")
+            self.conn.executemany(
+                "UPDATE sale_items SET name_key = ? WHERE sale_id = ? AND line = ?",
+                [(name_key(name), sale_id, line)
+                 for sale_id, line, name in self.conn.execute("SELECT sale_id, line, item_name FROM sale_items")]
+            )
+            self.conn.execute(
+                "CREATE TRIGGER sale_items_no_update BEFORE UPDATE ON sale_items "
+                "BEGIN SELECT RAISE(ABORT, 'the sales ledger is append-only'); END"
+            )
+            self.conn.execute("DROP INDEX IF EXISTS sale_items_item")
+
+    def create_rollups(self):
+        """Create the rollup tables and fill them from the sales already recorded
+
+        Categories are not part of the ledger, so the category rollup of
+        sales recorded before the rollups existed uses UNCATEGORIZED.
+        """
+        self.conn.executescript(f"""
+            BEGIN;
+            CREATE TABLE IF NOT EXISTS daily_sales (
+                day TEXT PRIMARY KEY,
+                sale_count INTEGER NOT NULL,
+                item_count INTEGER NOT NULL,
+                revenue REAL NOT NULL
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS monthly_sales (
+                month TEXT PRIMARY KEY,
+                sale_count INTEGER NOT NULL,
+                item_count INTEGER NOT NULL,
+                revenue REAL NOT NULL
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS hourly_sales (
+                day TEXT NOT NULL,
+                hour INTEGER NOT NULL,
+                sale_count INTEGER NOT NULL,
+                revenue REAL NOT NULL,
+                PRIMARY KEY (day, hour)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS daily_category_sales (
+                day TEXT NOT NULL,
+                category TEXT NOT NULL,
+                quantity INTEGER NOT NULL,
+                revenue REAL NOT NULL,
+                PRIMARY KEY (day, category)
+            ) WITHOUT ROWID;
+
+            DELETE FROM daily_sales;
+            DELETE FROM monthly_sales;
+            DELETE FROM hourly_sales;
+            DELETE FROM daily_category_sales;
+
+            INSERT INTO daily_sales
+            SELECT substr(sold_at, 1, 10), count(*), sum(item_count), sum(total)
+            FROM sales GROUP BY 1;
+
+            INSERT INTO monthly_sales
+            SELECT substr(sold_at, 1, 7), count(*), sum(item_count), sum(total)
+            FROM sales GROUP BY 1;
+
+            INSERT INTO hourly_sales
+            SELECT substr(sold_at, 1, 10), CAST(substr(sold_at, 12, 2) AS INTEGER), count(*), sum(total)
+            FROM sales GROUP BY 1, 2;
+
+            INSERT INTO daily_category_sales
+            SELECT substr(sold_at, 1, 10), '{UNCATEGORIZED}', sum(item_count), sum(total)
+            FROM sales GROUP BY 1;
+
+            PRAGMA user_version = 1;
+            COMMIT;
+        """)
+
+    def create_item_rollup(self):
+        """(Re)create the per item rollup, keyed by name key, from the sales lines"""
+        self.conn.executescript(f"""
+            BEGIN;
+            DROP TABLE IF EXISTS daily_item_sales;
+            CREATE TABLE daily_item_sales (
+                day TEXT NOT NULL,
+                name_key TEXT NOT NULL,
+                item_name TEXT NOT NULL,
+                quantity INTEGER NOT NULL,
+                revenue REAL NOT NULL,
+                PRIMARY KEY (day, name_key)
+            ) WITHOUT ROWID;
+
+            INSERT INTO daily_item_sales
+            SELECT substr(s.sold_at, 1, 10), i.name_key, min(i.item_name), sum(i.quantity), sum(i.total_price)
+            FROM sale_items i JOIN sales s ON s.id = i.sale_id GROUP BY 1, 2;
+
+            PRAGMA user_version = {ROLLUP_VERSION};
+            COMMIT;
+        """)
+
+    def record_sale(self, receipt_no, cart_items, sold_at=None, item_categories=None):
+        """Append a completed checkout, returns its sale id
+
+        cart_items are the cart dicts ('name', 'quantity', 'unit_price',
+        'total_price'). item_categories maps item names to their categories
+        for the category rollup; an item counts towards each of its
+        categories. The sale, its lines and the rollups are written in one
+        transaction.
+        """
+        sold_at = format_timestamp(sold_at or datetime.now())
+        total = sum(item['total_price'] for item in cart_items)
+        item_count = sum(item['quantity'] for item in cart_items)
+        item_categories = item_categories or {}
+
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO sales (receipt_no, sold_at, item_count, total) VALUES (?, ?, ?, ?)",
+                (receipt_no, sold_at, item_count, total)
+            )
+            sale_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO sale_items (sale_id, line, item_name, quantity, unit_price, total_price, name_key) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (sale_id, line, item['name'], item['quantity'], item['unit_price'], item['total_price'],
+                     name_key(item['name']))
+                    for line, item in enumerate(cart_items, 1)
+                ]
+            )
+            self.add_to_rollups(sold_at, cart_items, item_count, total, item_categories)
+        return sale_id
+
+    def add_to_rollups(self, sold_at, cart_items, item_count, total, item_categories):
+        day, month, hour = sold_at[:10], sold_at[:7], int(sold_at[11:13])
+
+        items = {}
+        categories = {}
+        for item in cart_items:
+            # Cart lines of the same item share one row, whatever their case
+            key = name_key(item['name'])
+            name, quantity, revenue = items.get(key, (item['name'], 0, 0.0))
+            items[key] = (name, quantity + item['quantity'], revenue + item['total_price'])
+            for category in item_categories.get(item['name']) or [UNCATEGORIZED]:
+                quantity, revenue = categories.get(category, (0, 0.0))
+                categories[category] = (quantity + item['quantity'], revenue + item['total_price'])
+
+        self.conn.execute(
+            "INSERT INTO daily_sales VALUES (?, 1, ?, ?) ON CONFLICT (day) DO UPDATE SET "
+            "sale_count = sale_count + 1, item_count = item_count + excluded.item_count, "
+            "revenue = revenue + excluded.revenue",
+            (day, item_count, total)
+        )
+        self.conn.execute(
+            "INSERT INTO monthly_sales VALUES (?, 1, ?, ?) ON CONFLICT (month) DO UPDATE SET "
+            "sale_count = sale_count + 1, item_count = item_count + excluded.item_count, "
+            "revenue = revenue + excluded.revenue",
+            (month, item_count, total)
+        )
+        self.conn.execute(
+            "INSERT INTO hourly_sales VALUES (?, ?, 1, ?) ON CONFLICT (day, hour) DO UPDATE SET "
+            "sale_count = sale_count + 1, revenue = revenue + excluded.revenue",
+            (day, hour, total)
+        )
+        self.conn.executemany(
+            "INSERT INTO daily_item_sales VALUES (?, ?, ?, ?, ?) ON CONFLICT (day, name_key) DO UPDATE SET "
+            "quantity = quantity + excluded.quantity, revenue = revenue + excluded.revenue",
+            [(day, key, name, quantity, revenue) for key, (name, quantity, revenue) in items.items()]
+        )
+        self.conn.executemany(
+            "INSERT INTO daily_category_sales VALUES (?, ?, ?, ?) ON CONFLICT (day, category) DO UPDATE SET "
+            "quantity = quantity + excluded.quantity, revenue = revenue + excluded.revenue",
+            [(day, category, quantity, revenue) for category, (quantity, revenue) in categories.items()]
+        )
+
+    def sales_between(self, start, end):
+        """Sales made from start up to (not including) end, oldest first"""
+        rows = self.conn.execute(
+            "SELECT id, receipt_no, sold_at, item_count, total FROM sales "
+            "WHERE sold_at >= ? AND sold_at < ? ORDER BY sold_at, id",
+            (format_timestamp(start), format_timestamp(end))
+        )
+        return [
+            {'id': sale_id, 'receipt_no': receipt_no, 'sold_at': sold_at,
+             'item_count': item_count, 'total': total}
+            for sale_id, receipt_no, sold_at, item_count, total in rows
+        ]
+
+    def sale_items(self, sale_id):
+        """Line items of a sale, in receipt order"""
+        rows = self.conn.execute(
+            "SELECT item_name, quantity, unit_price, total_price FROM sale_items "
+            "WHERE sale_id = ? ORDER BY line",
+            (sale_id,)
+        )
+        return [
+            {'name': name, 'quantity': quantity, 'unit_price': unit_price, 'total_price': total_price}
+            for name, quantity, unit_price, total_price in rows
+        ]
+
+    def item_history(self, item_name, start=None, end=None):
+        """Sales lines of one item (ignoring case), optionally within a date range"""
+        query = (
+            "SELECT s.receipt_no, s.sold_at, i.quantity, i.unit_price, i.total_price "
+            "FROM sale_items i JOIN sales s ON s.id = i.sale_id WHERE i.name_key = ?"
+        )
+        params = [name_key(item_name)]
+        if start is not None:
+            query += " AND s.sold_at >= ?"
+            params.append(format_timestamp(start))
+        if end is not None:
+            query += " AND s.sold_at < ?"
+            params.append(format_timestamp(end))
+        rows = self.conn.execute(query + " ORDER BY s.sold_at, s.id", params)
+        return [
+            {'receipt_no': receipt_no, 'sold_at': sold_at, 'quantity': quantity,
+             'unit_price': unit_price, 'total_price': total_price}
+            for receipt_no, sold_at, quantity, unit_price, total_price in rows
+        ]
+
+    def close(self):
+        self.conn.close()
+
+
+def open_sales_ledger(shop_path):
+    """Open (creating if needed) the sales ledger of a shop folder"""
+    return SalesLedger(os.path.join(shop_path, SALES_DB))
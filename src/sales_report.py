@@ -0,0 +1,62 @@
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTextEdit, QPushButton, QComboBox, QLabel, QMessageBox
+)
+from PyQt5.QtGui import QFont
+from datetime import date, timedelta
+from sales_analytics import sales_report_text
+
+REPORT_PERIODS = {
+    "Last 7 Days": 7,
+    "Last 30 Days": 30,
+    "Last 90 Days": 90,
+    "Last 365 Days": 365,
+}
+
+
+class SalesReportDialog(QDialog):
+    """Dialog showing revenue, top sellers, category mix and busy hours of a shop"""
+    def __init__(self, sales_ledger, parent=None):
+        super().__init__(parent)
+        self.sales_ledger = sales_ledger
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setWindowTitle("Sales Report")
+        self.resize(760, 600)
+        layout = QVBoxLayout()
+
+        period_layout = QHBoxLayout()
+        period_layout.addWidget(QLabel("Period:"))
+        self.period_combo = QComboBox()
+        self.period_combo.addItems(REPORT_PERIODS)
+        self.period_combo.setCurrentText("Last 30 Days")
+        self.period_combo.currentTextChanged.connect(self.update_report)
+        period_layout.addWidget(self.period_combo)
+        period_layout.addStretch()
+        layout.addLayout(period_layout)
+
+        self.report_text = QTextEdit()
+        self.report_text.setReadOnly(True)
+        self.report_text.setFont(QFont("Courier New", 10))
+        layout.addWidget(self.report_text)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+        self.update_report()
+
+    def update_report(self):
+        """Rebuild the report for the selected period"""
+        end = date.today() + timedelta(days=1)
+        start = end - timedelta(days=REPORT_PERIODS[self.period_combo.currentText()])
+        try:
+            self.report_text.setText(
+                sales_report_text(self.sales_ledger, start, end, self.period_combo.currentText())
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to build sales report: {str(e)}")
@@ -0,0 +1,162 @@
+import os
+import json
+import time
+from file_utils import FileLock, write_json_atomic
+
+# Kept in its own folder so writing the catalog does not change the
+# modification time of the data folder it validates against
+CATALOG_DIR = ".catalog"
+CATALOG_FILE = "shops.json"
+CATALOG_VERSION = 1
+SHOP_INFO_FILE = "shop_info.json"
+
+SORT_LAST_OPENED = "last_opened"
+SORT_NAME = "name"
+
+SEARCH_FIELDS = ('shop_name', 'owner_name', 'address', 'mobile_numbers')
+
+
+def read_shop_entry(info_path, info_stat):
+    """Catalog entry of a shop from its shop_info.json"""
+    with open(info_path, 'r') as f:
+        data = json.load(f)
+    return {
+        'shop_name': data.get('shop_name', 'N/A'),
+        'owner_name': data.get('owner_name', 'N/A'),
+        'address': data.get('address', 'N/A'),
+        'mobile_numbers': list(data.get('mobile_numbers', [])),
+        'info_mtime': info_stat.st_mtime_ns,
+        'info_size': info_stat.st_size,
+    }
+
+
+class ShopCatalog:
+    """Index of every shop's shop_info.json, kept in one file in the data folder
+
+    The catalog remembers the modification time of the data folder and of
+    each shop_info.json. A refresh only lists the data folder when a shop
+    folder was added, removed or renamed, and only re-reads the
+    shop_info.json files whose time or size changed; everything else comes
+    from the catalog. It also records when each shop was last opened.
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.catalog_path = os.path.join(data_dir, CATALOG_DIR, CATALOG_FILE)
+        self.dir_mtime = None
+        self.entries = {}  # shop folder -> entry
+        self.loaded = False
+
+    def load(self):
+        try:
+            with open(self.catalog_path, 'r') as f:
+                catalog = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable shop catalog: {e}")
+            return
+        if catalog.get('version') != CATALOG_VERSION:
+            return
+        self.dir_mtime = catalog.get('dir_mtime')
+        self.entries = catalog.get('shops', {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.catalog_path), exist_ok=True)
+        with FileLock(self.catalog_path):
+            write_json_atomic(self.catalog_path, {
+                'version': CATALOG_VERSION,
+                'dir_mtime': self.dir_mtime,
+                'shops': self.entries,
+            })
+
+    def refresh(self):
+        """Bring the catalog up to date with the data folder, returns the shop entries"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        if not self.loaded:
+            self.load()
+            self.loaded = True
+
+        changed = False
+        dir_mtime = os.stat(self.data_dir).st_mtime_ns
+        if dir_mtime != self.dir_mtime:
+            folders = {
+                name for name in os.listdir(self.data_dir)
+                if name != CATALOG_DIR and os.path.isdir(os.path.join(self.data_dir, name))
+            }
+            for shop_folder in set(self.entries) - folders:
+                del self.entries[shop_folder]
+            for shop_folder in folders - set(self.entries):
+                self.entries[shop_folder] = None
+            self.dir_mtime = dir_mtime
+            changed = True
+
+        for shop_folder, entry in list(self.entries.items()):
+            info_path = os.path.join(self.data_dir, shop_folder, SHOP_INFO_FILE)
+            try:
+                info_stat = os.stat(info_path)
+            except OSError:
+                # Not a shop (yet); looked at again when the folder changes
+                if entry is not None:
+                    self.entries[shop_folder] = None
+                    changed = True
+                continue
+
+            if entry is not None and entry['info_mtime'] == info_stat.st_mtime_ns \
+                    and entry['info_size'] == info_stat.st_size:
+                continue
+
+            try:
+                new_entry = read_shop_entry(info_path, info_stat)
+            except Exception as e:
+                print("Failed to load shop:", shop_folder, e)
+                continue
+            new_entry['last_opened'] = entry['last_opened'] if entry else 0
+            self.entries[shop_folder] = new_entry
+            changed = True
+
+        if changed:
+            try:
+                self.save()
+            except OSError as e:
+                print(f"Could not save shop catalog: {e}")
+        return self.shops()
+
+    def shops(self, sort_by=SORT_LAST_OPENED, query=""):
+        """Catalog entries (with 'folder') matching query, most recently opened first or by name
+
+        Every word of query has to appear in the shop name, owner, address
+        or a mobile number, ignoring case.
+        """
+        words = query.lower().split()
+        shops = []
+        for shop_folder, entry in self.entries.items():
+            if entry is None:
+                continue
+            if words:
+                text = " ".join(
+                    " ".join(entry[field]) if field == 'mobile_numbers' else str(entry[field])
+                    for field in SEARCH_FIELDS
+                ).lower()
+                if not all(word in text for word in words):
+                    continue
+            shops.append(dict(entry, folder=shop_folder))
+
+        shops.sort(key=lambda shop: shop['shop_name'].lower())
+        if sort_by == SORT_LAST_OPENED:
+            shops.sort(key=lambda shop: shop['last_opened'], reverse=True)
+        return shops
+
+    def get(self, shop_folder):
+        return self.entries.get(shop_folder)
+
+    def record_opened(self, shop_folder, when=None):
+        """Remember that a shop was opened now (or at when, seconds since the epoch)"""
+        entry = self.entries.get(shop_folder)
+        if entry is None:
+            return
+        entry['last_opened'] = when or time.time()
+        try:
+            self.save()
+        except OSError as e:
+            print(f"Could not save shop catalog: {e}")
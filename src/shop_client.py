@@ -0,0 +1,298 @@
+import json
+import threading
+import http.client
+from urllib.parse import quote, urlencode
+from inventory_store import InventoryStore, ConflictError
+from core import (
+    InventoryError, ValidationError, DuplicateItemError,
+    CartError, InvalidQuantityError, InsufficientStockError
+)
+
+SHOP_SERVER_KEY = "shop_server"  # "host:port" in shop_info.json
+SHOP_TOKEN_KEY = "shop_server_token"  # shared secret the server requires, in shop_info.json
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 5  # seconds
+
+# Errors the server reports by type, raised again here as the same exception
+SERVER_ERRORS = {
+    error.__name__: error
+    for error in (InventoryError, ValidationError, DuplicateItemError, ConflictError,
+                  CartError, InvalidQuantityError, InsufficientStockError)
+}
+
+
+class ShopServerError(InventoryError):
+    """The shop server refused a request or could not be reached"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def item_path(name):
+    return "/items/" + quote(name, safe='')
+
+
+def sku_path(sku):
+    return "/skus/" + quote(sku, safe='')
+
+
+class ShopClient:
+    """Talks to a shop server over one kept-alive HTTP connection
+
+    Requests from several threads take turns on the connection. A
+    connection the server closed while idle is reopened once. Every
+    request carries the shop's token, without which the server refuses it.
+    """
+
+    def __init__(self, address, token=None, timeout=DEFAULT_TIMEOUT):
+        host, _, port = address.rpartition(':')
+        self.host = host or address
+        self.port = int(port) if host else DEFAULT_PORT
+        self.token = token
+        self.timeout = timeout
+        self.connection = None
+        self.lock = threading.Lock()
+
+    def request(self, method, path, body=None):
+        """Send a request, returns the decoded JSON response"""
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if data is not None else {}
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        with self.lock:
+            for attempt in range(2):
+                reused = self.connection is not None
+                if self.connection is None:
+                    self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                try:
+                    self.connection.request(method, path, data, headers)
+                    response = self.connection.getresponse()
+                    payload = json.loads(response.read() or b'null')
+                    break
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                    self.close()
+                    if not reused or attempt:
+                        raise ShopServerError(f"Lost the connection to the shop server: {e}") from e
+                except (OSError, http.client.HTTPException, ValueError) as e:
+                    self.close()
+                    raise ShopServerError(f"Could not reach the shop server: {e}") from e
+            if response.will_close:
+                self.close()
+
+        if response.status >= 400:
+            raise error_for(response.status, payload)
+        return payload
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def status(self):
+        return self.request('GET', '/status')
+
+    def items(self):
+        return self.request('GET', '/items')
+
+    def get_item(self, name):
+        return self.request('GET', item_path(name))
+
+    def get_item_by_sku(self, sku):
+        return self.request('GET', sku_path(sku))
+
+    def search(self, query, category=None, limit=None):
+        params = {'q': query}
+        if category:
+            params['category'] = category
+        if limit:
+            params['limit'] = limit
+        return self.request('GET', '/search?' + urlencode(params))['items']
+
+    def changes(self, since, epoch=None):
+        params = {'since': since}
+        if epoch:
+            params['epoch'] = epoch
+        return self.request('GET', '/changes?' + urlencode(params))
+
+    def add_item(self, item):
+        return self.request('POST', '/items', item)
+
+    def update_item(self, name, item, base=None):
+        return self.request('PUT', item_path(name), {'item': item, 'base': base})
+
+    def delete_item(self, name):
+        return self.request('DELETE', item_path(name))
+
+    def replace_items(self, items, version=None, epoch=None):
+        return self.request('PUT', '/items', {'items': items, 'version': version, 'epoch': epoch})
+
+    def adjust_quantities(self, deltas):
+        return self.request('POST', '/stock/adjust', {'deltas': [list(delta) for delta in deltas]})
+
+    def create_cart(self):
+        return self.request('POST', '/carts')
+
+    def cart(self, cart_id):
+        return self.request('GET', f'/carts/{cart_id}')
+
+    def add_to_cart(self, cart_id, name, quantity):
+        return self.request('POST', f'/carts/{cart_id}/items', {'name': name, 'quantity': quantity})
+
+    def scan_to_cart(self, cart_id, sku):
+        return self.request('POST', f'/carts/{cart_id}/scan', {'sku': sku})
+
+    def drop_cart(self, cart_id):
+        return self.request('DELETE', f'/carts/{cart_id}')
+
+    def checkout_cart(self, cart_id, receipt_no=None):
+        return self.request('POST', f'/carts/{cart_id}/checkout', {'receipt_no': receipt_no})
+
+    def checkout(self, cart_items, receipt_no=None):
+        return self.request('POST', '/checkout', {'items': cart_items, 'receipt_no': receipt_no})
+
+    def peek_receipt_number(self):
+        return self.request('GET', '/receipt-numbers/next')['receipt_no']
+
+    def allocate_receipt_number(self):
+        return self.request('POST', '/receipt-numbers')['receipt_no']
+
+    def batch(self, requests):
+        """Send (method, path, body) requests in one round trip, returns [(status, body)]"""
+        responses = self.request('POST', '/batch', {
+            'requests': [{'method': method, 'path': path, 'body': body} for method, path, body in requests]
+        })['responses']
+        return [(response['status'], response['body']) for response in responses]
+
+
+def error_for(status, payload):
+    """Exception matching an error response, so callers handle it like a local error"""
+    if not isinstance(payload, dict):
+        return ShopServerError(f"HTTP {status}", status)
+    message = payload.get('error', f"HTTP {status}")
+    error = SERVER_ERRORS.get(payload.get('type'))
+    return error(message) if error is not None else ShopServerError(message, status)
+
+
+shop_clients = {}
+shop_clients_lock = threading.Lock()
+
+
+def get_shop_client(address, token=None):
+    """Client of a shop server, shared by all windows so they use one connection"""
+    with shop_clients_lock:
+        client = shop_clients.get((address, token))
+        if client is None:
+            client = shop_clients[(address, token)] = ShopClient(address, token)
+        return client
+
+
+class RemoteInventoryStore(InventoryStore):
+    """Inventory store kept by a shop server
+
+    version is the (epoch, version) stamp of the server's changes this
+    till is up to date with; changes() returns what other tills changed
+    since then. The epoch changes when the server restarts, which makes
+    the till reload.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.version = (None, 0)
+
+    @staticmethod
+    def stamp_of(response):
+        return (response['epoch'], response['version'])
+
+    def load_items(self):
+        response = self.client.items()
+        self.version = self.stamp_of(response)
+        return response['items']
+
+    def follow(self, response):
+        """Move to the version of our own change, unless another till changed something in between"""
+        epoch, version = self.version
+        if self.stamp_of(response) == (epoch, version + 1):
+            self.version = self.stamp_of(response)
+
+    def add_item(self, item):
+        self.follow(self.client.add_item(item))
+
+    def read_version(self):
+        return self.stamp_of(self.client.status())
+
+    def update_item(self, name, item, base=None):
+        response = self.client.update_item(name, item, base)
+        self.follow(response)
+        return response['item']
+
+    def delete_item(self, name):
+        self.follow(self.client.delete_item(name))
+
+    def adjust_quantities(self, deltas):
+        response = self.client.adjust_quantities(deltas)
+        self.follow(response)
+        return response['quantities']
+
+    def save_all(self, items, check_version=False):
+        epoch, version = self.version if check_version else (None, None)
+        response = self.client.replace_items([dict(item) for item in items], version, epoch)
+        self.version = self.stamp_of(response)
+
+    def fetch_changes(self, stamp):
+        """What other tills changed since the (epoch, version) stamp, without moving to it
+
+        Only talks to the server, so it can run on a worker thread.
+        """
+        epoch, version = stamp
+        return self.client.changes(version, epoch)
+
+    def changes(self):
+        """Changes made by other tills since the last call: {'reload', 'quantities'}"""
+        changes = self.fetch_changes(self.version)
+        self.version = self.stamp_of(changes)
+        return changes
+
+
+class RemoteReceiptAllocator:
+    """Receipt numbers handed out by the shop server, shared by all tills"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def peek(self):
+        try:
+            return self.client.peek_receipt_number()
+        except ShopServerError as e:
+            print(f"Could not read receipt counter: {e}")
+            return "sr#----"
+
+    def allocate(self):
+        return self.client.allocate_receipt_number()
+
+
+class RemoteCheckoutService:
+    """Completes sales on the shop server, which records them and updates the stock
+
+    Has the interface of core.CheckoutService.
+    """
+
+    def __init__(self, client, repository):
+        self.client = client
+        self.repository = repository
+
+    def checkout(self, cart, receipt_no, sold_at=None):
+        errors = []
+        sale_id = None
+        sold_rows = []
+        try:
+            result = self.client.checkout(cart.items, receipt_no)
+        except InventoryError as e:
+            errors.append(f"Failed to record sale {receipt_no}: {str(e)}")
+        else:
+            sale_id = result['sale_id']
+            errors.extend(result['errors'])
+            sold_rows = self.repository.apply_stored_quantities(result['quantities'])
+
+        cart.clear()
+        return {'receipt_no': receipt_no, 'sale_id': sale_id, 'sold_rows': sold_rows, 'errors': errors}
@@ -0,0 +1,181 @@
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, QEvent, pyqtSignal
+from PyQt5.QtGui import QFont, QFontMetrics, QPainter, QPainterPath, QLinearGradient
+import theme
+
+SHOP_ROLE = Qt.UserRole + 1  # the shop's catalog entry
+FOLDER_ROLE = Qt.UserRole + 2
+
+CARD_PADDING = 5
+CONTENT_MARGIN = 15
+LINE_SPACING = 5
+BUTTON_WIDTH = 100
+BUTTON_HEIGHT = 35
+BUTTON_SPACING = 8
+BUTTON_COLUMN_WIDTH = 120
+
+EDIT_BUTTON = "edit"
+DELETE_BUTTON = "delete"
+
+
+class ShopListModel(QAbstractListModel):
+    """Shop catalog entries (see shop_catalog.ShopCatalog.shops) as a list model"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.shops = []
+
+    def set_shops(self, shops):
+        self.beginResetModel()
+        self.shops = list(shops)
+        self.endResetModel()
+
+    def index_of(self, folder):
+        for row, shop in enumerate(self.shops):
+            if shop['folder'] == folder:
+                return self.index(row)
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.shops)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        shop = self.shops[index.row()]
+        if role == Qt.DisplayRole:
+            return shop['shop_name']
+        if role == SHOP_ROLE:
+            return shop
+        if role == FOLDER_ROLE:
+            return shop['folder']
+        return None
+
+
+class ShopItemDelegate(QStyledItemDelegate):
+    """Paints a shop card with its Edit and Delete buttons and reports clicks
+
+    Nothing is created per shop: the view only asks for the rows on
+    screen, and hover and selection are states of the paint option.
+    """
+    open_clicked = pyqtSignal(str)
+    edit_clicked = pyqtSignal(str)
+    delete_clicked = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hover_button = None  # (row, button) under the mouse
+
+    def card_font(self, option):
+        font = QFont(option.font)
+        font.setPixelSize(14)
+        font.setBold(True)
+        return font
+
+    def card_rect(self, option):
+        return QRect(option.rect).adjusted(CARD_PADDING, CARD_PADDING, -CARD_PADDING, -CARD_PADDING)
+
+    def button_rects(self, option):
+        card = self.card_rect(option)
+        left = card.right() - CONTENT_MARGIN - BUTTON_COLUMN_WIDTH + (BUTTON_COLUMN_WIDTH - BUTTON_WIDTH) // 2
+        top = card.top() + CONTENT_MARGIN
+        edit_rect = QRect(left, top, BUTTON_WIDTH, BUTTON_HEIGHT)
+        delete_rect = QRect(left, top + BUTTON_HEIGHT + BUTTON_SPACING, BUTTON_WIDTH, BUTTON_HEIGHT)
+        return {EDIT_BUTTON: edit_rect, DELETE_BUTTON: delete_rect}
+
+    def button_at(self, option, pos):
+        for button, rect in self.button_rects(option).items():
+            if rect.contains(pos):
+                return button
+        return None
+
+    def sizeHint(self, option, index):
+        line_height = QFontMetrics(self.card_font(option)).height()
+        text_height = 4 * line_height + 3 * LINE_SPACING
+        buttons_height = 2 * BUTTON_HEIGHT + BUTTON_SPACING
+        height = max(text_height, buttons_height) + 2 * CONTENT_MARGIN + 2 * CARD_PADDING
+        return QSize(BUTTON_COLUMN_WIDTH + 2 * CONTENT_MARGIN, height)
+
+    def paint(self, painter, option, index):
+        shop = index.data(SHOP_ROLE)
+        card = self.card_rect(option)
+        selected = bool(option.state & QStyle.State_Selected)
+        hovering = bool(option.state & QStyle.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        path = QPainterPath()
+        path.addRoundedRect(card.x() + 0.5, card.y() + 0.5, card.width() - 1, card.height() - 1, 6, 6)
+        if selected or hovering:
+            gradient = QLinearGradient(card.topLeft(), card.bottomLeft())
+            gradient.setColorAt(0, theme.CARD_SELECTED_TOP if selected else theme.CARD_HOVER_TOP)
+            gradient.setColorAt(1, theme.CARD_SELECTED_BOTTOM if selected else theme.CARD_HOVER_BOTTOM)
+            painter.fillPath(path, gradient)
+            painter.setPen(theme.CARD_SELECTED_BORDER if selected else theme.CARD_HOVER_BORDER)
+            painter.drawPath(path)
+        else:
+            painter.fillPath(path, theme.CARD_BACKGROUND)
+
+        # Shop details
+        font = self.card_font(option)
+        metrics = QFontMetrics(font)
+        painter.setFont(font)
+        painter.setPen(theme.CARD_TEXT)
+        text_left = card.left() + CONTENT_MARGIN
+        text_width = card.width() - 2 * CONTENT_MARGIN - BUTTON_COLUMN_WIDTH
+        lines = [
+            f"Shop Name: {shop['shop_name']}",
+            f"Owner: {shop['owner_name']}",
+            f"Address: {shop['address']}",
+            f"Mobile: {' | '.join(shop['mobile_numbers'])}",
+        ]
+        top = card.top() + CONTENT_MARGIN
+        for line in lines:
+            text_rect = QRect(text_left, top, text_width, metrics.height())
+            painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter,
+                             metrics.elidedText(line, Qt.ElideRight, text_width))
+            top += metrics.height() + LINE_SPACING
+
+        # Edit and Delete buttons
+        button_font = QFont(option.font)
+        button_font.setPixelSize(12)
+        button_font.setBold(True)
+        painter.setFont(button_font)
+        colors = {
+            EDIT_BUTTON: (theme.EDIT_BUTTON_COLOR, theme.EDIT_BUTTON_HOVER_COLOR, "✏️ Edit"),
+            DELETE_BUTTON: (theme.DELETE_BUTTON_COLOR, theme.DELETE_BUTTON_HOVER_COLOR, "🗑️ Delete"),
+        }
+        for button, rect in self.button_rects(option).items():
+            color, hover_color, text = colors[button]
+            button_path = QPainterPath()
+            button_path.addRoundedRect(rect.x(), rect.y(), rect.width(), rect.height(), 6, 6)
+            button_hovered = hovering and self.hover_button == (index.row(), button)
+            painter.fillPath(button_path, hover_color if button_hovered else color)
+            painter.setPen(Qt.white)
+            painter.drawText(rect, Qt.AlignCenter, text)
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseMove:
+            button = self.button_at(option, event.pos())
+            hover_button = (index.row(), button) if button else None
+            if hover_button != self.hover_button:
+                self.hover_button = hover_button
+                self.parent().viewport().update(option.rect)
+            return False
+
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            folder = index.data(FOLDER_ROLE)
+            button = self.button_at(option, event.pos())
+            if button == EDIT_BUTTON:
+                self.edit_clicked.emit(folder)
+            elif button == DELETE_BUTTON:
+                self.delete_clicked.emit(folder)
+            else:
+                self.open_clicked.emit(folder)
+            return True
+        return super().editorEvent(event, model, option, index)
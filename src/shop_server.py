@@ -0,0 +1,541 @@
+"""Shop server: one process owns a shop's data and serves it to the tills
+
+    python shop_server.py SHOP [--host 0.0.0.0] [--port 8765]
+
+Tills whose shop_info.json has "shop_server": "host:port" use it instead
+of opening the shop files themselves (see shop_client.py). Every request
+must carry "Authorization: Bearer <token>", the "shop_server_token" of the
+shop's shop_info.json; the server makes one on its first start and the
+tills need a copy. The API is JSON over HTTP/1.1 with keep-alive:
+
+    GET    /status                       shop name, item count, change version
+    GET    /items                        every item
+    PUT    /items                        {"items": [...], "version", "epoch": optional} replace the inventory
+    POST   /items                        add an item
+    GET    /items/<name>                 one item
+    PUT    /items/<name>                 {"item": new values, "base": values it was made from}
+    DELETE /items/<name>                 delete an item
+    GET    /skus/<sku>                   the item with a SKU (barcode)
+    GET    /search?q=&category=&limit=   ranked search
+    GET    /changes?since=<version>&epoch=<epoch>   quantities changed since a version
+    POST   /stock/adjust                 {"deltas": [[name, delta], ...]}
+    POST   /carts                        new cart, returns its cart_id
+    GET    /carts/<id>                   cart contents
+    POST   /carts/<id>/items             {"name": ..., "quantity": ...}
+    POST   /carts/<id>/scan              {"sku": ...} add one unit of the item with a SKU
+    DELETE /carts/<id>                   drop a cart
+    POST   /carts/<id>/checkout          {"receipt_no": optional}
+    POST   /checkout                     {"items": [cart items], "receipt_no": optional}
+    GET    /receipt-numbers/next         the number the next receipt will most likely get
+    POST   /receipt-numbers              use up the next receipt number
+    POST   /batch                        {"requests": [{"method", "path", "body"}, ...]}
+
+Requests are handled one at a time on the event loop, so every till sees
+the same stock and two checkouts never interleave. Changes made to the
+shop files by other programs (cli.py) are picked up before each request.
+"""
+import os
+import re
+import sys
+import json
+import asyncio
+import argparse
+import uuid
+import hmac
+import secrets
+import itertools
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs, unquote
+from inventory_store import open_inventory_store, DEFAULT_STORAGE_BACKEND, ConflictError
+from inventory_index import name_key
+from sales_ledger import open_sales_ledger
+from receipt_numbers import get_receipt_allocator
+from shop_catalog import SHOP_INFO_FILE
+from path_utilis import shop_path_of
+from file_utils import write_json_atomic
+from shop_client import DEFAULT_PORT, SHOP_TOKEN_KEY
+from core import (
+    InventoryRepository, InventoryError, ValidationError, DuplicateItemError,
+    Cart, CartError, InvalidQuantityError, CheckoutService
+)
+
+KEEP_ALIVE_TIMEOUT = 60  # seconds an idle connection is kept open
+MAX_BODY_SIZE = 16 * 1024 * 1024
+MAX_SEARCH_RESULTS = 50
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ChangeLog:
+    """Inventory listener remembering what changed, so tills can catch up
+
+    Every change takes a new version. Quantity changes (sales, stock
+    adjustments) are kept per item; any other change (items added,
+    edited or removed) tells the tills to reload.
+
+    Versions start again at 0 when the server restarts, so they are sent
+    with the epoch of this server run: a till whose epoch differs is told
+    to reload.
+    """
+
+    def __init__(self, repository):
+        self.repository = repository
+        self.epoch = uuid.uuid4().hex
+        self.version = 0
+        self.reload_version = 0
+        self.quantity_versions = {}  # name key -> version
+
+    def changed(self):
+        self.version += 1
+        return self.version
+
+    def layout_changed(self):
+        self.reload_version = self.changed()
+        self.quantity_versions.clear()
+
+    def inserting_item(self, row):
+        pass
+
+    def removing_item(self, row):
+        pass
+
+    def item_inserted(self, row):
+        self.layout_changed()
+
+    def item_removed(self, row, item):
+        self.layout_changed()
+
+    def item_replaced(self, row, old_name):
+        self.layout_changed()
+
+    def items_changed(self, rows):
+        version = self.changed()
+        for row in rows:
+            self.quantity_versions[name_key(self.repository.items[row]['name'])] = version
+
+    def stamp(self):
+        """The current version with the epoch it belongs to, sent with every change"""
+        return {'epoch': self.epoch, 'version': self.version}
+
+    def since(self, version, epoch):
+        """Changes after version: {'epoch', 'version', 'reload', 'quantities': {name: quantity}}"""
+        if epoch != self.epoch or version > self.version or version < self.reload_version:
+            return {**self.stamp(), 'reload': True, 'quantities': {}}
+        quantities = {}
+        for key, changed_at in self.quantity_versions.items():
+            if changed_at > version:
+                item = self.repository.get(key)
+                if item is not None:
+                    quantities[item['name']] = item['quantity']
+        return {**self.stamp(), 'reload': False, 'quantities': quantities}
+
+
+def item_json(item):
+    return dict(item)
+
+
+def cart_json(cart_id, cart):
+    return {
+        'cart_id': cart_id,
+        'items': cart.items,
+        'total_quantity': cart.total_quantity(),
+        'total_amount': cart.total_amount(),
+    }
+
+
+class ShopService:
+    """The API of one shop, independent of the HTTP transport"""
+
+    def __init__(self, shop_path, shop_info, inventory, sales_ledger, receipt_allocator):
+        self.shop_path = shop_path
+        self.shop_info = shop_info
+        self.changes = ChangeLog(inventory)
+        inventory.listener = self.changes
+        self.inventory = inventory
+        self.sales_ledger = sales_ledger
+        self.receipt_allocator = receipt_allocator
+        self.checkout_service = CheckoutService(inventory, sales_ledger)
+        self.carts = {}
+        self.cart_ids = itertools.count(1)
+        self.routes = [
+            ('GET', r'/status', self.status),
+            ('GET', r'/items', self.list_items),
+            ('PUT', r'/items', self.replace_items),
+            ('POST', r'/items', self.add_item),
+            ('GET', r'/items/(?P<name>[^/]+)', self.get_item),
+            ('PUT', r'/items/(?P<name>[^/]+)', self.update_item),
+            ('DELETE', r'/items/(?P<name>[^/]+)', self.delete_item),
+            ('GET', r'/skus/(?P<sku>[^/]+)', self.get_item_by_sku),
+            ('GET', r'/search', self.search),
+            ('GET', r'/changes', self.changes_since),
+            ('POST', r'/stock/adjust', self.adjust_stock),
+            ('POST', r'/carts', self.create_cart),
+            ('GET', r'/carts/(?P<cart_id>\d+)', self.get_cart),
+            ('POST', r'/carts/(?P<cart_id>\d+)/items', self.add_to_cart),
+            ('POST', r'/carts/(?P<cart_id>\d+)/scan', self.scan_to_cart),
+            ('DELETE', r'/carts/(?P<cart_id>\d+)', self.drop_cart),
+            ('POST', r'/carts/(?P<cart_id>\d+)/checkout', self.checkout_cart),
+            ('POST', r'/checkout', self.checkout),
+            ('GET', r'/receipt-numbers/next', self.peek_receipt_number),
+            ('POST', r'/receipt-numbers', self.allocate_receipt_number),
+            ('POST', r'/batch', self.batch),
+        ]
+        self.routes = [(method, re.compile(pattern + '$'), handler) for method, pattern, handler in self.routes]
+
+    def handle(self, method, target, body):
+        """Answer one request, returns (status, payload)"""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            self.sync_with_store()
+            path_matched = False
+            for route_method, pattern, handler in self.routes:
+                match = pattern.match(url.path)
+                if match is None:
+                    continue
+                path_matched = True
+                if route_method == method:
+                    params = {key: unquote(value) for key, value in match.groupdict().items()}
+                    return HTTPStatus.OK, handler(query=query, body=body, **params)
+            if path_matched:
+                raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not allowed on {url.path}")
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Unknown path {url.path}")
+        except HttpError as e:
+            return e.status, {'error': str(e)}
+        except (DuplicateItemError, CartError, ConflictError) as e:
+            status = HTTPStatus.BAD_REQUEST if isinstance(e, InvalidQuantityError) else HTTPStatus.CONFLICT
+            return status, {'error': str(e), 'type': type(e).__name__}
+        except InventoryError as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e), 'type': type(e).__name__}
+        except (ValueError, KeyError, TypeError) as e:
+            return HTTPStatus.BAD_REQUEST, {'error': f"Bad request: {e!r}"}
+        except Exception as e:
+            print(f"Shop server error on {method} {target}: {e}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+
+    def sync_with_store(self):
+        """Take in what other programs changed in the shop files; costs one version check"""
+        changes = self.inventory.require_store().changes()
+        if changes['reload']:
+            self.inventory.load()
+            self.changes.layout_changed()
+        else:
+            # Recorded by the change log like the server's own sales
+            self.inventory.apply_stored_quantities(changes['quantities'])
+
+    def require_item(self, name):
+        item = self.inventory.get(name)
+        if item is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"No item named '{name}'.")
+        return item
+
+    def require_sku(self, sku):
+        item = self.inventory.find_sku(sku)
+        if item is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"No item with SKU '{sku}'.")
+        return item
+
+    def require_cart(self, cart_id):
+        cart = self.carts.get(int(cart_id))
+        if cart is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"No cart {cart_id}.")
+        return cart
+
+    def status(self, query, body):
+        return {
+            'shop_name': self.shop_info.get('shop_name', os.path.basename(self.shop_path)),
+            'items': len(self.inventory),
+            **self.changes.stamp(),
+        }
+
+    def list_items(self, query, body):
+        return {**self.changes.stamp(), 'items': [item_json(item) for item in self.inventory.items]}
+
+    def replace_items(self, query, body):
+        for item in body['items']:
+            if not str(item.get('name', '')).strip():
+                raise ValidationError("Item name is required.")
+        version = body.get('version')
+        if version is not None and (version != self.changes.version or body.get('epoch') != self.changes.epoch):
+            raise ConflictError("The inventory was changed on another till. Reload and try again.")
+        self.inventory.require_store().save_all(body['items'])
+        self.inventory.load()
+        self.changes.layout_changed()
+        return self.changes.stamp()
+
+    def add_item(self, query, body):
+        self.inventory.add_item(body)
+        return self.changes.stamp()
+
+    def get_item(self, query, body, name):
+        return item_json(self.require_item(name))
+
+    def get_item_by_sku(self, query, body, sku):
+        return item_json(self.require_sku(sku))
+
+    def update_item(self, query, body, name):
+        item = self.require_item(name)
+        self.inventory.update_item(item.row, body['item'], body.get('base'))
+        return {**self.changes.stamp(), 'item': item_json(item)}
+
+    def delete_item(self, query, body, name):
+        self.inventory.delete_item(self.require_item(name).row)
+        return self.changes.stamp()
+
+    def search(self, query, body):
+        limit = min(int(query.get('limit', MAX_SEARCH_RESULTS)), MAX_SEARCH_RESULTS)
+        items = self.inventory.search(query.get('q', ''), query.get('category') or None, limit)
+        return {'items': [item_json(item) for item in items]}
+
+    def changes_since(self, query, body):
+        return self.changes.since(int(query.get('since', 0)), query.get('epoch'))
+
+    def adjust_stock(self, query, body):
+        deltas = [(name, int(delta)) for name, delta in body['deltas']]
+        rows = self.inventory.adjust_quantities(deltas)
+        quantities = {self.inventory.items[row]['name']: self.inventory.items[row]['quantity'] for row in rows}
+        return {**self.changes.stamp(), 'quantities': quantities}
+
+    def create_cart(self, query, body):
+        cart_id = next(self.cart_ids)
+        self.carts[cart_id] = Cart()
+        return cart_json(cart_id, self.carts[cart_id])
+
+    def get_cart(self, query, body, cart_id):
+        return cart_json(int(cart_id), self.require_cart(cart_id))
+
+    def add_to_cart(self, query, body, cart_id):
+        cart = self.require_cart(cart_id)
+        cart.add(self.require_item(body['name']), int(body['quantity']))
+        return cart_json(int(cart_id), cart)
+
+    def scan_to_cart(self, query, body, cart_id):
+        cart = self.require_cart(cart_id)
+        cart.add(self.require_sku(body['sku']), 1)
+        return cart_json(int(cart_id), cart)
+
+    def drop_cart(self, query, body, cart_id):
+        self.carts.pop(int(cart_id), None)
+        return {}
+
+    def checkout_cart(self, query, body, cart_id):
+        cart = self.require_cart(cart_id)
+        result = self.complete_sale(cart, (body or {}).get('receipt_no'))
+        del self.carts[int(cart_id)]
+        return result
+
+    def checkout(self, query, body):
+        """Record a sale made from a till's own cart
+
+        The till has already handed over the goods, so the sale is not
+        refused for lack of stock (stock never goes below 0).
+        """
+        cart = Cart()
+        cart.items.extend(
+            {
+                'name': cart_item['name'],
+                'quantity': int(cart_item['quantity']),
+                'unit_price': float(cart_item['unit_price']),
+                'total_price': float(cart_item['total_price']),
+            }
+            for cart_item in body['items']
+        )
+        cart.index.rebuild(cart.items)
+        return self.complete_sale(cart, body.get('receipt_no'))
+
+    def complete_sale(self, cart, receipt_no=None):
+        if not cart.items:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "The cart is empty.")
+        names = [cart_item['name'] for cart_item in cart.items]
+        receipt_no = receipt_no or self.receipt_allocator.allocate()
+        result = self.checkout_service.checkout(cart, receipt_no)
+        quantities = {}
+        for name in names:
+            item = self.inventory.get(name)
+            if item is not None:
+                quantities[item['name']] = item['quantity']
+        return {
+            'receipt_no': result['receipt_no'],
+            'sale_id': result['sale_id'],
+            'errors': result['errors'],
+            'quantities': quantities,
+            **self.changes.stamp(),
+        }
+
+    def peek_receipt_number(self, query, body):
+        return {'receipt_no': self.receipt_allocator.peek()}
+
+    def allocate_receipt_number(self, query, body):
+        return {'receipt_no': self.receipt_allocator.allocate()}
+
+    def batch(self, query, body):
+        """Run several requests in one round trip, in order"""
+        responses = []
+        for request in body['requests']:
+            if request['path'].startswith('/batch'):
+                status, payload = HTTPStatus.BAD_REQUEST, {'error': "Batches cannot be nested."}
+            else:
+                status, payload = self.handle(request.get('method', 'GET').upper(), request['path'],
+                                              request.get('body'))
+            responses.append({'status': int(status), 'body': payload})
+        return {'responses': responses}
+
+    def close(self):
+        self.inventory.close()
+        if self.sales_ledger is not None:
+            self.sales_ledger.close()
+
+
+async def read_request(reader):
+    """Read one request, returns (method, target, headers, body) or None at end of stream"""
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+    except asyncio.TimeoutError:
+        return None
+    if not request_line.strip():
+        return None
+    method, target, version = request_line.decode('latin-1').split()
+
+    headers = {'http-version': version}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY_SIZE:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large.")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target, headers, body
+
+
+def wants_keep_alive(headers):
+    connection = headers.get('connection', '').lower()
+    if headers['http-version'] == 'HTTP/1.0':
+        return connection == 'keep-alive'
+    return connection != 'close'
+
+
+def write_response(writer, status, payload, keep_alive):
+    data = json.dumps(payload).encode('utf-8')
+    head = (
+        f"HTTP/1.1 {int(status)} {status.phrase}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode('latin-1') + data)
+
+
+class ShopServer:
+    """Serves a ShopService over HTTP/1.1, keeping connections open between requests
+
+    Requests without the shop's token are refused before they reach the service.
+    """
+
+    def __init__(self, service, host='127.0.0.1', port=DEFAULT_PORT):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.server = None
+        self.token = service.shop_info[SHOP_TOKEN_KEY]
+
+    def authorized(self, headers):
+        expected = f"Bearer {self.token}".encode('latin-1')
+        return hmac.compare_digest(headers.get('authorization', '').encode('latin-1'), expected)
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        # With port 0 the system picks a free port
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HttpError as e:
+                    write_response(writer, e.status, {'error': str(e)}, False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = wants_keep_alive(headers)
+                if not self.authorized(headers):
+                    status, response = HTTPStatus.UNAUTHORIZED, {
+                        'error': f"Missing or wrong shop server token (\"{SHOP_TOKEN_KEY}\" in shop_info.json)."
+                    }
+                else:
+                    try:
+                        payload = json.loads(body) if body else None
+                    except ValueError:
+                        status, response = HTTPStatus.BAD_REQUEST, {'error': "The body is not valid JSON."}
+                    else:
+                        status, response = self.service.handle(method, target, payload)
+                write_response(writer, status, response, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+
+def open_shop_service(shop_path):
+    """Open the inventory, sales ledger and receipt counter of a shop folder"""
+    info_path = os.path.join(shop_path, SHOP_INFO_FILE)
+    with open(info_path, 'r') as f:
+        shop_info = json.load(f)
+    if not shop_info.get(SHOP_TOKEN_KEY):
+        shop_info[SHOP_TOKEN_KEY] = secrets.token_urlsafe(24)
+        write_json_atomic(info_path, shop_info)
+    backend = shop_info.get('storage_backend', DEFAULT_STORAGE_BACKEND)
+    inventory = InventoryRepository(open_inventory_store(shop_path, backend))
+    inventory.load()
+    return ShopService(
+        shop_path, shop_info, inventory, open_sales_ledger(shop_path),
+        get_receipt_allocator(shop_path, shop_info.get('receipt_block_size', 1))
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a shop's inventory to the tills")
+    parser.add_argument('shop', help="shop folder name or path")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on (0.0.0.0 for the LAN)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    try:
+        service = open_shop_service(shop_path_of(args.shop))
+    except (InventoryError, OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    server = ShopServer(service, args.host, args.port)
+    print(f"Serving {service.status(None, None)['shop_name']} on http://{args.host}:{args.port}")
+    print(f"Tills need \"{SHOP_TOKEN_KEY}\": \"{server.token}\" in their shop_info.json")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import builtins
+
+# Run with POS_PROFILE_STARTUP=1 (or --profile-startup) to print where the
+# time to the first painted window goes
+PROFILE_ENV = "POS_PROFILE_STARTUP"
+PROFILE_FLAG = "--profile-startup"
+STARTUP_BUDGET = 1.0  # seconds from main.py starting to the first paint
+SLOWEST_IMPORTS = 15
+
+started_at = time.perf_counter()
+enabled = False
+checkpoints = []  # (label, seconds since started_at)
+import_times = {}  # module name -> (total seconds, own seconds)
+import_stack = []  # [name, start, seconds spent in nested imports]
+original_import = builtins.__import__
+
+
+def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return original_import(name, globals, locals, fromlist, level)
+
+    import_stack.append([name, time.perf_counter(), 0.0])
+    try:
+        return original_import(name, globals, locals, fromlist, level)
+    finally:
+        name, start, nested = import_stack.pop()
+        total = time.perf_counter() - start
+        import_times[name] = (total, total - nested)
+        if import_stack:
+            import_stack[-1][2] += total
+
+
+def start_if_requested(argv=None):
+    """Start timing imports if profiling was asked for; call before the other imports"""
+    global enabled
+    argv = sys.argv if argv is None else argv
+    if PROFILE_FLAG in argv:
+        argv.remove(PROFILE_FLAG)
+        enabled = True
+    elif os.environ.get(PROFILE_ENV):
+        enabled = True
+    if enabled:
+        builtins.__import__ = timed_import
+    return enabled
+
+
+def mark(label):
+    """Record how long after startup label was reached"""
+    if enabled:
+        checkpoints.append((label, time.perf_counter() - started_at))
+
+
+def report_after_first_paint(widget):
+    """Print the report once widget has painted for the first time"""
+    if not enabled:
+        return
+
+    from PyQt5.QtCore import QObject, QEvent, QTimer
+
+    class FirstPaintWatcher(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint:
+                watched.removeEventFilter(self)
+                # Reported from the event loop, after this paint has finished
+                QTimer.singleShot(0, lambda: (mark("first paint"), report()))
+            return False
+
+    widget.first_paint_watcher = FirstPaintWatcher(widget)
+    widget.installEventFilter(widget.first_paint_watcher)
+
+
+def report():
+    builtins.__import__ = original_import
+
+    print("Startup profile (seconds since main.py started)")
+    previous = 0.0
+    for label, at in checkpoints:
+        print(f"  {label:<30} {at:8.3f}  (+{at - previous:.3f})")
+        previous = at
+
+    print("Slowest imports (total / own):")
+    slowest = sorted(import_times.items(), key=lambda item: item[1][0], reverse=True)
+    for name, (total, own) in slowest[:SLOWEST_IMPORTS]:
+        print(f"  {name:<40} {total:8.3f} / {own:.3f}")
+
+    first_paint = checkpoints[-1][1] if checkpoints else 0.0
+    verdict = "within" if first_paint <= STARTUP_BUDGET else "OVER"
+    print(f"First paint after {first_paint:.3f}s, {verdict} the {STARTUP_BUDGET:.1f}s budget")
@@ -0,0 +1,58 @@
+from PyQt5.QtGui import QColor
+
+# Widgets pick up their look from APP_STYLESHEET through the "role"
+# dynamic property instead of carrying a stylesheet of their own
+ROLE_PROPERTY = "role"
+
+# Colours of the painted shop cards (see shop_list.ShopItemDelegate)
+CARD_BACKGROUND = QColor("#ffffff")
+CARD_HOVER_TOP = QColor("#f0f8ff")
+CARD_HOVER_BOTTOM = QColor("#e0f0ff")
+CARD_HOVER_BORDER = QColor("#b3d9ff")
+CARD_SELECTED_TOP = QColor("#e6f2ff")
+CARD_SELECTED_BOTTOM = QColor("#d9ecff")
+CARD_SELECTED_BORDER = QColor("#99ccff")
+CARD_TEXT = QColor("#000000")
+
+EDIT_BUTTON_COLOR = QColor("#4CAF50")
+EDIT_BUTTON_HOVER_COLOR = QColor("#45a049")
+DELETE_BUTTON_COLOR = QColor("#f44336")
+DELETE_BUTTON_HOVER_COLOR = QColor("#da190b")
+
+APP_STYLESHEET = """
+QPushButton[role="add-shop"] {
+    font-size: 16px;
+    border: 2px dashed #888;
+    background-color: #f0f0f0;
+    border-radius: 8px;
+}
+QPushButton[role="add-shop"]:hover {
+    background-color: #e0e0ff;
+    border: 2px dashed #666;
+}
+
+QLabel[role="section-title"] {
+    font-size: 18px;
+    margin-top: 20px;
+    font-weight: bold;
+}
+
+QListView[role="shop-list"] {
+    background-color: #ffffff;
+    border: 1px solid #ddd;
+    border-radius: 5px;
+}
+"""
+
+
+def set_role(widget, role):
+    """Style widget as role from APP_STYLESHEET, re-polishing it if it is already styled"""
+    widget.setProperty(ROLE_PROPERTY, role)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+
+
+def apply_theme(app):
+    """Install the application-wide stylesheet"""
+    app.setStyleSheet(APP_STYLESHEET)